@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark for amount parsing and French formatting.
+
+Compares the float path (str.replace + float(), then f"{x:,.2f}" +
+str.replace) with the integer-cents helpers of src/amounts.py over a
+million amounts, and checks both give the same results. The SG parser
+parses with the float path, the faster one; totals are summed in cents.
+
+Usage:
+    python benchmarks/bench_amounts.py [amount_count]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from amounts import format_french_amount, format_french_cents, parse_french_cents
+
+
+def legacy_parse(amount_str: str) -> float:
+    return float(amount_str.replace('.', '').replace(',', '.'))
+
+
+def legacy_format(value: float) -> str:
+    return f"{value:,.2f}".replace(',', ' ').replace('.', ',')
+
+
+def bench(function, values, repeat: int = 3) -> float:
+    """Return the best wall time of several runs of function over values."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            function(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for amount parsing and French formatting")
+    parser.add_argument('amount_count', nargs='?', type=int, default=1_000_000,
+                        help='Amounts parsed and formatted (default: %(default)s)')
+    count = parser.parse_args().amount_count
+    random.seed(42)
+    
+    # Statement-like amounts in the SG input format ("1.234,56")
+    cents = [random.randint(1, 10_000_000) for _ in range(count)]
+    texts = [f"{c // 100:_}".replace('_', '.') + f",{c % 100:02d}" for c in cents]
+    values = [legacy_parse(text) for text in texts]
+    # Recurring fees and transfers: 2,000 distinct amounts
+    repeated = [values[i % 2000] for i in range(count)]
+    
+    assert [parse_french_cents(text) for text in texts] == cents
+    assert [c / 100 for c in cents] == values
+    assert [format_french_amount(v) for v in values] == [legacy_format(v) for v in values]
+    
+    results = [
+        ("parse, float (SG parser)", bench(legacy_parse, texts)),
+        ("parse, cents", bench(parse_french_cents, texts)),
+        ("format, f-string", bench(legacy_format, values)),
+        ("format, from cents", bench(format_french_cents, cents)),
+        ("format, repeated amounts, f-string", bench(legacy_format, repeated)),
+        ("format, repeated amounts, memoized", bench(format_french_amount, repeated)),
+    ]
+    
+    print(f"{count} amounts")
+    for name, elapsed in results:
+        print(f"  {name:<36} {elapsed:.3f}s ({count / elapsed:,.0f}/s)")
+    
+    # Summing as floats drifts, summing cents does not
+    float_total = sum(values)
+    cents_total = sum(cents)
+    print(f"  float sum drift: {abs(float_total * 100 - cents_total):.6f} cents")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for BaseStatementParser._filter_ignore_lines.
+
+Compares the compiled ignore matcher with the previous implementation
+(one re.search per pattern and per line) on a synthetic statement.
+
+Usage:
+    python benchmarks/bench_filter.py [line_count]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from parsers.base_parser import BaseStatementParser, GenericTextParser
+
+
+def legacy_filter_ignore_lines(lines):
+    """Previous implementation: every pattern searched on every line."""
+    ignore_patterns = [re.escape(text) for text in BaseStatementParser.IGNORE_TEXTS]
+    ignore_patterns += list(BaseStatementParser.IGNORE_PATTERNS)
+    ignore_patterns += [f'^{word}$' for word in BaseStatementParser.IGNORE_WORDS]
+    
+    filtered_lines = []
+    for line in lines:
+        if re.search(r'TOTAUX DES MOUVEMENTS', line, re.IGNORECASE):
+            break
+        
+        should_ignore = False
+        for pattern in ignore_patterns:
+            if re.search(pattern, line, re.IGNORECASE):
+                should_ignore = True
+                break
+        if not should_ignore:
+            filtered_lines.append(line)
+    
+    return filtered_lines
+
+
+def synthetic_lines(line_count: int):
+    """Build a statement-like list of lines: transactions mixed with page boilerplate."""
+    page = [
+        "                                                          RELEVÉ DE COMPTE",
+        "                                            COMPTE D'ADMINISTRATION - en euros",
+        "                                                    n° 12345 67890 00012345678 90",
+        "VOS CONTACTS                                          du 01/07/2025 au 31/07/2025",
+        "                                                              envoi n°7 Page 1/4",
+        "Internet : entreprises.sg.fr",
+        "Téléphone : 03 22 22 22 22",
+        "    Date           Valeur          Nature de l'opération          Débit      Crédit",
+    ]
+    transaction = [
+        " 01/07/2025 01/07/2025 000001 VIR EUROPEEN EMIS NET                      422,47",
+        "                       POUR: CLIENT EXAMPLE XX",
+        "                       REF: 1234567890123",
+        "                       MOTIF: Transfer example via CM",
+        "",
+        "                                                                      24.145,10",
+        " 02/07/2025 01/07/2025 CARTE X1234 01/07 LA POSTE 800010                   15,50",
+        "                       TVA A 20,00 : 0,64 EUR",
+        "                                                                    suite >>>",
+    ]
+    lines = []
+    while len(lines) < line_count:
+        lines.extend(page)
+        for _ in range(10):
+            lines.extend(transaction)
+    return lines[:line_count]
+
+
+def bench(function, lines, repeat: int = 3) -> float:
+    """Return the best wall time of several runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description="Micro-benchmark for BaseStatementParser._filter_ignore_lines")
+    argument_parser.add_argument('line_count', nargs='?', type=int, default=100_000,
+                                 help='Lines of the synthetic statement (default: %(default)s)')
+    line_count = argument_parser.parse_args().line_count
+    lines = synthetic_lines(line_count)
+    parser = GenericTextParser()
+    
+    if parser._filter_ignore_lines(lines) != legacy_filter_ignore_lines(lines):
+        print("✗ Compiled filter output differs from the legacy filter")
+        return 1
+    
+    legacy = bench(legacy_filter_ignore_lines, lines)
+    compiled = bench(parser._filter_ignore_lines, lines)
+    
+    print(f"Filtering {line_count} lines")
+    print(f"  legacy:   {legacy:.3f}s ({line_count / legacy:,.0f} lines/s)")
+    print(f"  compiled: {compiled:.3f}s ({line_count / compiled:,.0f} lines/s)")
+    print(f"  speedup:  {legacy / compiled:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
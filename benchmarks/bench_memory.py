@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the transaction models.
+
+Measures with tracemalloc the memory held by N transactions stored as:
+- the previous BankTransaction dataclass (one __dict__ per instance, no interning)
+- the slotted BankTransaction with interned labels
+- a columnar TransactionTable
+
+Usage:
+    python benchmarks/bench_memory.py [transaction_count]
+"""
+
+import argparse
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from models import BankTransaction, TransactionTable, intern_label
+
+
+@dataclass
+class LegacyBankTransaction:
+    """BankTransaction as it was before __slots__ and the detail_lines field."""
+    
+    date: Optional[datetime] = None
+    value_date: Optional[datetime] = None
+    description: str = ""
+    operation_type: str = ""
+    amount: Optional[float] = None
+    debit: Optional[float] = None
+    credit: Optional[float] = None
+    balance: Optional[float] = None
+    reference: str = ""
+    category: str = ""
+    libelle_interbancaire: str = ""
+
+
+OPERATIONS = ['FACTURATION SERVICE NET', 'VIR EUROPEEN EMIS NET', 'CARTE X1234 LA POSTE',
+              'VIR RECU CLIENT EXAMPLE', 'PRLV SEPA EXAMPLE']
+CATEGORIES = ['COMMISSIONS ET FRAIS DIVERS', 'AUTRES VIREMENTS EMIS', '',
+              'AUTRES VIREMENTS RECUS', '']
+
+
+def build(transaction_class, count: int, intern: bool):
+    """Build transactions the way a parser does, from freshly sliced strings."""
+    random.seed(1)
+    label = intern_label if intern else str
+    base = datetime(2015, 1, 1)
+    transactions = []
+    for i in range(count):
+        kind = i % len(OPERATIONS)
+        transaction = transaction_class()
+        transaction.date = base + timedelta(days=i // 20)
+        transaction.value_date = base + timedelta(days=i // 20)
+        # Slicing a longer line produces a new string object, as parsing does
+        transaction.operation_type = label((' ' + OPERATIONS[kind])[1:])
+        transaction.category = label((' ' + CATEGORIES[kind])[1:])
+        transaction.debit = random.randint(1, 1_000_000) / 100
+        # The SG parser used to add detail_lines as an undeclared attribute
+        transaction.detail_lines = [f"REF: {i:013d}"]
+        transactions.append(transaction)
+    return transactions
+
+
+def measure(function) -> float:
+    """Return the memory (MB) still allocated by the result of function."""
+    tracemalloc.start()
+    result = function()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory benchmark for the transaction models")
+    parser.add_argument('transaction_count', nargs='?', type=int, default=100_000,
+                        help='Transactions built (default: %(default)s)')
+    count = parser.parse_args().transaction_count
+    
+    legacy = measure(lambda: build(LegacyBankTransaction, count, intern=False))
+    slotted = measure(lambda: build(BankTransaction, count, intern=True))
+    table = measure(lambda: TransactionTable(build(BankTransaction, count, intern=True)))
+    
+    print(f"Memory held by {count} transactions (tracemalloc)")
+    print(f"  legacy dataclass:  {legacy:7.1f} MB")
+    print(f"  slotted, interned: {slotted:7.1f} MB")
+    print(f"  TransactionTable:  {table:7.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the classification of operation labels.
+
+Compares the previous chain of `any(keyword in label ...)` checks with
+the compiled rule table of src/rules.py over a million labels drawn from
+the corpus operations, with and without its LRU cache, and checks both
+give the same category and direction.
+
+Usage:
+    python benchmarks/bench_rules.py [label_count]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from corpus import MERCHANTS, OTHER_OPERATIONS
+from parsers.sg_parser import SG_RULES
+from rules import RuleSet
+
+
+LEGACY_CREDIT_KEYWORDS = ['VIR INST RE', 'VIR RECU', 'REMISE', 'DEPOT', 'VRST GAB', 'VIREMENT RECU']
+
+
+def legacy_classify(label: str):
+    """Category and direction as computed before the rule table."""
+    operation_upper = label.upper()
+    credit = any(keyword in operation_upper for keyword in LEGACY_CREDIT_KEYWORDS)
+    
+    if any(keyword in operation_upper for keyword in ['FACTURATION', 'FRAIS']):
+        category = "COMMISSIONS ET FRAIS DIVERS"
+    elif 'CHEQUE' in operation_upper and 'REMISE' not in operation_upper:
+        category = "CHEQUES PAYES"
+    elif 'REMISE CHEQUE' in operation_upper:
+        category = "REMISES DE CHEQUES"
+    elif 'VRST GAB' in operation_upper:
+        category = "VERSEMENTS ESPECES"
+    elif 'ECHEANCE PRET' in operation_upper:
+        category = "ECHEANCE CREDITS"
+    elif 'VIR RECU' in operation_upper:
+        category = "AUTRES VIREMENTS RECUS"
+    elif 'VIR INST RE' in operation_upper:
+        category = ""
+    elif 'VIR EUROPEEN EMIS' in operation_upper or 'EMIS' in operation_upper:
+        category = "AUTRES VIREMENTS EMIS"
+    else:
+        category = ""
+    return category, credit
+
+
+def chain_classify(rules, label: str):
+    """Category and direction of a rule table, checking each rule in turn."""
+    operation_upper = label.upper()
+    
+    def applies(rule):
+        return (any(keyword in operation_upper for keyword in rule['keywords'])
+                and not any(keyword in operation_upper for keyword in rule.get('unless', ())))
+    
+    category = next((rule['category'] for rule in rules if 'category' in rule and applies(rule)), "")
+    credit = next((rule['direction'] == 'credit' for rule in rules
+                   if 'direction' in rule and applies(rule)), False)
+    return category, credit
+
+
+def merchant_rules(count: int):
+    """A large table: one category rule per merchant name, then the SG rules."""
+    rules = [{'keywords': [f"MERCHANT{i:04d}"], 'category': f"CATEGORY {i % 40}"} for i in range(count)]
+    return rules + SG_RULES
+
+
+def bench(function, labels, repeat: int = 3) -> float:
+    """Return the best wall time of several runs of function over labels."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for label in labels:
+            function(label)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_labels(count: int, rng: random.Random):
+    """Labels as found in statements: operations with references, card payments, cheques."""
+    labels = []
+    for _ in range(count):
+        draw = rng.random()
+        if draw < 0.3:
+            labels.append(f"CARTE X{rng.randint(1000, 9999)} {rng.randint(1, 28):02d}/"
+                          f"{rng.randint(1, 12):02d} {rng.choice(MERCHANTS)}")
+        elif draw < 0.35:
+            labels.append(f"CHEQUE {rng.randint(1000000, 9999999)}")
+        else:
+            operation, _ = rng.choice(OTHER_OPERATIONS)
+            labels.append(f"{operation} {rng.randint(1, 99999)}")
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for the classification of operation labels")
+    parser.add_argument('label_count', nargs='?', type=int, default=1_000_000,
+                        help='Labels classified (default: %(default)s)')
+    count = parser.parse_args().label_count
+    rng = random.Random(42)
+    
+    # Unique labels (card payments and references), and recurring ones: 2,000 distinct labels
+    labels = make_labels(count, rng)
+    distinct = labels[:2000]
+    repeated = [distinct[i % len(distinct)] for i in range(count)]
+    
+    uncached = RuleSet(SG_RULES, cache_size=0)
+    cached = RuleSet(SG_RULES)
+    assert all(tuple(uncached.classify(label)) == legacy_classify(label) for label in labels)
+    
+    # User tables grow: the rule table cost does not depend on the number of keywords
+    large_rules = merchant_rules(300)
+    large_table = RuleSet(large_rules, cache_size=0)
+    merchant_labels = [f"CARTE X1234 01/07 MERCHANT{rng.randrange(400):04d}" if i % 2 else label
+                       for i, label in enumerate(labels)]
+    # Checking the rules one by one is slow, it is timed on a sample
+    sample = merchant_labels[:20000]
+    assert all(tuple(large_table.classify(label)) == chain_classify(large_rules, label)
+               for label in sample)
+    
+    results = [
+        ("unique labels, keyword chain", labels, bench(legacy_classify, labels)),
+        ("unique labels, rule table", labels, bench(uncached.classify, labels)),
+        ("repeated labels, keyword chain", repeated, bench(legacy_classify, repeated)),
+        ("repeated labels, rule table + LRU", repeated, bench(cached.classify, repeated)),
+        (f"{len(large_rules)} rules, rule by rule", sample,
+         bench(lambda label: chain_classify(large_rules, label), sample, repeat=1)),
+        (f"{len(large_rules)} rules, rule table", merchant_labels,
+         bench(large_table.classify, merchant_labels)),
+    ]
+    
+    print(f"{count} labels")
+    for name, timed_labels, elapsed in results:
+        print(f"  {name:<36} {len(timed_labels):>8} labels {elapsed:.3f}s "
+              f"({len(timed_labels) / elapsed:,.0f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
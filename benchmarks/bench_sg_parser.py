@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Société Générale transaction parser.
+
+Parses a synthetic statement built by repeating the transactions of the
+test fixture and reports the throughput in lines per second.
+
+Usage:
+    python benchmarks/bench_sg_parser.py [line_count]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from parsers.sg_parser import START, SocieteGeneraleParser, _classify_line
+
+
+FIXTURE_PATH = Path(__file__).parent.parent / 'tests' / 'data' / 'sg_statement.txt'
+
+
+def synthetic_text(line_count: int) -> str:
+    """Build a statement: the fixture header followed by its transactions repeated."""
+    lines = FIXTURE_PATH.read_text(encoding='utf-8').splitlines()
+    first = next(i for i, line in enumerate(lines) if line.strip() and _classify_line(line.strip())[0] == START)
+    last = next(i for i, line in enumerate(lines) if 'NOUVEAU SOLDE' in line)
+    header, body, footer = lines[:first], lines[first:last], lines[last:]
+    
+    repeated = []
+    while len(repeated) < line_count:
+        repeated.extend(body)
+    return '\n'.join(header + repeated[:line_count] + footer) + '\n'
+
+
+def bench(text: str, repeat: int = 3):
+    """Return the best wall time of several runs and the parsed statement."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        statement = SocieteGeneraleParser(text=text).parse()
+        best = min(best, time.perf_counter() - start)
+    return best, statement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark for the Société Générale transaction parser")
+    parser.add_argument('line_count', nargs='?', type=int, default=100_000,
+                        help='Lines of the synthetic statement (default: %(default)s)')
+    line_count = parser.parse_args().line_count
+    text = synthetic_text(line_count)
+    
+    elapsed, statement = bench(text)
+    
+    print(f"Parsing {line_count} lines")
+    print(f"  transactions: {len(statement.transactions)}")
+    print(f"  time:         {elapsed:.3f}s ({line_count / elapsed:,.0f} lines/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
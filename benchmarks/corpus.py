@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Seeded generator of synthetic bank statement text.
+
+Builds pdftotext-like text in the Société Générale layout or in a
+generic layout, with any number of transactions, page breaks, CARTE
+and CHEQUE operations and detail lines. The same seed and options
+always give the same text.
+
+Usage:
+    python benchmarks/corpus.py [--layout sg|generic] [-n transactions] [--seed N] [-o output.txt]
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List
+
+
+LAYOUTS = ('sg', 'generic')
+
+# Columns of the SG layout, as laid out by pdftotext -layout
+SG_DEBIT_COLUMN = 140
+SG_CREDIT_COLUMN = 160
+SG_BALANCE_COLUMN = 175
+
+DETAIL_TEXTS = [
+    'POUR: CLIENT EXAMPLE XX', 'REF: 1234567890123', 'MOTIF: Transfer example via CM',
+    'DE: M.OU MME EXAMPLE PILOTE', 'DATE: 04/07/2025 21:41', 'TVA A 20,00 : 0,64 EUR',
+    'ECH/150725 ID EMETTEUR/FR12ZZZ123456', 'MDT/ABC123 REF/CONTRAT 2025', 'REF ABONNEMENT MENSUEL',
+]
+MERCHANTS = ['LA POSTE 800010', 'CARREFOUR EXAMPLE', 'SNCF INTERNET', 'STATION TOTAL 1234',
+             'BOULANGERIE EXAMPLE', 'AMAZON PAYMENTS']
+# (operation, is_credit) of the operations other than CARTE and CHEQUE
+OTHER_OPERATIONS = [
+    ('VIR EUROPEEN EMIS NET', False), ('FACTURATION EXAMPLE SERVICE NET', False),
+    ('PRLV SEPA EXAMPLE ENERGIE', False), ('ECHEANCE PRET 00012345', False),
+    ('VIR RECU CLIENT EXAMPLE', True), ('VIR INST RE 568578424597', True),
+    ('REMISE CHEQUE 0012345', True), ('VRST GAB 0904 AGENCE EXAMPLE', True),
+]
+
+
+@dataclass
+class CorpusOptions:
+    """Shape of the generated statement."""
+    
+    transactions: int = 1000
+    seed: int = 0
+    lines_per_page: int = 60  # 0 for no page breaks
+    carte_ratio: float = 0.3
+    cheque_ratio: float = 0.05
+    max_detail_lines: int = 3
+
+
+def generate(layout: str, options: CorpusOptions) -> str:
+    """
+    Generate the text of a statement.
+    
+    Args:
+        layout: 'sg' or 'generic'
+        options: Number of transactions and mix of operations
+    
+    Returns:
+        Statement text, ending with a newline
+    """
+    if layout == 'sg':
+        return generate_sg_statement(options)
+    if layout == 'generic':
+        return generate_generic_statement(options)
+    raise ValueError(f"Unknown layout: {layout}")
+
+
+def generate_sg_statement(options: CorpusOptions) -> str:
+    """Generate a statement in the Société Générale layout."""
+    rng = random.Random(options.seed)
+    start = date(2025, 1, 1)
+    end = _end_date(start, options.transactions)
+    balance = 2_456_757
+    
+    body = []
+    for index in range(options.transactions):
+        day = start + timedelta(days=index * (end - start).days // max(options.transactions, 1))
+        operation, is_credit = _pick_operation(rng, options)
+        cents = rng.randint(100, 500_000) if is_credit else rng.randint(50, 150_000)
+        balance += cents if is_credit else -cents
+        
+        dates = f" {day:%d/%m/%Y} {day:%d/%m/%Y} "
+        column = SG_CREDIT_COLUMN if is_credit else SG_DEBIT_COLUMN
+        if operation.startswith('CARTE') or (not is_credit and rng.random() < 0.5):
+            # Amount on the operation line
+            body.append(_at_column(dates + operation, column, _french_amount(cents)))
+            amount_line = None
+        else:
+            body.append(dates + operation)
+            amount_line = _at_column('', column, _french_amount(cents))
+            if operation.startswith('REMISE'):
+                amount_line += ' *'
+        
+        if operation == 'CHEQUE':
+            body.append(' ' * 23 + f"{rng.randint(1, 9_999_999):07d}")
+        for _ in range(rng.randint(0, options.max_detail_lines)):
+            body.append(' ' * 23 + rng.choice(DETAIL_TEXTS))
+        if amount_line is not None:
+            body.append(amount_line)
+        if rng.random() < 0.1:
+            body.append(_at_column('', SG_BALANCE_COLUMN, _french_amount(abs(balance))))
+    
+    header = [
+        ' ' * 130 + 'RELEVÉ DE COMPTE',
+        'SG EXAMPLE BRANCH' + ' ' * 83 + "COMPTE D'ADMINISTRATION - en euros",
+        ' ' * 128 + 'n° 12345 67890 00012345678 90',
+        'VOS CONTACTS' + ' ' * 116 + f"du {start:%d/%m/%Y} au {end:%d/%m/%Y}",
+    ]
+    client = [
+        'Internet : entreprises.sg.fr',
+        '',
+        'Votre agence EXAMPLE BRANCH' + ' ' * 67 + 'AERO CLUB EXAMPLE',
+        'Téléphone : 03 XX XX XX XX' + ' ' * 68 + 'SECTION VOL MOTEUR',
+        '',
+        'RELEVÉ DES OPÉRATIONS',
+    ]
+    column_header = ('    Date           Valeur' + ' ' * 35 + "Nature de l'opération"
+                     + ' ' * 51 + 'Débit' + ' ' * 22 + 'Crédit')
+    
+    def page_header(page, pages):
+        return [' ' * 139 + f"envoi n°7 Page {page}/{pages}",
+                ' ' * 128 + 'n° 12345 67890 00012345678 90',
+                column_header]
+    
+    def page_end():
+        return [' ' * 103 + 'suite >>>']
+    
+    pages = _paginate(body, options.lines_per_page, page_header, page_end)
+    footer = [
+        _at_column(' ' * 70 + f"NOUVEAU SOLDE AU {end:%d/%m/%Y}", SG_BALANCE_COLUMN,
+                   ('- ' if balance < 0 else '') + _french_amount(abs(balance))),
+        '',
+        'TOTAUX DES MOUVEMENTS',
+    ]
+    # The first page header goes between the client block and the transactions
+    lines = header + [pages[0][0]] + client + pages[0][1:] + [line for page in pages[1:] for line in page] + footer
+    return '\n'.join(lines) + '\n'
+
+
+def generate_generic_statement(options: CorpusOptions) -> str:
+    """Generate a statement in a generic layout: one line per transaction with its balance."""
+    rng = random.Random(options.seed)
+    start = date(2025, 1, 1)
+    end = _end_date(start, options.transactions)
+    balance = 1_000_000
+    
+    body = []
+    for index in range(options.transactions):
+        day = start + timedelta(days=index * (end - start).days // max(options.transactions, 1))
+        operation, is_credit = _pick_operation(rng, options)
+        cents = rng.randint(100, 500_000) if is_credit else rng.randint(50, 150_000)
+        balance += cents if is_credit else -cents
+        
+        if operation.startswith('CARTE'):
+            operation = 'CARD PAYMENT ' + operation.split(maxsplit=3)[-1]
+        elif operation == 'CHEQUE':
+            operation = f"CHECK {rng.randint(1, 9_999_999):07d}"
+        amount = _us_amount(cents if is_credit else -cents)
+        body.append(f"{day:%m/%d/%Y}  {operation:<40} {amount:>14} {_us_amount(balance):>16}")
+        for _ in range(rng.randint(0, options.max_detail_lines)):
+            body.append(' ' * 12 + rng.choice(DETAIL_TEXTS))
+    
+    def page_header(page, pages):
+        return [f"Example National Bank{' ' * 50}Page {page} of {pages}",
+                f"Date        {'Description':<40} {'Amount':>14} {'Balance':>16}"]
+    
+    pages = _paginate(body, options.lines_per_page, page_header, lambda: [''])
+    header = ['Example National Bank', 'Account Statement',
+              f"Statement period: {start:%m/%d/%Y} - {end:%m/%d/%Y}", '']
+    lines = header + [line for page in pages for line in page]
+    return '\n'.join(lines) + '\n'
+
+
+def _end_date(start: date, transactions: int) -> date:
+    """Spread the transactions over at least a month, at most ~20 per day."""
+    return start + timedelta(days=max(30, transactions // 20))
+
+
+def _pick_operation(rng: random.Random, options: CorpusOptions):
+    """Pick an (operation, is_credit) following the CARTE and CHEQUE ratios."""
+    draw = rng.random()
+    if draw < options.carte_ratio:
+        return f"CARTE X{rng.randint(1000, 9999)} {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d} {rng.choice(MERCHANTS)}", False
+    if draw < options.carte_ratio + options.cheque_ratio:
+        return 'CHEQUE', False
+    return rng.choice(OTHER_OPERATIONS)
+
+
+def _paginate(body: List[str], lines_per_page: int, page_header, page_end) -> List[List[str]]:
+    """Split body lines into pages, each with its header; every page but the last gets page_end()."""
+    if lines_per_page <= 0:
+        chunks = [body]
+    else:
+        chunks = [body[i:i + lines_per_page] for i in range(0, len(body), lines_per_page)] or [[]]
+    
+    pages = []
+    for number, chunk in enumerate(chunks, 1):
+        page = page_header(number, len(chunks)) + chunk
+        if number < len(chunks):
+            page += page_end()
+        pages.append(page)
+    return pages
+
+
+def _at_column(text: str, column: int, value: str) -> str:
+    """Right-align value so it ends at column, after text."""
+    return text + ' ' * max(1, column - len(text) - len(value)) + value
+
+
+def _french_amount(cents: int) -> str:
+    """Format cents like SG statements: "24.145,10"."""
+    return f"{cents // 100:,}".replace(',', '.') + f",{cents % 100:02d}"
+
+
+def _us_amount(cents: int) -> str:
+    """Format cents with US separators: "-1,234.56"."""
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+    return f"{sign}{cents // 100:,}.{cents % 100:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic bank statement text")
+    parser.add_argument('--layout', choices=LAYOUTS, default='sg', help='Statement layout (default: sg)')
+    parser.add_argument('-n', '--transactions', type=int, default=1000,
+                        help='Number of transactions, 10 to 1000000 (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--lines-per-page', type=int, default=60,
+                        help='Body lines per page, 0 for a single page (default: 60)')
+    parser.add_argument('--carte-ratio', type=float, default=0.3, help='Share of CARTE operations (default: 0.3)')
+    parser.add_argument('--cheque-ratio', type=float, default=0.05, help='Share of CHEQUE operations (default: 0.05)')
+    parser.add_argument('--max-detail-lines', type=int, default=3,
+                        help='Maximum detail lines per transaction (default: 3)')
+    parser.add_argument('-o', '--output', help='Output file (default: standard output)')
+    args = parser.parse_args()
+    
+    options = CorpusOptions(args.transactions, args.seed, args.lines_per_page,
+                            args.carte_ratio, args.cheque_ratio, args.max_detail_lines)
+    text = generate(args.layout, options)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
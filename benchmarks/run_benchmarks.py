@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: time every stage of the conversion on synthetic statements.
+
+For each layout and size, a statement is generated with corpus.py and the
+stages are timed separately:
+- filter: splitting the text into lines and removing the ignored lines
+- parse:  extracting the statement from the filtered lines
+- csv:    writing the statement CSV
+- merge:  writing the transactions of MERGE_STATEMENTS statements to a merged CSV
+
+Results are saved as JSON, and can be compared with a previous run.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 10,1000,100000] [--layouts sg,generic]
+                                        [-o results.json] [--compare previous.json]
+"""
+
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from corpus import LAYOUTS, CorpusOptions, generate
+from parsers.base_parser import GenericTextParser
+from parsers.sg_parser import SocieteGeneraleParser
+from sinks import MergeSink, write_statement_csv
+
+
+PARSERS = {'sg': SocieteGeneraleParser, 'generic': GenericTextParser}
+STAGES = ('filter', 'parse', 'csv', 'merge')
+MERGE_STATEMENTS = 2
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def time_stages(layout: str, options: CorpusOptions, repeat: int) -> dict:
+    """Return the best time of each stage over several runs, with the corpus size."""
+    text = generate(layout, options)
+    parser_class = PARSERS[layout]
+    best = dict.fromkeys(STAGES, float('inf'))
+    
+    for _ in range(repeat):
+        parser = parser_class()
+        start = time.perf_counter()
+        parser._set_text(text)
+        filtered = time.perf_counter()
+        statement = parser.parse()
+        parsed = time.perf_counter()
+        write_statement_csv(io.StringIO(newline=''), parser, statement)
+        written = time.perf_counter()
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            merge_start = time.perf_counter()
+            with MergeSink(Path(output_dir) / 'merged.csv') as sink:
+                for _ in range(MERGE_STATEMENTS):
+                    sink.add(statement, parser_class)
+            merged = time.perf_counter()
+        
+        for stage, elapsed in zip(STAGES, (filtered - start, parsed - filtered,
+                                           written - parsed, merged - merge_start)):
+            best[stage] = min(best[stage], elapsed)
+    
+    return {
+        'layout': layout,
+        'transactions': options.transactions,
+        'seed': options.seed,
+        'lines': text.count('\n'),
+        'bytes': len(text.encode('utf-8')),
+        'parsed_transactions': len(statement.transactions),
+        'stages': best,
+    }
+
+
+def git_commit() -> str:
+    """Return the current commit of the repository, or an empty string."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=Path(__file__).parent)
+    except OSError:
+        return ''
+    return result.stdout.strip()
+
+
+def print_result(result: dict, previous: dict = None):
+    """Print the stage times of one run, with the speedup against a previous run."""
+    print(f"{result['layout']:>8} {result['transactions']:>9} transactions, {result['lines']:>9} lines")
+    for stage in STAGES:
+        elapsed = result['stages'][stage]
+        line = f"    {stage:<7} {elapsed:9.4f}s ({result['lines'] / elapsed:>12,.0f} lines/s)"
+        if previous:
+            line += f"  {previous['stages'][stage] / elapsed:6.2f}x vs previous"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the conversion stages on synthetic statements")
+    parser.add_argument('--sizes', default='10,1000,100000',
+                        help='Comma-separated transaction counts (default: 10,1000,100000)')
+    parser.add_argument('--layouts', default=','.join(LAYOUTS),
+                        help='Comma-separated layouts (default: sg,generic)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measure, the best is kept (default: 3)')
+    parser.add_argument('-o', '--output', help='JSON results file (default: benchmarks/results/<date>.json)')
+    parser.add_argument('--compare', help='Previous JSON results file to compare with')
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    layouts = args.layouts.split(',')
+    for layout in layouts:
+        if layout not in PARSERS:
+            parser.error(f"unknown layout: {layout}")
+    
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            for result in json.load(f)['results']:
+                previous[(result['layout'], result['transactions'])] = result
+    
+    results = []
+    for layout in layouts:
+        for size in sizes:
+            result = time_stages(layout, CorpusOptions(transactions=size, seed=args.seed), args.repeat)
+            print_result(result, previous.get((layout, size)))
+            results.append(result)
+    
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,26 +5,41 @@ pdf2csv - Convert PDF bank statements to CSV files
 This script extracts text from PDF files using pdftotext and converts
 them to CSV format using structured parsers. It supports processing 
 multiple files and can merge them into a single output file.
+The extracted text is piped straight into the parsers and is only
+written to disk with --keep-text.
 
 Author: Created with AI assistance
 License: MIT
 """
 
 import argparse
-import csv
+import io
+import multiprocessing
 import os
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
 
 # Add src directory to Python path for imports
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 try:
-    from parsers.base_parser import GenericTextParser
-    from parsers.sg_parser import SocieteGeneraleParser
+    from parsers.registry import detect_parser, detect_stream_parser, registered_parsers, shared_parser
+    from conversion import (PARSE_CHUNK_LINES, page_ranges, parse_with_cache, pdf_page_count,
+                            pdftotext_command)
     from models import BankStatement
+    from sinks import (SORT_KEYS, MergeSink, replace_if_changed, stream_statement_csv,
+                       write_if_changed, write_statement_csv)
+    from sqlite_sink import SQLiteSink
+    from verify import BalanceVerifier
+    from rules import RuleSet
+    from cache import ConversionCache, DEFAULT_CACHE_SIZE, default_cache_dir, file_hash
+    from profiling import NULL_PROFILE, FileProfile, ProfileReport
+    from watch import DirectoryWatcher, Manifest, pdf_files
 except ImportError as e:
     print(f"Error importing parser modules: {e}")
     print("Make sure the src/ directory structure is correct")
@@ -33,18 +48,82 @@ except ImportError as e:
 
 __version__ = "1.0.0"
 
+# Workers are recycled after this many files to keep memory bounded on long runs
+DEFAULT_MAX_TASKS_PER_WORKER = 100
+
+# PDFs longer than this are extracted in page ranges of this many pages
+DEFAULT_PAGES_PER_RANGE = 50
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of the conversion of one PDF file."""
+    
+    csv_path: Optional[Path] = None  # None when per-file CSVs are not written
+    statement: Optional[BankStatement] = None  # None after a fallback conversion
+    parser_class: Optional[type] = None
+
 
 class PDF2CSVConverter:
     """Main converter class for PDF to CSV conversion."""
     
-    def __init__(self, merge_output: Optional[str] = None):
+    def __init__(self, merge_output: Optional[str] = None, jobs: Optional[int] = None,
+                 max_tasks_per_worker: Optional[int] = DEFAULT_MAX_TASKS_PER_WORKER,
+                 keep_text: bool = False, cache: Optional[ConversionCache] = None,
+                 write_csv_files: bool = True, profile_output: Optional[str] = None,
+                 manifest: Optional[Manifest] = None,
+                 pages_per_range: int = DEFAULT_PAGES_PER_RANGE, stream: bool = False,
+                 sqlite_output: Optional[str] = None, sort_by: Optional[str] = None,
+                 dedupe: bool = False, verify: bool = False, rules: Optional[RuleSet] = None):
         """
         Initialize the converter.
         
         Args:
             merge_output: If provided, all files will be merged into this single CSV file
+            jobs: Number of worker processes (defaults to the CPU count)
+            max_tasks_per_worker: Files handled by a worker before it is replaced
+                                  (None keeps workers alive for the whole run)
+            keep_text: Also write the extracted text next to each PDF (for debugging)
+            cache: Cache for extracted text and parsed statements (None disables caching)
+            write_csv_files: Write one CSV file per PDF (can be disabled when merging)
+            profile_output: If provided, per-stage timings of every file are written
+                            to this JSON file
+            manifest: If provided, only convert files that are new or changed since
+                      they were recorded in the manifest
+            pages_per_range: When files are not already converted in parallel, PDFs
+                             longer than this are extracted in page ranges, and large
+                             statements parsed in chunks, in parallel (0 disables it)
+            stream: Parse the pdftotext output as it is produced and write the CSV
+                    one transaction at a time, so memory use does not grow with the
+                    statement (the cache, text files and merging are not used)
+            sqlite_output: If provided, statements and transactions are also stored
+                           in this SQLite database, replacing previous imports
+            sort_by: Order of the rows of the merged file: None keeps the order of
+                     the files, 'date' or 'account' (then date) sorts them
+            dedupe: Skip the transactions of the merged file already merged from an
+                    overlapping statement, listing them in <merge output>.duplicates.csv
+            verify: Reconcile the balances of each statement with its transactions,
+                    and the opening balance of each statement with the closing balance
+                    of the previous statement of the same account
+            rules: Rule table giving the category and direction (credit or debit) of
+                   the operations, instead of the built-in one (see rules.py)
         """
         self.merge_output = merge_output
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.keep_text = keep_text
+        self.cache = cache
+        self.write_csv_files = write_csv_files
+        self.profile_output = profile_output
+        self.profile_report = ProfileReport() if profile_output else None
+        self.manifest = manifest
+        self.pages_per_range = pages_per_range
+        self.stream = stream
+        self.sqlite_output = sqlite_output
+        self.sort_by = sort_by
+        self.dedupe = dedupe
+        self.verify = verify
+        self.rules = rules
         self.processed_files = []
         
     def check_pdftotext_available(self) -> bool:
@@ -58,35 +137,29 @@ class PDF2CSVConverter:
         except FileNotFoundError:
             return False
     
-    def convert_pdf_to_text(self, pdf_path: Path) -> Optional[Path]:
+    def extract_text(self, pdf_path: Path) -> Optional[str]:
         """
-        Convert a PDF file to text using pdftotext.
+        Extract the text of a PDF file with pdftotext, without going through disk.
         
         Args:
             pdf_path: Path to the PDF file
             
         Returns:
-            Path to the generated text file, or None if conversion failed
+            The extracted text, or None if extraction failed
         """
         if not pdf_path.exists():
             print(f"Error: File {pdf_path} does not exist")
             return None
-            
-        # Generate output text file path
-        txt_path = pdf_path.with_suffix('.txt')
         
         try:
-            # Run pdftotext command
-            cmd = ['pdftotext', '-layout', str(pdf_path), str(txt_path)]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            if txt_path.exists():
-                print(f"Successfully converted: {pdf_path} -> {txt_path}")
-                return txt_path
+            ranges = self._page_ranges(pdf_path)
+            if len(ranges) <= 1:
+                text = self._run_pdftotext(pdftotext_command(pdf_path))
             else:
-                print(f"Error: Text file was not created for {pdf_path}")
-                return None
-                
+                # One pdftotext per range, the texts are joined in page order
+                with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                    text = ''.join(executor.map(
+                        lambda pages: self._run_pdftotext(pdftotext_command(pdf_path, *pages)), ranges))
         except subprocess.CalledProcessError as e:
             print(f"Error converting {pdf_path}: {e}")
             if e.stderr:
@@ -95,27 +168,91 @@ class PDF2CSVConverter:
         except Exception as e:
             print(f"Unexpected error converting {pdf_path}: {e}")
             return None
+        
+        print(f"Successfully extracted text: {pdf_path}")
+        return text
+    
+    def _run_pdftotext(self, command: list) -> str:
+        """Run pdftotext and return its output, raises CalledProcessError on failure."""
+        return subprocess.run(command, capture_output=True, encoding='utf-8',
+                              errors='replace', check=True).stdout
     
-    def _process_text_to_csv(self, txt_path: Path) -> Optional[Path]:
+    def _splits_large_files(self) -> bool:
         """
-        Process text file and convert to CSV format using structured parser.
+        Tell whether large files are extracted and parsed in parallel pieces.
+        
+        Only in the main process: when files are converted in a process pool,
+        the workers already keep the CPUs busy.
+        """
+        return (self.pages_per_range > 0 and self.jobs > 1
+                and not multiprocessing.current_process().daemon)
+    
+    def _page_ranges(self, pdf_path: Path) -> list:
+        """Return the page ranges a PDF is extracted in, none when it is extracted at once."""
+        if not self._splits_large_files():
+            return []
+        page_count = pdf_page_count(pdf_path)
+        if page_count is None or page_count <= self.pages_per_range:
+            return []
+        return page_ranges(page_count, self.pages_per_range)
+    
+    def convert_pdf_to_text(self, pdf_path: Path) -> Optional[Path]:
+        """
+        Convert a PDF file to a text file next to it.
         
         Args:
-            txt_path: Path to the text file
+            pdf_path: Path to the PDF file
             
         Returns:
-            Path to the generated CSV file, or None if conversion failed
+            Path to the generated text file, or None if conversion failed
         """
-        if not txt_path.exists():
-            print(f"Error: Text file {txt_path} does not exist")
+        text = self.extract_text(pdf_path)
+        if text is None:
             return None
         
-        csv_path = txt_path.with_suffix('.csv')
+        txt_path = pdf_path.with_suffix('.txt')
+        if not self._write_text(text, txt_path):
+            return None
+        return txt_path
+    
+    def _write_text(self, text: str, txt_path: Path) -> bool:
+        """Write extracted text to a file, returns True on success."""
+        try:
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        except OSError as e:
+            print(f"Error writing text file {txt_path}: {e}")
+            return False
+        
+        print(f"Saved extracted text: {txt_path}")
+        return True
+    
+    def _process_text_to_csv(self, text: str, csv_path: Path,
+                             profile=NULL_PROFILE) -> Optional[ConversionResult]:
+        """
+        Parse extracted text and convert it to CSV format using structured parser.
+        
+        Args:
+            text: Text extracted from the PDF
+            csv_path: Path of the CSV file to generate
+            profile: Profile recording the time of each stage
+            
+        Returns:
+            The conversion result, or None if conversion failed
+        """
+        if profile:
+            profile.lines = text.count('\n')
         
         try:
-            # Detect parser type based on content
-            parser = self._detect_parser(txt_path)
-            statement = parser.parse()
+            # Detect parser type based on content, the parser filters the lines
+            with profile.stage('filter'):
+                parser = detect_parser(text, shared=True)
+            with profile.stage('parse'):
+                statement = self._parse(parser, text)
+            
+            if profile:
+                profile.parser = type(parser).__name__
+                profile.transactions = statement.get_transaction_count()
             
             # Display extracted information
             print(f"  Bank: {statement.bank_name}")
@@ -123,74 +260,86 @@ class PDF2CSVConverter:
             print(f"  Period: {statement.get_date_range_str()}")
             print(f"  Transactions: {statement.get_transaction_count()}")
             
-            # Write to CSV using the parser's specific format
-            with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
-                # Use SG parser's specific CSV format if available
-                if hasattr(parser, 'to_csv_format'):
-                    # SG format uses semicolons and forces quotes
-                    writer = csv.writer(csv_file, delimiter=';', quoting=csv.QUOTE_ALL)
-                    csv_rows = parser.to_csv_format()
-                    
-                    for i, row in enumerate(csv_rows):
-                        # Line 7 (index 6) should not have quotes around column headers
-                        if i == 6:  # Column headers line - bypass CSV utilities
-                            line = ';'.join(row)
-                            csv_file.write(line + '\n')
-                        else:
-                            # Use normal CSV writer for all other lines
-                            writer.writerow(row)
-                else:
-                    # Fallback to generic format
-                    writer = csv.writer(csv_file)
-                    csv_data = statement.to_csv_data()
-                    writer.writerows(csv_data)
+            if not self.write_csv_files:
+                return ConversionResult(None, statement, type(parser))
             
-            print(f"Successfully created CSV: {csv_path}")
-            return csv_path
+            # Write to CSV using the parser's specific format, leaving an identical file untouched
+            with profile.stage('csv'):
+                csv_data = io.StringIO(newline='')
+                write_statement_csv(csv_data, parser, statement)
+                written = write_if_changed(csv_path, csv_data.getvalue())
+            
+            if written:
+                print(f"Successfully created CSV: {csv_path}")
+            else:
+                print(f"CSV unchanged: {csv_path}")
+            return ConversionResult(csv_path, statement, type(parser))
             
         except Exception as e:
-            print(f"Error processing {txt_path} to CSV: {e}")
+            print(f"Error converting text to {csv_path}: {e}")
+            if not self.write_csv_files:
+                return None
             # Fallback to basic text processing
-            return self._fallback_text_to_csv(txt_path)
+            if profile:
+                profile.fallback = True
+            with profile.stage('csv'):
+                fallback_path = self._fallback_text_to_csv(text, csv_path)
+            if fallback_path is None:
+                return None
+            return ConversionResult(fallback_path, None, None)
     
-    def _detect_parser(self, txt_path: Path):
-        """Detect appropriate parser based on text content."""
-        try:
-            with open(txt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Check for Société Générale patterns
-            if 'SG ' in content or 'Société Générale' in content:
-                return SocieteGeneraleParser(str(txt_path))
-            
-            # Default to generic parser
-            return GenericTextParser(str(txt_path))
-            
-        except Exception:
-            return GenericTextParser(str(txt_path))
+    def _get_text(self, pdf_path: Path) -> Optional[str]:
+        """Return the text of a PDF file, from the cache when its content was already extracted."""
+        if self.cache is None:
+            return self.extract_text(pdf_path)
+        
+        if not pdf_path.exists():
+            print(f"Error: File {pdf_path} does not exist")
+            return None
+        
+        pdf_hash = file_hash(pdf_path)
+        text = self.cache.get_text(pdf_hash)
+        if text is not None:
+            print(f"Using cached text: {pdf_path}")
+            return text
+        
+        text = self.extract_text(pdf_path)
+        if text is not None:
+            self.cache.put_text(pdf_hash, text)
+        return text
+    
+    def _parse(self, parser, text: str) -> BankStatement:
+        """Parse a statement, reusing the cached result for the same text and parser version."""
+        if not self._splits_large_files() or len(parser.lines) < 2 * PARSE_CHUNK_LINES:
+            return parse_with_cache(parser, text, self.cache)
+        
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=self._use_rules) as executor:
+            return parse_with_cache(parser, text, self.cache, executor)
     
-    def _fallback_text_to_csv(self, txt_path: Path) -> Optional[Path]:
+    def _use_rules(self):
+        """Set the rule table in this process, files may be converted in worker processes."""
+        if self.rules is not None:
+            from parsers.sg_parser import use_rules
+            use_rules(self.rules)
+    
+    def _fallback_text_to_csv(self, text: str, csv_path: Path) -> Optional[Path]:
         """
         Fallback method for basic text to CSV conversion.
         
         Args:
-            txt_path: Path to the text file
+            text: Text extracted from the PDF
+            csv_path: Path of the CSV file to generate
             
         Returns:
             Path to the generated CSV file, or None if conversion failed
         """
-        csv_path = txt_path.with_suffix('.csv')
-        
         try:
-            with open(txt_path, 'r', encoding='utf-8') as txt_file:
-                content = txt_file.read()
-            
             with open(csv_path, 'w', encoding='utf-8') as csv_file:
                 # Write CSV header
                 csv_file.write("Date,Description,Amount,Balance\n")
                 
                 # Basic conversion - write raw text
-                lines = content.strip().split('\n')
+                lines = text.strip().split('\n')
                 for line in lines:
                     if line.strip():
                         # Escape quotes and commas for CSV
@@ -201,52 +350,145 @@ class PDF2CSVConverter:
             return csv_path
             
         except Exception as e:
-            print(f"Error in fallback processing {txt_path}: {e}")
+            print(f"Error in fallback processing {csv_path}: {e}")
             return None
     
-    def merge_csv_files(self, csv_files: List[Path], output_path: Path) -> bool:
+    def convert_file(self, pdf_file: str) -> Optional[ConversionResult]:
         """
-        Merge multiple CSV files into a single file.
+        Convert a single PDF file to CSV.
         
         Args:
-            csv_files: List of CSV file paths to merge
-            output_path: Path for the merged output file
+            pdf_file: PDF file path
             
         Returns:
-            True if successful, False otherwise
+            The conversion result, or None if conversion failed
         """
-        if not csv_files:
-            print("No CSV files to merge")
-            return False
+        return self._convert_file(Path(pdf_file).resolve(), NULL_PROFILE)
+    
+    def _profile_file(self, pdf_file: str):
+        """Convert a single PDF file, timing its stages. Returns (result, profile)."""
+        pdf_path = Path(pdf_file).resolve()
+        profile = FileProfile(str(pdf_path))
+        return self._convert_file(pdf_path, profile), profile
+    
+    def _convert_file(self, pdf_path: Path, profile) -> Optional[ConversionResult]:
+        """Convert a single PDF file, recording the time of each stage in profile."""
+        print(f"\nProcessing: {pdf_path}")
+        self._use_rules()
         
-        try:
-            with open(output_path, 'w', newline='', encoding='utf-8') as merged_file:
-                writer = csv.writer(merged_file)
-                header_written = False
-                
-                for csv_file in csv_files:
-                    if not csv_file.exists():
-                        print(f"Warning: CSV file {csv_file} does not exist, skipping")
-                        continue
-                    
-                    with open(csv_file, 'r', encoding='utf-8') as f:
-                        reader = csv.reader(f)
-                        
-                        for i, row in enumerate(reader):
-                            # Write header only once
-                            if i == 0:  # Header line
-                                if not header_written:
-                                    writer.writerow(row)
-                                    header_written = True
-                            else:  # Data lines
-                                writer.writerow(row)
-            
-            print(f"Successfully merged {len(csv_files)} files into {output_path}")
-            return True
+        if self.stream:
+            return self._stream_file_to_csv(pdf_path, pdf_path.with_suffix('.csv'), profile)
+        
+        # Extract text in memory
+        with profile.stage('extract'):
+            text = self._get_text(pdf_path)
+        if text is None:
+            return None
+        
+        if self.keep_text:
+            self._write_text(text, pdf_path.with_suffix('.txt'))
+        
+        # Convert text to CSV
+        return self._process_text_to_csv(text, pdf_path.with_suffix('.csv'), profile)
+    
+    def _stream_file_to_csv(self, pdf_path: Path, csv_path: Path,
+                            profile=NULL_PROFILE) -> Optional[ConversionResult]:
+        """
+        Convert a PDF file reading the pdftotext output as it is produced.
+        
+        Only one transaction is held in memory at a time. The CSV is written to
+        a temporary file, which replaces csv_path once the conversion succeeded.
+        Extraction, parsing and writing overlap, they are profiled as 'parse'.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            csv_path: Path of the CSV file to generate
+            profile: Profile recording the time of each stage
+        
+        Returns:
+            The conversion result (its statement has no transactions), or None if conversion failed
+        """
+        if not pdf_path.exists():
+            print(f"Error: File {pdf_path} does not exist")
+            return None
+        
+        with tempfile.NamedTemporaryFile('w', dir=csv_path.parent, suffix='.tmp', delete=False,
+                                         newline='', encoding='utf-8') as csv_file:
+            tmp_path = Path(csv_file.name)
+            try:
+                with tempfile.TemporaryFile() as stderr, profile.stage('parse'):
+                    process = subprocess.Popen(pdftotext_command(pdf_path), stdout=subprocess.PIPE,
+                                               stderr=stderr, encoding='utf-8', errors='replace')
+                    with process.stdout:
+                        try:
+                            parser = detect_stream_parser(process.stdout)
+                            statement, count = stream_statement_csv(csv_file, parser)
+                        finally:
+                            # Lines after the end of the statement are not parsed, read them
+                            # so pdftotext does not fail on a closed pipe
+                            while process.stdout.read(64 * 1024):
+                                pass
+                    returncode = process.wait()
+                    stderr.seek(0)
+                    error_details = stderr.read().decode('utf-8', errors='replace')
+            except Exception as e:
+                print(f"Error converting {pdf_path}: {e}")
+                csv_file.close()
+                os.unlink(tmp_path)
+                return None
+        
+        if returncode != 0:
+            print(f"Error converting {pdf_path}: pdftotext exited with status {returncode}")
+            if error_details:
+                print(f"Error details: {error_details}")
+            os.unlink(tmp_path)
+            return None
+        
+        if profile:
+            profile.parser = type(parser).__name__
+            profile.transactions = count
+        
+        print(f"  Bank: {statement.bank_name}")
+        print(f"  Account: {statement.account_number}")
+        print(f"  Period: {statement.get_date_range_str()}")
+        print(f"  Transactions: {count}")
+        
+        if replace_if_changed(tmp_path, csv_path):
+            print(f"Successfully created CSV: {csv_path}")
+        else:
+            print(f"CSV unchanged: {csv_path}")
+        return ConversionResult(csv_path, statement, type(parser))
+    
+    def _convert_files(self, pdf_files: List[str]) -> Iterator[Optional[ConversionResult]]:
+        """
+        Convert PDF files, spreading them across a process pool when jobs > 1.
+        
+        Args:
+            pdf_files: List of PDF file paths
             
-        except Exception as e:
-            print(f"Error merging CSV files: {e}")
-            return False
+        Yields:
+            One conversion result (or None on failure) per input file, in input order
+        """
+        if self.profile_report is None:
+            yield from self._map(self.convert_file, pdf_files)
+            return
+        
+        # Profiles are filled in the workers and collected here, in input order
+        for result, profile in self._map(self._profile_file, pdf_files):
+            self.profile_report.add(profile)
+            yield result
+    
+    def _map(self, function, pdf_files: List[str]) -> Iterator:
+        """Apply function to every file, in a process pool when jobs > 1, in input order."""
+        jobs = min(self.jobs, len(pdf_files))
+        if jobs <= 1:
+            for pdf_file in pdf_files:
+                yield function(pdf_file)
+            return
+        
+        with multiprocessing.Pool(processes=jobs,
+                                  maxtasksperchild=self.max_tasks_per_worker) as pool:
+            yield from pool.imap(function, pdf_files)
     
     def process_files(self, pdf_files: List[str]) -> bool:
         """
@@ -256,7 +498,8 @@ class PDF2CSVConverter:
             pdf_files: List of PDF file paths
             
         Returns:
-            True if all files were processed successfully, False otherwise
+            True if all files were processed successfully (and, with verify,
+            their balances reconcile), False otherwise
         """
         if not self.check_pdftotext_available():
             print("Error: pdftotext is not available. Please install poppler-utils:")
@@ -264,34 +507,144 @@ class PDF2CSVConverter:
             print("  CentOS/RHEL/Fedora: sudo yum install poppler-utils")
             return False
         
-        csv_files = []
+        if self.manifest is not None:
+            parser_versions = self._parser_versions()
+            pdf_files = self._changed_files(pdf_files, parser_versions)
+            if not pdf_files:
+                self._save_state()
+                return True
+        
         success_count = 0
+        merge_sink = None
+        if self.merge_output:
+            merge_path = Path(self.merge_output).resolve()
+            merge_sink = MergeSink(merge_path, sort_by=self.sort_by, dedupe=self.dedupe,
+                                   duplicates_path=merge_path.with_suffix('.duplicates.csv'))
+        sqlite_sink = SQLiteSink(Path(self.sqlite_output).resolve()) if self.sqlite_output else None
+        verifier = BalanceVerifier() if self.verify else None
         
-        for pdf_file in pdf_files:
-            pdf_path = Path(pdf_file).resolve()
-            print(f"\nProcessing: {pdf_path}")
-            
-            # Convert PDF to text
-            txt_path = self.convert_pdf_to_text(pdf_path)
-            if txt_path is None:
-                continue
-            
-            # Convert text to CSV
-            csv_path = self._process_text_to_csv(txt_path)
-            if csv_path is None:
-                continue
-            
-            csv_files.append(csv_path)
-            success_count += 1
+        try:
+            # Results come back in input order, so the merge stays deterministic
+            for pdf_file, result in zip(pdf_files, self._convert_files(pdf_files)):
+                if result is None:
+                    continue
+                
+                success_count += 1
+                if self.manifest is not None:
+                    self.manifest.record(Path(pdf_file), result.csv_path, parser_versions)
+                
+                if merge_sink is None and sqlite_sink is None and verifier is None:
+                    continue
+                if result.statement is None:
+                    print(f"Warning: {result.csv_path} was created by the fallback "
+                          f"conversion and is not merged, stored or verified")
+                    continue
+                if verifier is not None:
+                    with self._last_profile().stage('verify'):
+                        verifier.add(result.statement, pdf_file)
+                if merge_sink is not None:
+                    with self._last_profile().stage('merge'):
+                        merge_sink.add(result.statement, result.parser_class, pdf_file)
+                if sqlite_sink is not None:
+                    with self._last_profile().stage('sqlite'):
+                        sqlite_sink.add(result.statement, result.parser_class,
+                                        str(Path(pdf_file).resolve()))
+        finally:
+            if merge_sink is not None:
+                merge_sink.close()
+            if sqlite_sink is not None:
+                sqlite_sink.close()
         
         # Handle merge option
-        if self.merge_output and csv_files:
-            merge_path = Path(self.merge_output).resolve()
-            if self.merge_csv_files(csv_files, merge_path):
-                print(f"\nMerged output saved to: {merge_path}")
+        if merge_sink is not None:
+            if merge_sink.statement_count:
+                print(f"\nMerged {merge_sink.statement_count} statements into: {merge_sink.output_path}")
+                if merge_sink.duplicate_count:
+                    print(f"Skipped {merge_sink.duplicate_count} duplicate transactions, "
+                          f"listed in: {merge_sink.duplicates_path}")
+            else:
+                print("\nNo statements to merge")
+        
+        if sqlite_sink is not None:
+            print(f"\nStored {sqlite_sink.statement_count} statements "
+                  f"({sqlite_sink.transaction_count} transactions) in: {sqlite_sink.database_path}")
+        
+        balances_ok = True
+        if verifier is not None:
+            discrepancies = verifier.finish()
+            balances_ok = not discrepancies
+            print(f"\nVerified the balances of {len(verifier.checks)} statements: "
+                  f"{len(discrepancies)} with discrepancies")
+            for check in discrepancies:
+                for problem in check.problems:
+                    print(f"  {check.source}: {problem}")
+            if verifier.unverified_count:
+                print(f"  {verifier.unverified_count} statements could not be verified "
+                      f"(opening or closing balance unknown)")
+        
+        self._save_state()
+        
+        if self.profile_report is not None:
+            self.profile_report.write(Path(self.profile_output))
+            print(f"\nProfile written to: {self.profile_output}")
         
         print(f"\nProcessing complete. Successfully processed {success_count}/{len(pdf_files)} files.")
-        return success_count == len(pdf_files)
+        return success_count == len(pdf_files) and balances_ok
+
+    
+    def _parser_versions(self) -> str:
+        """Versions of the registered parsers: the files converted by other versions are converted again."""
+        self._use_rules()
+        return ' '.join(f"{parser_class.__name__}:{shared_parser(parser_class).cache_version()}"
+                        for parser_class in registered_parsers())
+    
+    def _changed_files(self, pdf_files: List[str], version: str) -> List[str]:
+        """Return the files that are new or changed since they were recorded in the manifest."""
+        changed = [pdf_file for pdf_file in pdf_files
+                   if not Path(pdf_file).exists() or self.manifest.changed(Path(pdf_file), version)]
+        skipped = len(pdf_files) - len(changed)
+        if skipped:
+            print(f"Skipped {skipped} unchanged file{'s' if skipped > 1 else ''}")
+        return changed
+    
+    def _save_state(self):
+        """Evict the least recently used cache entries and save the manifest, at the end of a run."""
+        if self.cache is not None:
+            self.cache.evict()
+        if self.manifest is not None:
+            self.manifest.save()
+    
+    def _last_profile(self):
+        """Profile of the file whose result was yielded last by _convert_files."""
+        if self.profile_report is None or not self.profile_report.files:
+            return NULL_PROFILE
+        return self.profile_report.files[-1]
+
+
+def watch_directory(converter: PDF2CSVConverter, directory: Path) -> int:
+    """
+    Convert the PDF files of a directory, then the new or changed ones as they appear.
+    
+    Args:
+        converter: Converter with a manifest, so only new or changed files are converted
+        directory: Directory to watch
+        
+    Returns:
+        Exit code, once interrupted with Ctrl+C
+    """
+    # The watcher is created before the first scan, so no file is missed in between
+    with DirectoryWatcher(directory) as watcher:
+        method = 'inotify' if watcher.uses_inotify else f'polling every {watcher.poll_interval:g}s'
+        print(f"Watching {directory} ({method}), press Ctrl+C to stop")
+        try:
+            while True:
+                files = pdf_files(directory)
+                if files:
+                    converter.process_files(files)
+                watcher.wait()
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+    return 0
 
 
 def main():
@@ -303,6 +656,13 @@ def main():
 Examples:
   %(prog)s statement1.pdf statement2.pdf
   %(prog)s --merge combined.csv *.pdf
+  %(prog)s --merge combined.csv --sort-by date --dedupe *.pdf
+  %(prog)s --sqlite statements.sqlite *.pdf
+  %(prog)s --verify *.pdf
+  %(prog)s --jobs 4 *.pdf
+  %(prog)s --pages-per-range 20 annual.pdf
+  %(prog)s --stream huge.pdf
+  %(prog)s --watch statements/
   %(prog)s --help
   %(prog)s --version
         """
@@ -326,16 +686,197 @@ Examples:
         help='Merge all converted files into a single CSV file'
     )
     
+    parser.add_argument(
+        '--merge-only',
+        action='store_true',
+        help='With --merge, only write the merged file, not one CSV file per PDF'
+    )
+    
+    parser.add_argument(
+        '--sort-by',
+        choices=SORT_KEYS,
+        help='With --merge, sort the merged rows by transaction date, or by account then date '
+             '(default: the order of the files)'
+    )
+    
+    parser.add_argument(
+        '--dedupe',
+        action='store_true',
+        help='With --merge, skip the transactions already merged from an overlapping statement '
+             '(they are listed in OUTPUT_FILE with a .duplicates.csv suffix)'
+    )
+    
+    parser.add_argument(
+        '--sqlite',
+        metavar='DATABASE',
+        help='Also store statements and transactions in a SQLite database; '
+             'importing a statement again replaces it'
+    )
+    
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Check that the transactions of each statement add up to its closing balance '
+             'and that consecutive statements of an account follow on; exits with status 1 '
+             'on a discrepancy'
+    )
+    
+    parser.add_argument(
+        '--rules',
+        metavar='FILE',
+        help='JSON rule table giving the category and direction (credit or debit) of the '
+             'operations, instead of the built-in one'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        metavar='N',
+        help='Number of files converted in parallel (default: CPU count)'
+    )
+    
+    parser.add_argument(
+        '--max-tasks-per-worker',
+        type=int,
+        metavar='N',
+        default=DEFAULT_MAX_TASKS_PER_WORKER,
+        help=f'Replace a worker process after N files (default: {DEFAULT_MAX_TASKS_PER_WORKER})'
+    )
+    
+    parser.add_argument(
+        '--pages-per-range',
+        type=int,
+        metavar='N',
+        default=DEFAULT_PAGES_PER_RANGE,
+        help='Extract PDFs longer than N pages in ranges of N pages in parallel, and parse '
+             'large statements in chunks, when files are not already converted in parallel; '
+             '0 disables it (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Parse the pdftotext output as it is produced and write each CSV one transaction '
+             'at a time, so memory use stays flat (no cache, cannot be combined with --merge '
+             'or --keep-text)'
+    )
+    
+    parser.add_argument(
+        '--keep-text',
+        action='store_true',
+        help='Also write the extracted text (.txt) next to each PDF, for debugging'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        metavar='DIR',
+        default=str(default_cache_dir()),
+        help='Cache extracted text and parsed statements in DIR (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        metavar='MB',
+        default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+        help='Maximum cache size, least recently used entries are evicted (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the cache'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only convert files that are new or changed since their last conversion'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        metavar='DIR',
+        help='Convert the PDF files of DIR, then new or changed ones as they appear (implies --incremental)'
+    )
+    
+    parser.add_argument(
+        '--manifest',
+        metavar='FILE',
+        help='Record of converted files used by --incremental and --watch (default: <cache dir>/manifest.json)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        metavar='OUTPUT_FILE',
+        help='Write the time spent in each conversion stage of every file to a JSON report'
+    )
+    
     args = parser.parse_args()
     
     # Check if files were provided
-    if not args.files:
+    if not args.files and not args.watch:
         parser.print_help()
         print("\nError: No PDF files specified")
         return 1
     
     # Create converter instance
-    converter = PDF2CSVConverter(merge_output=args.merge)
+    if args.merge_only and not args.merge:
+        parser.error("--merge-only requires --merge")
+    if args.sort_by and not args.merge:
+        parser.error("--sort-by requires --merge")
+    if args.dedupe and not args.merge:
+        parser.error("--dedupe requires --merge")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_tasks_per_worker < 1:
+        parser.error("--max-tasks-per-worker must be at least 1")
+    if args.pages_per_range < 0:
+        parser.error("--pages-per-range cannot be negative")
+    if args.stream and (args.merge or args.keep_text or args.sqlite or args.verify):
+        # They need the whole statement or text, which streaming never holds
+        parser.error("--stream cannot be combined with --merge, --sqlite, --verify or --keep-text")
+    if args.watch and args.files:
+        parser.error("--watch takes a directory, not a list of files")
+    if args.watch and not Path(args.watch).is_dir():
+        parser.error(f"--watch: {args.watch} is not a directory")
+    if (args.incremental or args.watch) and args.merge:
+        # The merged file would only hold the statements of the new files
+        parser.error("--merge cannot be combined with --incremental or --watch")
+    
+    rules = None
+    if args.rules:
+        try:
+            rules = RuleSet.from_file(Path(args.rules))
+        except (OSError, ValueError) as e:
+            parser.error(f"--rules: {e}")
+    
+    cache = None
+    if not args.no_cache and not args.stream:
+        cache = ConversionCache(Path(args.cache_dir), max_size=args.cache_size * 1024 * 1024)
+    
+    manifest = None
+    if args.incremental or args.watch:
+        manifest = Manifest(Path(args.manifest or Path(args.cache_dir) / 'manifest.json'))
+    
+    converter = PDF2CSVConverter(merge_output=args.merge,
+                                 jobs=args.jobs,
+                                 max_tasks_per_worker=args.max_tasks_per_worker,
+                                 keep_text=args.keep_text,
+                                 cache=cache,
+                                 write_csv_files=not args.merge_only,
+                                 profile_output=args.profile,
+                                 manifest=manifest,
+                                 pages_per_range=args.pages_per_range,
+                                 stream=args.stream,
+                                 sqlite_output=args.sqlite,
+                                 sort_by=args.sort_by,
+                                 dedupe=args.dedupe,
+                                 verify=args.verify,
+                                 rules=rules)
+    
+    if args.watch:
+        return watch_directory(converter, Path(args.watch).resolve())
     
     # Process files
     success = converter.process_files(args.files)
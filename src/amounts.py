@@ -0,0 +1,181 @@
+"""
+Fixed-point amount helpers.
+
+Amounts are handled as integer cents, which keeps sums exact and
+avoids float drift over thousands of rows. Parsed values are still
+stored as floats in the models: cents / 100 gives the same float
+as parsing the decimal string.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+
+# Two-digit strings for the cents part of formatted amounts
+_CENTS_DIGITS = tuple(f"{i:02d}" for i in range(100))
+
+# Formatted amounts are memoized, statements repeat the same amounts a lot
+_FORMAT_CACHE_SIZE = 65536
+_format_cache = {}
+# "1,234.56" -> "1 234,56"
+_FRENCH_SEPARATORS = str.maketrans({',': ' ', '.': ','})
+
+# Numbers of a line, by decimal separator of the document (None: either). Thousands are
+# grouped by the other separator or a space, an amount is not part of a word, a date
+# ("01/02/2025"), a reference ("ECH/150725") or a longer number.
+_AMOUNT_BOUNDARY_BEFORE = r'(?<![\w.,/:\-])[+-]?'
+_AMOUNT_BOUNDARY_AFTER = r'(?![\w/:]|[.,]\d)'
+_AMOUNT_BODIES = {
+    '.': r'\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d{1,3}(?:[ \u00a0]\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?',
+    ',': r'\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d{1,3}(?:[ \u00a0]\d{3})+(?:,\d{1,2})?|\d+(?:,\d{1,2})?',
+    None: r'\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?'
+          r'|\d{1,3}(?:[ \u00a0]\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?',
+}
+_AMOUNT_RES = {separator: re.compile(_AMOUNT_BOUNDARY_BEFORE + '(?:' + body + ')' + _AMOUNT_BOUNDARY_AFTER)
+               for separator, body in _AMOUNT_BODIES.items()}
+
+
+def parse_french_cents(text: str) -> int:
+    """
+    Parse a French formatted amount into cents.
+    
+    Dots and spaces are thousands separators, the comma is the decimal
+    separator: "1.234,56", "1 234,56" and "1234,5" are all accepted.
+    """
+    text = text.replace('.', '').replace(' ', '')
+    if text[-3:-2] == ',' and text[-2:].isdigit():
+        # Usual case, two decimals: the digits without the comma are the cents
+        return int(text.replace(',', '', 1))
+    return _split_cents(text.replace('\u00a0', ''), ',')
+
+
+def parse_amount_cents(text: str, decimal_separator: Optional[str] = None) -> int:
+    """
+    Parse an amount written with '.' or ',' as decimal separator into cents.
+    
+    Args:
+        text: Amount such as "1,234.56", "1.234,56", "1 234" or "-12,5"
+        decimal_separator: '.' or ',' when known for the document; otherwise the
+                           last separator is the decimal one if 1 or 2 digits follow it
+    
+    Raises:
+        ValueError: if text is not a number
+    """
+    text = text.replace(' ', '').replace('\u00a0', '')
+    
+    if decimal_separator is None:
+        decimal_separator = ''
+        last = max(text.rfind('.'), text.rfind(','))
+        if last >= 0 and 1 <= len(text) - last - 1 <= 2:
+            decimal_separator = text[last]
+    
+    thousands_separator = ',' if decimal_separator == '.' else '.'
+    if not decimal_separator:
+        text = text.replace(',', '')
+    text = text.replace(thousands_separator, '')
+    return _split_cents(text, decimal_separator)
+
+
+def _split_cents(text: str, decimal_separator: str) -> int:
+    """Convert "[-]units[<separator>decimals]" without thousands separators to cents."""
+    negative = text.startswith('-')
+    if negative or text.startswith('+'):
+        text = text[1:]
+    
+    units, _, decimals = text.partition(decimal_separator) if decimal_separator else (text, '', '')
+    if not units.isdigit() or (decimals and not decimals.isdigit()) or len(decimals) > 2:
+        raise ValueError(f"Invalid amount: {text!r}")
+    
+    cents = int(units) * 100 + (int(decimals.ljust(2, '0')) if decimals else 0)
+    return -cents if negative else cents
+
+
+def to_cents(value: float) -> int:
+    """Convert a float amount to integer cents."""
+    return round(value * 100)
+
+
+def format_french_cents(cents: int) -> str:
+    """Format cents in the French bank format: "1 234,56", "-0,05"."""
+    if cents < 0:
+        return '-' + format_french_cents(-cents)
+    return f"{cents // 100:_},{_CENTS_DIGITS[cents % 100]}".replace('_', ' ')
+
+
+def format_french_amount(value: float) -> str:
+    """
+    Format a float amount in the French bank format ("1 234,56").
+    
+    Same output as f"{value:,.2f}" with French separators, rounding included
+    (1.115 gives "1,11", -0.004 gives "-0,00"), memoized.
+    """
+    if not value:
+        # 0.0 and -0.0 are the same dictionary key but not the same text
+        return f"{value:,.2f}".translate(_FRENCH_SEPARATORS)
+    formatted = _format_cache.get(value)
+    if formatted is None:
+        if len(_format_cache) >= _FORMAT_CACHE_SIZE:
+            _format_cache.clear()
+        formatted = _format_cache[value] = f"{value:,.2f}".translate(_FRENCH_SEPARATORS)
+    return formatted
+
+
+class AmountScanner:
+    """
+    Find the amounts of a line in a single regex pass, in the number format of a document.
+    
+    Each number is found once, whatever its format. A document writes its
+    amounts one way, "1,234.56" or "1.234,56": the decimal separator is
+    set per document (see infer_decimal_separator), and only numbers in
+    that format are amounts. While it is unknown, both formats are read,
+    the last separator being the decimal one when 1 or 2 digits follow it.
+    """
+    
+    def __init__(self, decimal_separator: Optional[str] = None):
+        self.decimal_separator = decimal_separator
+    
+    @property
+    def decimal_separator(self) -> Optional[str]:
+        """'.', ',' or None when unknown."""
+        return self._decimal_separator
+    
+    @decimal_separator.setter
+    def decimal_separator(self, separator: Optional[str]):
+        self._decimal_separator = separator
+        self._regex = _AMOUNT_RES[separator]
+    
+    def infer_decimal_separator(self, lines: Iterable[str]) -> Optional[str]:
+        """
+        Set the decimal separator from the amounts of a sample of lines, unless it is known.
+        
+        Each amount with 1 or 2 decimals votes for its separator, the majority wins.
+        
+        Returns:
+            The decimal separator, None if the sample does not tell
+        """
+        if self._decimal_separator is None:
+            votes = {'.': 0, ',': 0}
+            for line in lines:
+                for match in _AMOUNT_RES[None].finditer(line):
+                    # The separator before the 1 or 2 decimals
+                    tail = match.group()[-3:]
+                    separator = tail[1] if tail[1:2] in votes else tail[0]
+                    if separator in votes:
+                        votes[separator] += 1
+            if votes['.'] != votes[',']:
+                self.decimal_separator = max(votes, key=votes.get)
+        return self._decimal_separator
+    
+    def scan(self, line: str) -> List[Tuple[int, int, int]]:
+        """Return the (start, end, cents) of the amounts of a line, from left to right."""
+        separator = self._decimal_separator
+        return [(match.start(), match.end(), parse_amount_cents(match.group(), separator))
+                for match in self._regex.finditer(line)]
+    
+    def amounts(self, line: str) -> List[float]:
+        """Return the amounts of a line, from left to right."""
+        return [cents / 100 for _, _, cents in self.scan(line)]
+    
+    def remove(self, line: str) -> str:
+        """Return the line without its amounts."""
+        return self._regex.sub('', line)
@@ -0,0 +1,164 @@
+"""
+Asynchronous conversion API, for embedding the converter in an asyncio service.
+
+pdftotext runs through asyncio.create_subprocess_exec, so the event loop is
+never blocked by a conversion. Parsing, hashing and cache access are CPU or
+disk bound: they run in an executor (the loop default thread pool, or any
+executor given, e.g. a ProcessPoolExecutor). At most `concurrency` files are
+converted at the same time, which also bounds the memory held by texts.
+
+Example:
+    async for statement in convert_many(paths, concurrency=4):
+        store(statement)
+
+When stopping before the end, close the iterator (contextlib.aclosing) so the
+remaining conversions are cancelled right away rather than when it is garbage
+collected.
+
+PDF2CSVConverter (the command line) shares the pdftotext command, the parser
+detection and the cached parse with this module (see conversion.py), so both
+give the same statements. It keeps its own process pool: it returns results
+in input order for a deterministic merge, writes the CSV files, extracts and
+parses large files in pieces, streams huge ones and recycles its workers.
+"""
+
+import asyncio
+import os
+from contextlib import aclosing
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from cache import ConversionCache, file_hash
+from conversion import parse_text, pdftotext_command
+from models import BankStatement
+
+
+async def pdftotext_available() -> bool:
+    """Check if pdftotext is available in the system."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'pdftotext', '-v', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    except FileNotFoundError:
+        return False
+    _, stderr = await process.communicate()
+    return process.returncode == 0 or b'pdftotext' in stderr.lower()
+
+
+async def extract_text(pdf_path: Path) -> Optional[str]:
+    """
+    Extract the text of a PDF file with pdftotext.
+    
+    Args:
+        pdf_path: Path to the PDF file
+    
+    Returns:
+        The extracted text, or None if extraction failed
+    """
+    if not pdf_path.exists():
+        print(f"Error: File {pdf_path} does not exist")
+        return None
+    
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *pdftotext_command(pdf_path), stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE)
+    except OSError as e:
+        print(f"Unexpected error converting {pdf_path}: {e}")
+        return None
+    
+    try:
+        stdout, stderr = await process.communicate()
+    except BaseException:
+        # Cancelled: do not leave pdftotext running
+        if process.returncode is None:
+            process.kill()
+        raise
+    
+    if process.returncode != 0:
+        print(f"Error converting {pdf_path}: pdftotext exited with status {process.returncode}")
+        if stderr:
+            print(f"Error details: {stderr.decode('utf-8', errors='replace')}")
+        return None
+    
+    return stdout.decode('utf-8', errors='replace')
+
+
+async def convert_each(pdf_paths: Iterable, concurrency: Optional[int] = None,
+                       executor: Optional[Executor] = None,
+                       cache: Optional[ConversionCache] = None
+                       ) -> AsyncIterator[Tuple[Path, Optional[BankStatement]]]:
+    """
+    Convert PDF files concurrently, yielding each one as soon as it is done.
+    
+    Args:
+        pdf_paths: PDF file paths
+        concurrency: Maximum number of files converted at the same time (defaults to the CPU count)
+        executor: Executor running the parsers (None uses the loop default executor)
+        cache: Cache for extracted text and parsed statements (None disables caching)
+    
+    Yields:
+        (pdf_path, statement) in completion order, statement is None if the conversion failed
+    """
+    semaphore = asyncio.Semaphore(concurrency or os.cpu_count() or 1)
+    
+    async def convert(pdf_path: Path):
+        async with semaphore:
+            return pdf_path, await _convert_file(pdf_path, executor, cache)
+    
+    tasks = [asyncio.create_task(convert(Path(pdf_path).resolve())) for pdf_path in pdf_paths]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # The consumer stopped early or failed: stop the remaining conversions, and
+        # wait for them so their pdftotext processes are killed before returning
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def convert_many(pdf_paths: Iterable, concurrency: Optional[int] = None,
+                       executor: Optional[Executor] = None,
+                       cache: Optional[ConversionCache] = None) -> AsyncIterator[BankStatement]:
+    """
+    Convert PDF files concurrently, yielding their statements as each file completes.
+    
+    Files that cannot be converted are reported and skipped, use convert_each()
+    to know which file a statement comes from.
+    """
+    async with aclosing(convert_each(pdf_paths, concurrency, executor, cache)) as results:
+        async for _, statement in results:
+            if statement is not None:
+                yield statement
+
+
+async def _convert_file(pdf_path: Path, executor: Optional[Executor],
+                        cache: Optional[ConversionCache]) -> Optional[BankStatement]:
+    """Extract and parse one PDF file."""
+    loop = asyncio.get_running_loop()
+    
+    pdf_hash = None
+    text = None
+    try:
+        if cache is not None and pdf_path.exists():
+            pdf_hash = await loop.run_in_executor(executor, file_hash, pdf_path)
+            text = await loop.run_in_executor(executor, cache.get_text, pdf_hash)
+    
+        if text is None:
+            text = await extract_text(pdf_path)
+            if text is None:
+                return None
+            if pdf_hash is not None:
+                await loop.run_in_executor(executor, cache.put_text, pdf_hash, text)
+    except OSError as e:
+        # An unreadable file or cache fails this file only, not the whole iteration
+        print(f"Error reading {pdf_path}: {e}")
+        return None
+    
+    try:
+        _, statement = await loop.run_in_executor(executor, parse_text, text, cache)
+    except Exception as e:
+        print(f"Error parsing {pdf_path}: {e}")
+        return None
+    return statement
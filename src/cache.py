@@ -0,0 +1,156 @@
+"""
+Local cache for extracted text and parsed statements.
+
+The cache is content-addressed and has two tiers:
+- Tier 1 stores pdftotext output, keyed by the SHA-256 of the PDF file.
+- Tier 2 stores parsed BankStatement objects, keyed by the SHA-256 of the
+  text together with the parser class name and the parser version (see
+  BaseStatementParser.cache_version, which includes the rule table of the
+  parsers classifying operations).
+
+Every entry is a file. A cache hit refreshes its modification time, so
+evicting the oldest files first gives least-recently-used eviction.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from models import BankStatement
+
+
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024  # 1 GB
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory (~/.cache/pdf2csv)."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'pdf2csv'
+
+
+def file_hash(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ConversionCache:
+    """Two-tier cache for pdftotext output and parsed statements."""
+    
+    def __init__(self, cache_dir: Path, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Directory holding the cache entries (created if needed)
+            max_size: Maximum total size in bytes kept by evict()
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.text_dir = self.cache_dir / 'text'
+        self.statement_dir = self.cache_dir / 'statements'
+    
+    def get_text(self, pdf_hash: str) -> Optional[str]:
+        """Return the cached text of a PDF, or None on a cache miss."""
+        data = self._read(self._text_path(pdf_hash))
+        return data.decode('utf-8') if data is not None else None
+    
+    def put_text(self, pdf_hash: str, text: str):
+        """Store the text extracted from a PDF."""
+        self._write(self._text_path(pdf_hash), text.encode('utf-8'))
+    
+    def get_statement(self, text_digest: str, parser) -> Optional[BankStatement]:
+        """Return the statement cached for this text and parser, or None on a cache miss."""
+        path = self._statement_path(text_digest, parser)
+        data = self._read(path)
+        if data is None:
+            return None
+        
+        try:
+            return pickle.loads(data)
+        except Exception:
+            # Entry written by an incompatible version of the models
+            self._remove(path)
+            return None
+    
+    def put_statement(self, text_digest: str, parser, statement: BankStatement):
+        """Store the statement parsed from a text by a parser."""
+        data = pickle.dumps(statement, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(self._statement_path(text_digest, parser), data)
+    
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_size.
+        
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        total_size = 0
+        for tier_dir in (self.text_dir, self.statement_dir):
+            if not tier_dir.exists():
+                continue
+            for path in tier_dir.glob('*/*'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+        
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+            removed += 1
+        
+        return removed
+    
+    def _text_path(self, pdf_hash: str) -> Path:
+        return self.text_dir / pdf_hash[:2] / f"{pdf_hash}.txt"
+    
+    def _statement_path(self, text_digest: str, parser) -> Path:
+        parser_class = type(parser).__name__
+        version = parser.cache_version()
+        key = hashlib.sha256(f"{text_digest}:{parser_class}:{version}".encode('utf-8')).hexdigest()
+        return self.statement_dir / key[:2] / f"{key}.pickle"
+    
+    def _read(self, path: Path) -> Optional[bytes]:
+        """Read an entry and mark it as recently used."""
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+    
+    def _write(self, path: Path, data: bytes):
+        """Write an entry atomically, so concurrent workers never see partial files."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            print(f"Warning: could not write cache entry {path}: {e}")
+    
+    def _remove(self, path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
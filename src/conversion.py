@@ -0,0 +1,189 @@
+"""
+Conversion steps shared by the synchronous and asynchronous converters.
+
+Large PDFs can be extracted in page ranges, one pdftotext process per
+range: pdftotext ends every page with a form feed, so the texts of the
+ranges joined in order are the text of the whole document. Large
+statements can be parsed in chunks on an executor: the filtered lines are
+only cut before a line starting a transaction, so a transaction continued
+on the next page stays in one chunk and the result is the one of a single
+parse.
+"""
+
+import re
+import subprocess
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from cache import ConversionCache, text_hash
+from models import BankStatement, BankTransaction
+from parsers.registry import detect_parser, shared_parser
+
+
+# Minimum number of filtered lines in a parsed chunk
+PARSE_CHUNK_LINES = 20000
+
+_PAGES_RE = re.compile(r'^Pages:\s+(\d+)', re.MULTILINE)
+
+
+def pdftotext_command(pdf_path: Path, first_page: Optional[int] = None,
+                      last_page: Optional[int] = None) -> list:
+    """
+    Return the pdftotext command writing the layout text of a PDF to stdout ("-").
+    
+    Args:
+        pdf_path: Path to the PDF file
+        first_page: First page to extract (None starts at the first page)
+        last_page: Last page to extract (None ends at the last page)
+    """
+    command = ['pdftotext', '-layout']
+    if first_page is not None:
+        command += ['-f', str(first_page)]
+    if last_page is not None:
+        command += ['-l', str(last_page)]
+    return command + [str(pdf_path), '-']
+
+
+def pdf_page_count(pdf_path: Path) -> Optional[int]:
+    """Return the number of pages of a PDF file with pdfinfo, or None if it cannot be read."""
+    try:
+        result = subprocess.run(['pdfinfo', str(pdf_path)], capture_output=True,
+                                encoding='utf-8', errors='replace', check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    match = _PAGES_RE.search(result.stdout)
+    return int(match.group(1)) if match else None
+
+
+def page_ranges(page_count: int, pages_per_range: int) -> List[Tuple[int, int]]:
+    """
+    Split pages into consecutive ranges.
+    
+    Args:
+        page_count: Number of pages of the document
+        pages_per_range: Maximum number of pages of a range
+    
+    Returns:
+        (first page, last page) of each range, numbered from 1
+    """
+    return [(first, min(first + pages_per_range - 1, page_count))
+            for first in range(1, page_count + 1, pages_per_range)]
+
+
+def transaction_chunks(parser, chunk_lines: int = PARSE_CHUNK_LINES) -> List[List[str]]:
+    """
+    Cut the filtered lines of a parser into chunks that can be parsed separately.
+    
+    A chunk holds at least chunk_lines lines (except the last one) and every
+    chunk but the first starts on a line where parser.starts_transaction()
+    is True. Parsers that cannot be cut give a single chunk.
+    """
+    lines = parser.lines
+    starts_transaction = parser.starts_transaction
+    chunks = []
+    start = 0
+    index = chunk_lines
+    while index < len(lines):
+        if starts_transaction(lines[index]):
+            chunks.append(lines[start:index])
+            start = index
+            index += chunk_lines
+        else:
+            index += 1
+    chunks.append(lines[start:])
+    return chunks
+
+
+def parse_statement(parser, executor: Optional[Executor] = None,
+                    chunk_lines: int = PARSE_CHUNK_LINES) -> BankStatement:
+    """
+    Parse a statement, in chunks on an executor when it is large enough.
+    
+    Args:
+        parser: Parser created on the statement text
+        executor: Executor parsing the chunks after the first one (None parses in one piece)
+        chunk_lines: Minimum number of lines of a chunk
+    
+    Returns:
+        The parsed statement, identical to parser.parse()
+    """
+    chunks = transaction_chunks(parser, chunk_lines) if executor is not None else []
+    if len(chunks) <= 1:
+        return parser.parse()
+    
+    # Every chunk reads dates and amounts in the format the header locks for the document;
+    # without a date in the header, the first transaction locks it: parse in one piece
+    parser.parse_header()
+    document_format = parser.document_format()
+    if document_format[0] is None and len(parser.DATE_FORMATS) > 1:
+        return parser.parse()
+    
+    futures = [executor.submit(_parse_chunk, type(parser), chunk, document_format) for chunk in chunks[1:]]
+    try:
+        # The first chunk is parsed here, with the statement metadata
+        lines = parser.lines
+        parser.lines = chunks[0]
+        try:
+            statement = parser.parse()
+        finally:
+            parser.lines = lines
+        
+        for future in futures:
+            for transaction in future.result():
+                statement.add_transaction(transaction)
+    finally:
+        for future in futures:
+            future.cancel()
+    return statement
+
+
+def _parse_chunk(parser_class: type, lines: List[str],
+                 document_format: Tuple[Optional[str], Optional[str]] = (None, None)
+                 ) -> List[BankTransaction]:
+    """Parse the transactions of a chunk, in an executor worker, in the format of the document."""
+    parser = shared_parser(parser_class)
+    parser.reset()
+    parser.lock_document_format(document_format)
+    return parser.parse_transactions(lines)
+
+
+def parse_with_cache(parser, text: str, cache: Optional[ConversionCache] = None,
+                     executor: Optional[Executor] = None) -> BankStatement:
+    """
+    Parse a statement, reusing the cached result for the same text and parser version.
+    
+    Args:
+        parser: Parser created on text
+        text: Text extracted from the PDF
+        cache: Cache of parsed statements (None disables caching)
+        executor: Executor parsing large statements in chunks (None parses in one piece)
+    
+    Returns:
+        The parsed statement, also set as parser.statement
+    """
+    if cache is None:
+        return parse_statement(parser, executor)
+    
+    text_digest = text_hash(text)
+    statement = cache.get_statement(text_digest, parser)
+    if statement is None:
+        statement = parse_statement(parser, executor)
+        cache.put_statement(text_digest, parser, statement)
+    else:
+        parser.statement = statement
+    return statement
+
+
+def parse_text(text: str, cache: Optional[ConversionCache] = None) -> Tuple[type, BankStatement]:
+    """
+    Detect the parser of a text and parse it.
+    
+    This is a module-level function so it can run in a process pool, the
+    worker reuses its parser instances from one document to the next.
+    
+    Returns:
+        (parser class, statement)
+    """
+    parser = detect_parser(text, shared=True)
+    return type(parser), parse_with_cache(parser, text, cache)
@@ -0,0 +1,246 @@
+"""
+Date parsing for statements.
+
+Parsers try several date formats on each date string, and a statement
+repeats the same few dozen date strings thousands of times. A DateParser
+parses them without strptime and without exceptions:
+- numeric formats (%d/%m/%Y, %m-%d-%y, %Y.%m.%d...) are split on their
+  separator and their fields checked by hand,
+- formats with month names (%d %b %Y, %b %d, %Y...) are matched with a
+  regex and a table of month names,
+- the first format that succeeds in a document is locked and tried first
+  on the next dates (the other formats are still tried, in their order,
+  when it fails),
+- results are memoized, failures included.
+Formats with other directives fall back to strptime.
+
+Each parser instance has its own DateParser, reset before each document
+it parses (see DateParser.reset).
+"""
+
+import re
+from datetime import datetime
+from typing import Callable, Dict, Optional, Sequence
+
+
+# Distinct date strings memoized by a DateParser
+DEFAULT_CACHE_SIZE = 4096
+
+ENGLISH_MONTH_ABBREVIATIONS = {name: number for number, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+ENGLISH_MONTH_NAMES = {name: number for number, name in enumerate(
+    ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august',
+     'september', 'october', 'november', 'december'), 1)}
+
+# Full and abbreviated French month names, with and without accents
+FRENCH_MONTH_NAMES = {
+    'janvier': 1, 'janv': 1,
+    'février': 2, 'fevrier': 2, 'févr': 2, 'fevr': 2, 'fév': 2, 'fev': 2,
+    'mars': 3,
+    'avril': 4, 'avr': 4,
+    'mai': 5,
+    'juin': 6,
+    'juillet': 7, 'juil': 7,
+    'août': 8, 'aout': 8,
+    'septembre': 9, 'sept': 9,
+    'octobre': 10, 'oct': 10,
+    'novembre': 11, 'nov': 11,
+    'décembre': 12, 'decembre': 12, 'déc': 12, 'dec': 12,
+}
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Numeric format: three fields separated by the same character, e.g. "%d/%m/%Y"
+_NUMERIC_FORMAT_RE = re.compile(r'%([dmYy])([/.\-])%([dmYy])\2%([dmYy])')
+# Directives of the formats matched with a regex
+_FORMAT_TOKEN_RE = re.compile(r'%[dmYybB]|\s+|[^%\s]+|%.')
+
+# Digits accepted for each field, like strptime: "%d" takes "5" and "05"
+_FIELD_LENGTHS = {'d': (1, 2), 'm': (1, 2), 'Y': (4, 4), 'y': (2, 2)}
+_FIELD_PATTERNS = {'d': r'(\d{1,2})', 'm': r'(\d{1,2})', 'Y': r'(\d{4})', 'y': r'(\d{2})'}
+
+_MISSING = object()
+
+
+def make_date(year: int, month: int, day: int) -> Optional[datetime]:
+    """Return the date, or None if the fields do not make a valid date."""
+    if not (1 <= year <= 9999 and 1 <= month <= 12 and day >= 1):
+        return None
+    days = _DAYS_IN_MONTH[month]
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        days = 29
+    return datetime(year, month, day) if day <= days else None
+
+
+def parse_dmy(text: str) -> Optional[datetime]:
+    """Parse a "dd/mm/yyyy" date, or return None."""
+    if len(text) != 10 or text[2] != '/' or text[5] != '/':
+        return None
+    day, month, year = text[:2], text[3:5], text[6:]
+    if not (day.isdecimal() and month.isdecimal() and year.isdecimal()):
+        return None
+    return make_date(int(year), int(month), int(day))
+
+
+def _year(field: str, digits: str) -> int:
+    """Return the year of a %Y or %y field; like strptime, 00-68 are 2000-2068."""
+    year = int(digits)
+    if field == 'y':
+        year += 2000 if year < 69 else 1900
+    return year
+
+
+def _numeric_matcher(fields: str, separator: str) -> Callable[[str], Optional[datetime]]:
+    """Return a function parsing dates of three numeric fields, e.g. 'dmY' and '/'."""
+    lengths = [_FIELD_LENGTHS[field] for field in fields]
+    year_field = 'Y' if 'Y' in fields else 'y'
+    
+    def match(text: str) -> Optional[datetime]:
+        parts = text.split(separator)
+        if len(parts) != 3:
+            return None
+        values = {}
+        for field, (shortest, longest), part in zip(fields, lengths, parts):
+            if not (shortest <= len(part) <= longest and part.isdecimal()):
+                return None
+            values[field] = part
+        return make_date(_year(year_field, values[year_field]), int(values['m']), int(values['d']))
+    
+    if fields == 'dmY' and separator == '/':
+        # Only "dd/mm/yyyy" is 10 characters long
+        return lambda text: parse_dmy(text) if len(text) == 10 else match(text)
+    return match
+
+
+def _named_month_matcher(fmt: str, month_names: Optional[Dict[str, int]]
+                         ) -> Optional[Callable[[str], Optional[datetime]]]:
+    """Return a function parsing dates with a month name, None if fmt has other directives."""
+    pattern = []
+    fields = []
+    for token in _FORMAT_TOKEN_RE.findall(fmt):
+        if token in ('%b', '%B'):
+            pattern.append(r'([^\W\d_]+)\.?')
+        elif token[0] == '%' and token[1:] in _FIELD_PATTERNS:
+            pattern.append(_FIELD_PATTERNS[token[1:]])
+        elif token[0] == '%':
+            return None
+        elif token.isspace():
+            pattern.append(r'\s+')
+        else:
+            pattern.append(re.escape(token))
+        if token[0] == '%':
+            fields.append(token[1])
+    if sorted(field.lower() for field in fields) != ['b', 'd', 'y'] or fields.count('b') + fields.count('B') != 1:
+        return None
+    
+    month_field = 'b' if 'b' in fields else 'B'
+    year_field = 'Y' if 'Y' in fields else 'y'
+    if month_names is None:
+        month_names = ENGLISH_MONTH_ABBREVIATIONS if month_field == 'b' else ENGLISH_MONTH_NAMES
+    regex = re.compile(''.join(pattern), re.IGNORECASE)
+    
+    def match(text: str) -> Optional[datetime]:
+        regex_match = regex.fullmatch(text)
+        if regex_match is None:
+            return None
+        values = dict(zip(fields, regex_match.groups()))
+        month = month_names.get(values[month_field].lower())
+        if month is None:
+            return None
+        return make_date(_year(year_field, values[year_field]), month, int(values['d']))
+    
+    return match
+
+
+def _strptime_matcher(fmt: str) -> Callable[[str], Optional[datetime]]:
+    """Return a function parsing dates with strptime, for the formats parsed by neither matcher."""
+    def match(text: str) -> Optional[datetime]:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            return None
+    
+    return match
+
+
+def compile_format(fmt: str, month_names: Optional[Dict[str, int]] = None
+                   ) -> Callable[[str], Optional[datetime]]:
+    """
+    Return a function parsing dates of a strptime format, returning None when they do not match.
+    
+    Args:
+        fmt: strptime format, e.g. "%d/%m/%Y" or "%d %b %Y"
+        month_names: Month numbers by lower-case name for %b and %B
+                     (default: the English abbreviations for %b, full names for %B)
+    """
+    numeric = _NUMERIC_FORMAT_RE.fullmatch(fmt)
+    if numeric:
+        fields = numeric.group(1) + numeric.group(3) + numeric.group(4)
+        if sorted(fields.lower()) == ['d', 'm', 'y'] and fields.count('y') + fields.count('Y') == 1:
+            return _numeric_matcher(fields, numeric.group(2))
+    return _named_month_matcher(fmt, month_names) or _strptime_matcher(fmt)
+
+
+class DateParser:
+    """Parse the dates of a document, trying a list of formats."""
+    
+    def __init__(self, formats: Sequence[str], month_names: Optional[Dict[str, int]] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Compile the formats.
+        
+        Args:
+            formats: strptime formats, in the order they are tried until one is locked
+            month_names: Month numbers by lower-case name for %b and %B (default: English)
+            cache_size: Number of date strings memoized
+        """
+        self.formats = list(formats)
+        self.cache_size = cache_size
+        self._matchers = [compile_format(fmt, month_names) for fmt in self.formats]
+        self._locked = None
+        self._cache = {}
+    
+    @property
+    def locked_format(self) -> Optional[str]:
+        """Format of the first date parsed, tried first on the next ones."""
+        return self.formats[self._locked] if self._locked is not None else None
+    
+    def lock(self, fmt: str):
+        """Try fmt first from now on, e.g. the format locked by another part of the document."""
+        self._locked = self.formats.index(fmt)
+        self._cache.clear()
+    
+    def reset(self):
+        """Unlock the format and forget the parsed dates, before the dates of another document."""
+        self._locked = None
+        self._cache.clear()
+    
+    def parse(self, text: str) -> Optional[datetime]:
+        """
+        Parse a date string.
+        
+        Returns:
+            The date, or None if no format matches
+        """
+        date = self._cache.get(text, _MISSING)
+        if date is not _MISSING:
+            return date
+        
+        stripped = text.strip()
+        date = None
+        if self._locked is not None:
+            date = self._matchers[self._locked](stripped)
+        if date is None:
+            for index, matcher in enumerate(self._matchers):
+                if index == self._locked:
+                    continue
+                date = matcher(stripped)
+                if date is not None:
+                    if self._locked is None:
+                        self._locked = index
+                    break
+        
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[text] = date
+        return date
@@ -0,0 +1,114 @@
+"""
+Transaction fingerprints, to find the transactions present in several statements.
+
+Overlapping statements (a monthly statement and an export "from date X to
+date Y") list the same transactions. A transaction is identified by a
+64-bit fingerprint of its account, date, value date, operation type,
+amounts and its ordinal: the number of identical transactions before it
+in the same statement, so two identical payments of the same day are
+both kept. The description is left out, as exports may word it
+differently.
+
+Fingerprints are kept in FingerprintIndex, an open-addressing hash table
+over an array of 64-bit integers: 16 to 32 bytes per fingerprint,
+against about 70 for a Python set of ints.
+"""
+
+import hashlib
+from array import array
+from typing import Iterable, Iterator, Tuple
+
+from models import BankTransaction
+
+
+# Smallest table of a FingerprintIndex (a power of 2)
+_MIN_SLOTS = 1024
+
+
+def transaction_fingerprint(transaction: BankTransaction, account_number: str = '',
+                            ordinal: int = 0) -> int:
+    """
+    Return the 64-bit fingerprint of a transaction.
+    
+    Args:
+        transaction: Transaction to identify
+        account_number: Account of the statement holding the transaction
+        ordinal: Number of identical transactions before it in the statement
+    """
+    return _digest(_fingerprint_fields(transaction, account_number) + (str(ordinal),))
+
+
+def fingerprint_transactions(transactions: Iterable[BankTransaction], account_number: str = ''
+                             ) -> Iterator[Tuple[int, BankTransaction]]:
+    """Yield (fingerprint, transaction) for the transactions of a statement."""
+    ordinals = {}
+    for transaction in transactions:
+        fields = _fingerprint_fields(transaction, account_number)
+        ordinal = ordinals.get(fields, 0)
+        ordinals[fields] = ordinal + 1
+        yield _digest(fields + (str(ordinal),)), transaction
+
+
+def _fingerprint_fields(transaction: BankTransaction, account_number: str) -> tuple:
+    """Fields identifying a transaction, as strings."""
+    return (account_number,
+            transaction.date.strftime("%Y-%m-%d") if transaction.date else '',
+            transaction.value_date.strftime("%Y-%m-%d") if transaction.value_date else '',
+            transaction.operation_type,
+            # Parsers without debit and credit columns only set the amount
+            repr(transaction.debit), repr(transaction.credit), repr(transaction.amount))
+
+
+def _digest(fields: tuple) -> int:
+    data = '\x1f'.join(fields).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class FingerprintIndex:
+    """Set of 64-bit fingerprints, stored in a hash table with linear probing."""
+    
+    def __init__(self):
+        self._slots = array('Q', [0]) * _MIN_SLOTS
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __contains__(self, fingerprint: int) -> bool:
+        return self._slots[self._find(fingerprint or 1)] != 0
+    
+    def add(self, fingerprint: int) -> bool:
+        """
+        Add a fingerprint.
+        
+        Returns:
+            True if it was added, False if it was already in the index
+        """
+        # 0 marks empty slots
+        fingerprint = fingerprint or 1
+        slot = self._find(fingerprint)
+        if self._slots[slot]:
+            return False
+        
+        self._slots[slot] = fingerprint
+        self._count += 1
+        if self._count * 2 > len(self._slots):
+            self._grow()
+        return True
+    
+    def _find(self, fingerprint: int) -> int:
+        """Return the slot holding fingerprint, or the empty slot where it belongs."""
+        slots = self._slots
+        mask = len(slots) - 1
+        # Fingerprints are uniform hashes, their low bits are a good slot number
+        slot = fingerprint & mask
+        while slots[slot] and slots[slot] != fingerprint:
+            slot = (slot + 1) & mask
+        return slot
+    
+    def _grow(self):
+        old_slots = self._slots
+        self._slots = array('Q', [0]) * (len(old_slots) * 2)
+        for fingerprint in old_slots:
+            if fingerprint:
+                self._slots[self._find(fingerprint)] = fingerprint
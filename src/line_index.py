@@ -0,0 +1,177 @@
+"""
+Memory-mapped text files indexed by line.
+
+MappedText maps a UTF-8 text file and records where each line starts in
+a compact array of offsets (8 bytes per line); a line is only decoded
+when it is read. FilteredLines keeps a subset of those lines as a bitmap
+over the index (1 bit per line), so filtering a document never copies it.
+
+Lines are split on '\n' like str.split('\n'), a '\r' before the '\n' is
+dropped, as when the file is read in text mode.
+"""
+
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+
+_NEWLINE_RE = re.compile(b'\n')
+
+# Lines per entry of the rank table of FilteredLines (8 bytes of bitmap)
+_BLOCK_LINES = 64
+
+
+class MappedText(Sequence):
+    """Lines of a text file, decoded on demand from a read-only memory map."""
+    
+    def __init__(self, path: Path, encoding: str = 'utf-8'):
+        """
+        Map a text file and index its lines.
+        
+        Args:
+            path: Text file
+            encoding: Encoding of the file
+        """
+        self.path = Path(path)
+        self.encoding = encoding
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # An empty file cannot be mapped
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        
+        # Line i is _data[offsets[i]:offsets[i + 1] - 1], the last line ends at the end of the file
+        self._offsets = array('Q', [0])
+        self._offsets.extend(match.end() for match in _NEWLINE_RE.finditer(self._data))
+        self._offsets.append(size + 1)
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self._line(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self._line(index)
+    
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._line(i)
+    
+    def find_line(self, text: str) -> Optional[str]:
+        """Return the first line containing text, found without decoding the file."""
+        position = self._data.find(text.encode(self.encoding))
+        if position < 0:
+            return None
+        return self._line(bisect_right(self._offsets, position) - 1)
+    
+    def close(self):
+        """Unmap the file, lines can no longer be read."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _line(self, i: int) -> str:
+        line = self._data[self._offsets[i]:self._offsets[i + 1] - 1]
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        return line.decode(self.encoding)
+
+
+class FilteredLines(Sequence):
+    """Subset of the lines of a MappedText, stored as a bitmap over its line index."""
+    
+    def __init__(self, text: MappedText, indices: Iterable[int]):
+        """
+        Keep some lines of a text.
+        
+        Args:
+            text: Indexed text
+            indices: Increasing indices of the lines to keep
+        """
+        self.text = text
+        self._bits = bytearray((len(text) + 7) // 8)
+        self._count = 0
+        for i in indices:
+            self._bits[i >> 3] |= 1 << (i & 7)
+            self._count += 1
+        # Kept lines before each block, built on the first random access
+        self._ranks = None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return list(islice(self._iter_from(self._select(start)), stop - start))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("line index out of range")
+        return self.text[self._select(index)]
+    
+    def __iter__(self) -> Iterator[str]:
+        return self._iter_from(0)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (FilteredLines, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def _iter_from(self, line_index: int) -> Iterator[str]:
+        """Yield the kept lines from a line index of the text."""
+        read_line = self.text._line
+        bits = self._bits
+        byte_index = line_index >> 3
+        # Bits before line_index in its byte are skipped
+        byte = bits[byte_index] & (0xFF << (line_index & 7)) if byte_index < len(bits) else 0
+        while True:
+            while byte:
+                low_bit = byte & -byte
+                yield read_line((byte_index << 3) + low_bit.bit_length() - 1)
+                byte ^= low_bit
+            byte_index += 1
+            if byte_index >= len(bits):
+                return
+            byte = bits[byte_index]
+    
+    def _select(self, rank: int) -> int:
+        """Return the line index of the kept line number rank."""
+        if self._ranks is None:
+            self._ranks = array('I')
+            count = 0
+            block_bytes = _BLOCK_LINES // 8
+            for start in range(0, len(self._bits), block_bytes):
+                self._ranks.append(count)
+                count += int.from_bytes(self._bits[start:start + block_bytes], 'little').bit_count()
+        
+        block = bisect_right(self._ranks, rank) - 1
+        remaining = rank - self._ranks[block]
+        byte_index = block * (_BLOCK_LINES // 8)
+        while True:
+            byte = self._bits[byte_index]
+            count = byte.bit_count()
+            if remaining < count:
+                for _ in range(remaining):
+                    byte &= byte - 1
+                return (byte_index << 3) + (byte & -byte).bit_length() - 1
+            remaining -= count
+            byte_index += 1
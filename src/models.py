@@ -5,12 +5,25 @@ This module contains the data structures used to represent
 bank statements and transactions.
 """
 
+import math
+import sys
+from array import array
 from datetime import datetime
-from typing import Optional, List
-from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, List, Union
+from dataclasses import dataclass, field
 
 
-@dataclass
+def intern_label(value: str) -> str:
+    """
+    Intern a categorical string (operation type, category...).
+    
+    Statements repeat the same few labels thousands of times, interning
+    makes every transaction share a single copy of each label.
+    """
+    return sys.intern(value) if value else value
+
+
+@dataclass(slots=True)
 class BankTransaction:
     """Represents a single bank transaction."""
     
@@ -25,6 +38,7 @@ class BankTransaction:
     reference: str = ""
     category: str = ""
     libelle_interbancaire: str = ""  # For special transaction categories like "PAIEMENT CB"
+    detail_lines: List[str] = field(default_factory=list)  # Continuation lines of the description
     
     def __str__(self) -> str:
         date_str = self.date.strftime("%Y-%m-%d") if self.date else "N/A"
@@ -51,7 +65,102 @@ class BankTransaction:
         return ["Date", "Description", "Amount", "Balance", "Reference", "Category"]
 
 
-@dataclass
+class TransactionTable:
+    """
+    Columnar storage for a large number of transactions.
+    
+    Dates are stored as day ordinals and amounts as doubles in arrays,
+    categorical strings are dictionary-encoded. Rows are turned back into
+    BankTransaction objects on access. The time of day of dates is not kept.
+    """
+    
+    _DATE_COLUMNS = ('date', 'value_date')
+    _AMOUNT_COLUMNS = ('amount', 'debit', 'credit', 'balance')
+    _LABEL_COLUMNS = ('operation_type', 'category', 'libelle_interbancaire')
+    _TEXT_COLUMNS = ('description', 'reference')
+    
+    def __init__(self, transactions: Iterable[BankTransaction] = ()):
+        self._dates = {name: array('i') for name in self._DATE_COLUMNS}
+        self._amounts = {name: array('d') for name in self._AMOUNT_COLUMNS}
+        self._label_codes = {name: array('I') for name in self._LABEL_COLUMNS}
+        self._texts = {name: [] for name in self._TEXT_COLUMNS}
+        self._labels = []
+        self._label_index = {}
+        self._detail_lines = []
+        self._detail_offsets = array('I', [0])
+        
+        for transaction in transactions:
+            self.append(transaction)
+    
+    def append(self, transaction: BankTransaction):
+        """Add a transaction at the end of the table."""
+        for name, column in self._dates.items():
+            value = getattr(transaction, name)
+            column.append(value.toordinal() if value is not None else 0)
+        for name, column in self._amounts.items():
+            value = getattr(transaction, name)
+            column.append(value if value is not None else math.nan)
+        for name, column in self._label_codes.items():
+            column.append(self._label_code(getattr(transaction, name)))
+        for name, column in self._texts.items():
+            column.append(getattr(transaction, name))
+        self._detail_lines.extend(transaction.detail_lines)
+        self._detail_offsets.append(len(self._detail_lines))
+    
+    def dates(self) -> array:
+        """Transaction dates as day ordinals (0 when unknown)."""
+        return self._dates['date']
+    
+    def amounts(self, name: str = 'amount') -> array:
+        """Values of an amount column ('amount', 'debit', 'credit' or 'balance'), NaN when unknown."""
+        return self._amounts[name]
+    
+    def __len__(self) -> int:
+        return len(self._dates['date'])
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[BankTransaction, List[BankTransaction]]:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return self._row(index)
+    
+    def __iter__(self) -> Iterator[BankTransaction]:
+        for i in range(len(self)):
+            yield self._row(i)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TransactionTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def _label_code(self, label: str) -> int:
+        code = self._label_index.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._labels.append(intern_label(label))
+            self._label_index[label] = code
+        return code
+    
+    def _row(self, i: int) -> BankTransaction:
+        transaction = BankTransaction()
+        for name, column in self._dates.items():
+            if column[i]:
+                setattr(transaction, name, datetime.fromordinal(column[i]))
+        for name, column in self._amounts.items():
+            if not math.isnan(column[i]):
+                setattr(transaction, name, column[i])
+        for name, column in self._label_codes.items():
+            setattr(transaction, name, self._labels[column[i]])
+        for name, column in self._texts.items():
+            setattr(transaction, name, column[i])
+        transaction.detail_lines = self._detail_lines[self._detail_offsets[i]:self._detail_offsets[i + 1]]
+        return transaction
+
+
+@dataclass(slots=True)
 class BankStatement:
     """Represents a complete bank statement with metadata and transactions."""
     
@@ -66,12 +175,17 @@ class BankStatement:
     opening_balance: Optional[float] = None
     closing_balance: Optional[float] = None
     final_balance: Optional[float] = None
-    transactions: List[BankTransaction] = None
+    transactions: Union[List[BankTransaction], TransactionTable] = None
     
     def __post_init__(self):
         if self.transactions is None:
             self.transactions = []
     
+    def compact(self):
+        """Move the transactions to a columnar TransactionTable to reduce memory use."""
+        if not isinstance(self.transactions, TransactionTable):
+            self.transactions = TransactionTable(self.transactions)
+    
     def add_transaction(self, transaction: BankTransaction):
         """Add a transaction to the statement."""
         self.transactions.append(transaction)
@@ -2,10 +2,28 @@
 Parser modules for different bank statement formats.
 
 This package contains parsers for extracting structured data
-from bank statement text files.
+from bank statement text files. Bank specific parsers are imported
+on first use, see registry.py for the detection of the parser of a document.
 """
 
+import importlib
+
 from .base_parser import BaseStatementParser, GenericTextParser
-from .specific_parsers import FrenchBankParser
+from .registry import (detect_parser, detect_stream_parser, register_parser, registered_parsers,
+                       shared_parser)
+
+# Parsers imported on first access, so importing the package stays cheap
+_LAZY_PARSERS = {
+    'FrenchBankParser': '.specific_parsers',
+    'SocieteGeneraleParser': '.sg_parser',
+}
+
+__all__ = ['BaseStatementParser', 'GenericTextParser', 'FrenchBankParser',
+           'SocieteGeneraleParser', 'detect_parser', 'detect_stream_parser', 'register_parser',
+           'registered_parsers', 'shared_parser']
+
 
-__all__ = ['BaseStatementParser', 'GenericTextParser', 'FrenchBankParser']
+def __getattr__(name):
+    if name in _LAZY_PARSERS:
+        return getattr(importlib.import_module(_LAZY_PARSERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
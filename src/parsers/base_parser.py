@@ -6,11 +6,13 @@ Following the vibe coding approach, parsers can be customized and extended
 based on actual data encountered.
 """
 
+import csv
+import itertools
 import re
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
 import sys
 import os
 
@@ -20,94 +22,377 @@ src_dir = os.path.dirname(current_dir)
 sys.path.append(src_dir)
 
 from models import BankStatement, BankTransaction
+from line_index import FilteredLines, MappedText
+from amounts import AmountScanner
+from dates import DateParser
+
+
+# Currency symbols, removed from descriptions with the amounts
+CURRENCY_SYMBOLS = dict.fromkeys(map(ord, '$€£¥'))
+
+
+# (start, end) of the dates of a line, (start, end, cents) of its amounts (see _scan_line())
+LineSpans = Tuple[List[Tuple[int, int]], List[Tuple[int, int, int]]]
+
+
+def cut_spans(text: str, spans: Iterable[Tuple[int, int]]) -> str:
+    """Return text without the (start, end) spans, which may overlap, in one pass."""
+    pieces = []
+    position = 0
+    for start, end in sorted(spans):
+        if start > position:
+            pieces.append(text[position:start])
+        position = max(position, end)
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def _lower_pattern(pattern: str) -> str:
+    """Lower-case a regex pattern, leaving escape sequences such as \\d untouched."""
+    return re.sub(r'\\.|[^\\]+',
+                  lambda m: m.group() if m.group().startswith('\\') else m.group().lower(),
+                  pattern)
+
+
+def _compile_ignore_regex(texts, patterns) -> re.Pattern:
+    """
+    Combine ignore texts and patterns into a single regex matching lower-cased lines.
+    
+    Matching lower-cased lines without re.IGNORECASE lets the regex engine use its
+    literal prefix optimizations, which re.IGNORECASE disables.
+    """
+    alternatives = [re.escape(text.lower()) for text in texts]
+    alternatives += [_lower_pattern(pattern) for pattern in patterns]
+    return re.compile('|'.join(alternatives))
 
 
 class BaseStatementParser(ABC):
     """Abstract base class for bank statement parsers."""
     
-    def __init__(self, text_file_path: str):
+    # Bump when a change alters the parsed output, so cached statements are not reused
+    PARSER_VERSION = 1
+    
+    # CSV dialect of the files written for this parser
+    CSV_DELIMITER = ','
+    CSV_QUOTING = csv.QUOTE_MINIMAL
+    
+    # Lines containing one of these texts are ignored (case-insensitive)
+    IGNORE_TEXTS = (
+        'VOS CONTACTS',
+        'Votre Banque à Distance',
+        'Service d\'urgence 24 h/24',
+        'Perte ou vol de vos cartes',
+        'Pour toute insatisfaction',
+        'Le Service Relations Clientèle',
+        'Société Générale',
+        'S.A. au capital',
+        'RCS Paris',
+        'Siège Social',
+        'bd Haussmann',
+        'suite >>>',
+        'N° ADEME',
+        'Opération exonérée',
+        'Votre compte est éligible',
+        'Fonds de Garantie',
+        'SG-SocieteGenerale.Reclamations@socgen.com',
+        'courrier à : Le médiateur CS 151',
+        'RELEVÉ DE COMPTE',
+        'COMPTE D\'ADMINISTRATION - en euros',
+        'Nature de l\'opération',
+    )
+    
+    # Lines matching one of these patterns are ignored (case-insensitive)
+    IGNORE_PATTERNS = (
+        r'Internet\s*:\s*entreprises\.sg\.fr',
+        r'éléphone\s*:\s*\d+',
+        r'Courrier\s*:\s*\d+.*[A-Z\s]+',  # Remove postal addresses
+        r'AERODROME D [A-Z\s]+',  # Remove location references
+        r'L\'agence\s*:\s*votre premier',
+        r'Le Médiateur\s*:\s*En dernier',
+        r'RA\d+',
+        r'n°\s*\d{5}\s+\d{5}\s+\d{11}\s+\d{2}',  # Remove account numbers
+        r'du \d{2}/\d{2}/\d{4} au \d{2}/\d{2}/\d{4}',
+        r'envoi n°\d+ Page \d+/\d+',
+    )
+    
+    # Lines made of exactly one of these words are ignored (case-insensitive)
+    IGNORE_WORDS = ('Débit', 'Crédit', 'Valeur', 'Date', 'eur')
+    
+    # Lines after the first one containing this text are not parsed
+    STOP_TEXT = 'TOTAUX DES MOUVEMENTS'
+    
+    # Lines read ahead from a stream or a mapped file to extract the header metadata
+    HEADER_LINES = 80
+    
+    # Date formats (see dates.DateParser), tried in this order until the first date
+    # of a document locks its format, and month numbers by lower-case name (None: English)
+    DATE_FORMATS = ("%d/%m/%Y",)
+    MONTH_NAMES = None
+    
+    # Decimal separator of amounts ('.' or ','), None to infer it from the header of each document
+    DECIMAL_SEPARATOR = None
+    
+    _ignore_regex = _compile_ignore_regex(IGNORE_TEXTS, IGNORE_PATTERNS)
+    _ignore_words = frozenset(word.lower() for word in IGNORE_WORDS)
+    
+    # Compiled patterns of the class, shared by its instances (see compile_patterns())
+    _patterns = None
+    
+    def __init_subclass__(cls, **kwargs):
+        """Recompile the ignore matcher and the patterns for subclasses overriding them."""
+        super().__init_subclass__(**kwargs)
+        cls._ignore_regex = _compile_ignore_regex(cls.IGNORE_TEXTS, cls.IGNORE_PATTERNS)
+        cls._ignore_words = frozenset(word.lower() for word in cls.IGNORE_WORDS)
+        cls._patterns = cls.compile_patterns()
+    
+    def __init__(self, text_file_path: Optional[str] = None, text: Optional[str] = None,
+                 lines: Optional[Iterable[str]] = None):
         """
-        Initialize parser with text file path.
+        Initialize parser with a text file path, with the text itself or with a stream of lines.
         
         Args:
-            text_file_path: Path to the text file extracted from PDF
+            text_file_path: Path to the text file extracted from PDF, memory-mapped:
+                            raw_text only holds its first HEADER_LINES lines and
+                            lines are decoded when they are read
+            text: Text extracted from PDF, used instead of reading text_file_path
+            lines: Lines of the text (e.g. an open file), read as the transactions
+                   are iterated: only the first HEADER_LINES are kept in raw_text
+                   and lines, see iter_transactions()
         """
-        self.text_file_path = Path(text_file_path)
+        self.text_file_path = Path(text_file_path) if text_file_path else None
         self.raw_text = ""
         self.lines = []
         self.statement = BankStatement()
+        self.dates = DateParser(self.DATE_FORMATS, self.MONTH_NAMES)
+        self.amounts = AmountScanner(self.DECIMAL_SEPARATOR)
+        self._stream = None
+        
+        if lines is not None:
+            self._set_stream(lines)
+            return
+        
+        if text is not None:
+            self._set_text(text)
+            return
+        
+        if self.text_file_path is None:
+            return
         
         if not self.text_file_path.exists():
             raise FileNotFoundError(f"Text file not found: {text_file_path}")
         
         self._load_text()
     
+    @classmethod
+    def compile_patterns(cls):
+        """
+        Compile the regexes of the class from its pattern constants, once per class.
+        
+        The result is immutable and shared by all the instances, so creating a
+        parser or parsing one more document with it compiles nothing. None by default.
+        """
+        return None
+    
+    @classmethod
+    def sniff(cls, head: str) -> float:
+        """
+        Score how well this parser fits a document, from its first few KB only.
+        
+        Args:
+            head: Beginning of the extracted text
+        
+        Returns:
+            0.0 when the parser does not apply, up to 1.0 for a sure match
+        """
+        return 0.0
+    
+    @classmethod
+    def starts_transaction(cls, line: str) -> bool:
+        """
+        Tell whether the parsing state is reset on a filtered line.
+        
+        Large statements are cut before such lines and the chunks parsed in
+        parallel with parse_transactions() (see conversion.parse_statement).
+        The default never cuts: the statement is parsed in one piece.
+        """
+        return False
+    
+    def parse_transactions(self, lines: List[str]) -> List[BankTransaction]:
+        """
+        Extract the transactions of a chunk of filtered lines.
+        
+        Called on a parser created without text, for chunks starting on a line
+        where starts_transaction() is True.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot parse chunks of a statement")
+    
+    def cache_version(self) -> str:
+        """
+        Version of the parsed output, in the cache keys of the statements.
+        
+        PARSER_VERSION by default; parsers with configurable output add
+        their configuration, so statements parsed with another one are not reused.
+        """
+        return str(self.PARSER_VERSION)
+    
+    def reset(self, text: str = ""):
+        """
+        Forget the previous document and set the text of the next one.
+        
+        The statement is a new one, so the statement of the previous document
+        is left untouched, and the date format and decimal separator locked
+        on the previous document are unlocked.
+        """
+        self.text_file_path = None
+        self.statement = BankStatement()
+        self.dates.reset()
+        self.amounts.decimal_separator = self.DECIMAL_SEPARATOR
+        self._stream = None
+        self._set_text(text)
+    
+    def parse_text(self, text: str) -> BankStatement:
+        """
+        Parse the text of a document, the parser can then parse another one.
+        
+        A worker parsing document after document keeps one parser per class
+        (see registry.shared_parser) instead of creating one per document.
+        """
+        self.reset(text)
+        return self.parse()
+    
+    def document_format(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the date format and decimal separator locked on the document so far.
+        
+        After parse_header(), the parsers of the other chunks are given them
+        with lock_document_format(), so they read dates and amounts the same way.
+        """
+        return self.dates.locked_format, self.amounts.decimal_separator
+    
+    def lock_document_format(self, document_format: Tuple[Optional[str], Optional[str]]):
+        """Read dates and amounts in the format returned by document_format() on another parser."""
+        date_format, decimal_separator = document_format
+        if date_format is not None:
+            self.dates.lock(date_format)
+        if decimal_separator is not None:
+            self.amounts.decimal_separator = decimal_separator
+    
+    def parse_header(self) -> BankStatement:
+        """
+        Extract the statement metadata, before iter_transactions().
+        
+        The default parses the whole statement, streaming parsers only read
+        the header. Metadata printed after the transactions (such as a final
+        balance) may only be set once the iteration is over.
+        """
+        return self.parse()
+    
+    def iter_transactions(self) -> Iterator[BankTransaction]:
+        """
+        Yield the transactions one by one, as soon as each one is complete.
+        
+        The transactions are not added to the statement, so on a parser created
+        with lines, memory use does not grow with the length of the statement.
+        Call parse_header() first. The default yields the parsed transactions.
+        """
+        yield from self.statement.transactions
+    
     def _load_text(self):
-        """Load text content from file."""
+        """Map the text file, the filtered lines are a bitmap over its line index."""
         try:
-            with open(self.text_file_path, 'r', encoding='utf-8') as f:
-                self.raw_text = f.read()
-            self.lines = self.raw_text.split('\n')
-            self.lines = self._filter_ignore_lines(self.lines)
+            text = MappedText(self.text_file_path)
+            self.raw_text = '\n'.join(text[:self.HEADER_LINES])
+            self.lines = FilteredLines(text, (index for index, _ in self._iter_kept_lines(text)))
         except Exception as e:
             raise IOError(f"Error reading text file: {e}")
     
+    def _set_text(self, text: str):
+        """Set the text to parse and prepare the filtered lines."""
+        self.raw_text = text
+        self.lines = self.raw_text.split('\n')
+        self.lines = self._filter_ignore_lines(self.lines)
+    
+    def _set_stream(self, lines: Iterable[str]):
+        """Read the header of a stream of lines, the rest is filtered as it is parsed."""
+        # Lines read from a file keep their line ending, text split on '\n' does not
+        lines = (line[:-1] if line.endswith('\n') else line for line in lines)
+        head = list(itertools.islice(lines, self.HEADER_LINES))
+        self.raw_text = '\n'.join(head)
+        self.lines = self._filter_ignore_lines(head)
+        self._stream = self._iter_filtered_lines(itertools.chain(head, lines))
+    
+    def _find_line(self, text: str) -> Optional[str]:
+        """
+        Return the first line of the document containing text, or None.
+        
+        A mapped file is searched as a whole, without decoding it; a stream
+        is only searched in its header.
+        """
+        if isinstance(self.lines, FilteredLines):
+            return self.lines.text.find_line(text)
+        position = self.raw_text.find(text)
+        if position < 0:
+            return None
+        start = self.raw_text.rfind('\n', 0, position) + 1
+        end = self.raw_text.find('\n', position)
+        return self.raw_text[start:end if end >= 0 else None]
+    
+    def _parsed_lines(self) -> Iterable[str]:
+        """Filtered lines holding the transactions: the stream when there is one (read once)."""
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            return stream
+        return self.lines
+    
+    def _scan_line(self, line: str, date_regex: re.Pattern) -> LineSpans:
+        """
+        Return the (start, end) spans of the dates of a line and the (start, end, cents) of its amounts.
+        
+        The numbers of a date ("10-01-2025", "15 Jan 2025") are not amounts:
+        the amounts overlapping a date are dropped.
+        """
+        date_spans = [match.span() for match in date_regex.finditer(line)]
+        amount_spans = self.amounts.scan(line)
+        if date_spans:
+            amount_spans = [amount for amount in amount_spans
+                            if not any(start < amount[1] and amount[0] < end for start, end in date_spans)]
+        return date_spans, amount_spans
+    
+    def _cut_description(self, line: str, date_spans: List[Tuple[int, int]],
+                         amount_spans: List[Tuple[int, int, int]]) -> str:
+        """
+        Remove the dates, amounts and currency symbols of a line and collapse its spaces.
+        
+        The spans found by _scan_line() are cut out in a single pass over the line.
+        """
+        spans = date_spans + [(start, end) for start, end, _ in amount_spans]
+        return ' '.join(cut_spans(line, spans).translate(CURRENCY_SYMBOLS).split())
+    
     def _filter_ignore_lines(self, lines: List[str]) -> List[str]:
         """Filter out lines that should be ignored during parsing."""
-        ignore_patterns = [
-            r'VOS CONTACTS',
-            r'Votre Banque à Distance',
-            r'Internet\s*:\s*entreprises\.sg\.fr',
-            r'éléphone\s*:\s*\d+',
-            r'Courrier\s*:\s*\d+.*[A-Z\s]+',  # Remove postal addresses
-            r'AERODROME D [A-Z\s]+',  # Remove location references
-            r'Service d\'urgence 24 h/24',
-            r'Perte ou vol de vos cartes',
-            r'Pour toute insatisfaction',
-            r'L\'agence\s*:\s*votre premier',
-            r'Le Service Relations Clientèle',
-            r'Le Médiateur\s*:\s*En dernier',
-            r'Société Générale',
-            r'S\.A\. au capital',
-            r'RCS Paris',
-            r'Siège Social',
-            r'bd Haussmann',
-            r'suite >>>',
-            r'RA\d+',
-            r'N° ADEME',
-            r'Opération exonérée',
-            r'Votre compte est éligible',
-            r'Fonds de Garantie',
-            r'SG-SocieteGenerale\.Reclamations@socgen\.com',
-            r'courrier à : Le médiateur CS 151',
-            r'RELEVÉ DE COMPTE',
-            r'COMPTE D\'ADMINISTRATION - en euros',
-            r'n°\s*\d{5}\s+\d{5}\s+\d{11}\s+\d{2}',  # Remove account numbers
-            r'du \d{2}/\d{2}/\d{4} au \d{2}/\d{2}/\d{4}',
-            r'envoi n°\d+ Page \d+/\d+',
-            r'Nature de l\'opération',
-            r'^Débit$',
-            r'^Crédit$',
-            r'^Valeur$',
-            r'^Date$',
-            r'^eur$'
-        ]
+        return list(self._iter_filtered_lines(lines))
+    
+    def _iter_filtered_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Yield the lines that are not ignored, up to the STOP_TEXT line."""
+        return (line for _, line in self._iter_kept_lines(lines))
+    
+    def _iter_kept_lines(self, lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        """Yield (index, line) of the lines that are not ignored, up to the STOP_TEXT line."""
+        ignore_words = self._ignore_words
+        ignore_search = self._ignore_regex.search
+        stop_text = self.STOP_TEXT.lower()
         
-        filtered_lines = []
-        for line in lines:
+        for index, line in enumerate(lines):
+            # All matching is case-insensitive, so lower-case each line once
+            lowered = line.lower()
+            
             # Stop processing after TOTAUX DES MOUVEMENTS
-            if re.search(r'TOTAUX DES MOUVEMENTS', line, re.IGNORECASE):
+            if stop_text in lowered:
                 break
-                
-            should_ignore = False
-            for pattern in ignore_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    should_ignore = True
-                    break
-            if not should_ignore:
-                filtered_lines.append(line)
-        
-        return filtered_lines
+            
+            if lowered in ignore_words or ignore_search(lowered):
+                continue
+            yield index, line
     
     @abstractmethod
     def parse(self) -> BankStatement:
@@ -137,6 +422,34 @@ class BaseStatementParser(ABC):
     def get_statement(self) -> BankStatement:
         """Get the complete bank statement object."""
         return self.statement
+    
+    def csv_preamble(self, statement: Optional[BankStatement] = None) -> List[List[str]]:
+        """Rows written before the column headers (statement metadata), none by default."""
+        return []
+    
+    def csv_header(self) -> List[str]:
+        """Column headers of the transaction rows."""
+        return BankTransaction.csv_header()
+    
+    def csv_transaction_rows(self, statement: Optional[BankStatement] = None) -> Iterator[List[str]]:
+        """Yield the CSV rows of the statement transactions (defaults to the parsed statement)."""
+        statement = statement if statement is not None else self.statement
+        for transaction in statement.transactions:
+            yield from self.transaction_csv_rows(transaction)
+    
+    def transaction_csv_rows(self, transaction: BankTransaction) -> List[List[str]]:
+        """CSV rows of one transaction."""
+        return [transaction.to_csv_row()]
+
+
+class GenericPatterns(NamedTuple):
+    """Compiled regexes of a GenericTextParser class."""
+    
+    dates: Tuple[re.Pattern, ...]  # Tried in order, the first match gives the date of a line
+    all_dates: re.Pattern  # Every date of a line, cut from its description
+    banks: Tuple[re.Pattern, ...]
+    account: re.Pattern
+    bank_code: re.Pattern
 
 
 class GenericTextParser(BaseStatementParser):
@@ -147,47 +460,80 @@ class GenericTextParser(BaseStatementParser):
     bank statement formats. It can be extended for specific banks.
     """
     
-    def __init__(self, text_file_path: str):
-        super().__init__(text_file_path)
-        
-        # Common date patterns
-        self.date_patterns = [
-            r'\b(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})\b',  # DD/MM/YYYY or MM/DD/YYYY
-            r'\b(\d{2,4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})\b',  # YYYY/MM/DD
-            r'\b(\d{1,2}\s+\w{3}\s+\d{2,4})\b',              # DD MMM YYYY
-            r'\b(\w{3}\s+\d{1,2},?\s+\d{2,4})\b'             # MMM DD, YYYY
-        ]
-        
-        # Common amount patterns (with currency symbols)
-        # Supports amounts up to 10+ million, both formatted and unformatted
-        self.amount_patterns = [
-            # Formatted amounts with thousand separators
-            r'[\$€£¥]?\s*([+-]?\d{1,3}(?:[,\s]\d{3})+(?:\.\d{2})?)',  # US format: 1,234,567.89
-            r'([+-]?\d{1,3}(?:[,\s]\d{3})+(?:\.\d{2})?)\s*[\$€£¥]?',
-            r'[\$€£¥]?\s*([+-]?\d{1,3}(?:\.\d{3})+(?:,\d{2})?)',      # French format: 1.234.567,89
-            r'([+-]?\d{1,3}(?:\.\d{3})+(?:,\d{2})?)\s*[\$€£¥]?',
-            # Unformatted large amounts (no separators): 1234567.89 or 1234567,89
-            r'[\$€£¥]?\s*([+-]?\d{4,}(?:[.,]\d{2})?)',
-            r'([+-]?\d{4,}(?:[.,]\d{2})?)\s*[\$€£¥]?',
-            # Small amounts (1-999): 123.45 or 123,45
-            r'[\$€£¥]?\s*([+-]?\d{1,3}(?:[.,]\d{2})?)',
-            r'([+-]?\d{1,3}(?:[.,]\d{2})?)\s*[\$€£¥]?'
-        ]
-        
-        # Common bank name patterns
-        self.bank_patterns = [
-            r'(?i)\b([A-Z][a-z]+\s+(?:Bank|Credit\s+Union|Financial))\b',
-            r'(?i)\b(Bank\s+of\s+[A-Z][a-z]+)\b',
-            r'(?i)\b([A-Z]+\s+Bank)\b'
-        ]
+    # 2: dates in the format of the first date of the document first
+    # 3: each amount found once, in the number format of the document
+    # 4: the numbers of a date are not amounts
+    PARSER_VERSION = 4
+    
+    DATE_FORMATS = (
+        "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d",
+        "%d-%m-%Y", "%m-%d-%Y", "%Y-%m-%d",
+        "%d.%m.%Y", "%m.%d.%Y", "%Y.%m.%d",
+        "%d %b %Y", "%d %B %Y",
+        "%b %d, %Y", "%B %d, %Y"
+    )
+    
+    # Common date patterns
+    DATE_PATTERNS = (
+        r'\b(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})\b',  # DD/MM/YYYY or MM/DD/YYYY
+        r'\b(\d{2,4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})\b',  # YYYY/MM/DD
+        r'\b(\d{1,2}\s+\w{3}\s+\d{2,4})\b',              # DD MMM YYYY
+        r'\b(\w{3}\s+\d{1,2},?\s+\d{2,4})\b'             # MMM DD, YYYY
+    )
+    
+    # Common bank name patterns
+    BANK_PATTERNS = (
+        r'(?i)\b([A-Z][a-z]+\s+(?:Bank|Credit\s+Union|Financial))\b',
+        r'(?i)\b(Bank\s+of\s+[A-Z][a-z]+)\b',
+        r'(?i)\b([A-Z]+\s+Bank)\b'
+    )
+    
+    ACCOUNT_PATTERN = r'(?i)account\s*(?:number|#)?\s*:?\s*(\w+[-\s]?\w+)'
+    BANK_CODE_PATTERN = r'(?i)(?:sort\s+code|routing|swift|iban)\s*:?\s*([A-Z0-9\-\s]+)'
+    
+    @classmethod
+    def compile_patterns(cls) -> GenericPatterns:
+        """Compile the date, bank name, account and bank code patterns."""
+        return GenericPatterns(
+            dates=tuple(re.compile(pattern) for pattern in cls.DATE_PATTERNS),
+            all_dates=re.compile('|'.join(cls.DATE_PATTERNS)),
+            banks=tuple(re.compile(pattern) for pattern in cls.BANK_PATTERNS),
+            account=re.compile(cls.ACCOUNT_PATTERN),
+            bank_code=re.compile(cls.BANK_CODE_PATTERN),
+        )
+    
+    @classmethod
+    def sniff(cls, head: str) -> float:
+        """Applies to any document, with the lowest score so a specific parser wins."""
+        return 0.1
+    
+    @classmethod
+    def starts_transaction(cls, line: str) -> bool:
+        """Every line is parsed on its own, so a statement can be cut anywhere."""
+        return True
+    
+    def parse_transactions(self, lines: List[str]) -> List[BankTransaction]:
+        """Extract the transactions of a chunk of filtered lines."""
+        return list(self._iter_transactions(lines))
     
     def parse(self) -> BankStatement:
         """Parse the text file using generic patterns."""
+        self.parse_header()
+        self._extract_transactions()
+        return self.statement
+    
+    def parse_header(self) -> BankStatement:
+        """Extract the bank name, account and dates from the first lines."""
         self._extract_bank_info()
         self._extract_dates()
-        self._extract_transactions()
+        # Amounts are written "1,234.56" or "1.234,56" in the whole document
+        self.amounts.infer_decimal_separator(self.lines[:self.HEADER_LINES])
         return self.statement
     
+    def iter_transactions(self) -> Iterator[BankTransaction]:
+        """Yield the transactions one by one, as soon as each one is complete."""
+        return self._iter_transactions(self._parsed_lines())
+    
     def _extract_bank_info(self):
         """Extract bank name and identification information."""
         # Look for bank name in first few lines
@@ -195,21 +541,21 @@ class GenericTextParser(BaseStatementParser):
             line = line.strip()
             if not line:
                 continue
-                
+            
             # Check for bank name patterns
-            for pattern in self.bank_patterns:
-                match = re.search(pattern, line)
+            for bank_search in self._patterns.banks:
+                match = bank_search.search(line)
                 if match:
                     self.statement.bank_name = match.group(1).strip()
                     break
             
             # Look for account numbers
-            account_match = re.search(r'(?i)account\s*(?:number|#)?\s*:?\s*(\w+[-\s]?\w+)', line)
+            account_match = self._patterns.account.search(line)
             if account_match:
                 self.statement.account_number = account_match.group(1)
             
             # Look for bank codes
-            code_match = re.search(r'(?i)(?:sort\s+code|routing|swift|iban)\s*:?\s*([A-Z0-9\-\s]+)', line)
+            code_match = self._patterns.bank_code.search(line)
             if code_match:
                 self.statement.bank_code = code_match.group(1).strip()
         
@@ -223,8 +569,8 @@ class GenericTextParser(BaseStatementParser):
         
         # Look for dates in the first 20 lines
         for line in self.lines[:20]:
-            for pattern in self.date_patterns:
-                matches = re.findall(pattern, line)
+            for date_search in self._patterns.dates:
+                matches = date_search.findall(line)
                 for match in matches:
                     parsed_date = self._parse_date(match)
                     if parsed_date:
@@ -237,49 +583,41 @@ class GenericTextParser(BaseStatementParser):
             self.statement.end_date = dates_found[-1]
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse various date formats."""
-        date_formats = [
-            "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d",
-            "%d-%m-%Y", "%m-%d-%Y", "%Y-%m-%d",
-            "%d.%m.%Y", "%m.%d.%Y", "%Y.%m.%d",
-            "%d %b %Y", "%d %B %Y",
-            "%b %d, %Y", "%B %d, %Y"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str.strip(), fmt)
-            except ValueError:
-                continue
-        
-        return None
+        """Parse various date formats, the format of the first date of the document first."""
+        return self.dates.parse(date_str)
     
     def _extract_transactions(self):
         """Extract transactions from the statement."""
-        transaction_lines = []
+        for transaction in self._iter_transactions(self._parsed_lines()):
+            self.statement.add_transaction(transaction)
+        
+    def _iter_transactions(self, lines: Iterable[str]) -> Iterator[BankTransaction]:
+        """Yield the transactions of filtered lines."""
+        date_searches = self._patterns.dates
         
         # Simple heuristic: look for lines with dates and amounts
-        for line_num, line in enumerate(self.lines):
+        for line in lines:
             line = line.strip()
             if not line:
                 continue
             
             # Check if line contains a date
             date_found = None
-            for pattern in self.date_patterns:
-                match = re.search(pattern, line)
+            for date_search in date_searches:
+                match = date_search.search(line)
                 if match:
                     date_found = self._parse_date(match.group(1))
                     break
             
             if date_found:
-                # Look for amounts in the same line
-                amounts = self._extract_amounts(line)
+                # Look for amounts in the same line, outside of its dates
+                spans = self._scan_line(line, self._patterns.all_dates)
+                amounts = [cents / 100 for _, _, cents in spans[1]]
                 
                 # Create transaction
                 transaction = BankTransaction()
                 transaction.date = date_found
-                transaction.description = self._clean_description(line)
+                transaction.description = self._clean_description(line, spans)
                 
                 if amounts:
                     # Assume last amount is the transaction amount
@@ -290,38 +628,20 @@ class GenericTextParser(BaseStatementParser):
                     else:
                         transaction.amount = amounts[0]
                 
-                self.statement.add_transaction(transaction)
+                yield transaction
     
     def _extract_amounts(self, line: str) -> List[float]:
-        """Extract monetary amounts from a line."""
-        amounts = []
-        
-        for pattern in self.amount_patterns:
-            matches = re.findall(pattern, line)
-            for match in matches:
-                try:
-                    # Clean the amount string
-                    amount_str = match.replace(',', '').replace(' ', '')
-                    amount = float(amount_str)
-                    amounts.append(amount)
-                except ValueError:
-                    continue
-        
-        return amounts
+        """Extract monetary amounts from a line, in one pass, leaving out the numbers of its dates."""
+        return [cents / 100 for _, _, cents in self._scan_line(line, self._patterns.all_dates)[1]]
     
-    def _clean_description(self, line: str) -> str:
-        """Clean transaction description by removing dates and amounts."""
-        cleaned = line
-        
-        # Remove dates
-        for pattern in self.date_patterns:
-            cleaned = re.sub(pattern, '', cleaned)
-        
-        # Remove amounts
-        for pattern in self.amount_patterns:
-            cleaned = re.sub(pattern, '', cleaned)
-        
-        # Clean up extra spaces
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    def _clean_description(self, line: str, spans: Optional[LineSpans] = None) -> str:
+        """
+        Clean transaction description by removing dates and amounts.
         
-        return cleaned if cleaned else "Transaction"
+        Args:
+            line: Transaction line
+            spans: Dates and amounts of the line found by _scan_line(), scanned if not given
+        """
+        if spans is None:
+            spans = self._scan_line(line, self._patterns.all_dates)
+        return self._cut_description(line, *spans) or "Transaction"
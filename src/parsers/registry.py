@@ -0,0 +1,146 @@
+"""
+Registry of the statement parsers, used to pick the parser of a document.
+
+Every parser declares a sniff() classmethod scoring a document from its
+first SNIFF_SIZE characters. Parsers are registered by name and their
+modules are only imported on the first detection, so registering more
+bank parsers does not slow down the start of the command line tool.
+
+A worker parsing document after document reuses one parser instance per
+class and thread (see shared_parser): the compiled patterns are shared
+at class level, and each instance builds its date and amount matchers once.
+"""
+
+import importlib
+import itertools
+import threading
+from typing import Iterable, List, Optional, Union
+
+
+# Number of characters of the document shown to the sniff functions
+SNIFF_SIZE = 4096
+
+# Registered parsers, as "module:ClassName" or as classes, in priority order:
+# on equal scores the parser registered first wins
+_registry: List[Union[str, type]] = [
+    'parsers.sg_parser:SocieteGeneraleParser',
+    'parsers.specific_parsers:FrenchBankParser',
+    'parsers.base_parser:GenericTextParser',
+]
+
+# Parser instances of each thread, by class (see shared_parser)
+_shared = threading.local()
+
+
+def register_parser(parser: Union[str, type], first: bool = False):
+    """
+    Register a parser for detection.
+    
+    Args:
+        parser: Parser class, or "module:ClassName" to import it on the first detection
+        first: Give the parser priority over the registered ones on equal scores
+    """
+    if first:
+        _registry.insert(0, parser)
+    else:
+        _registry.append(parser)
+
+
+def registered_parsers() -> List[type]:
+    """Return the registered parser classes in priority order, importing them if needed."""
+    for index, parser in enumerate(_registry):
+        if isinstance(parser, str):
+            _registry[index] = _import_parser(parser)
+    return list(_registry)
+
+
+def sniff_parser(text: str) -> Optional[type]:
+    """
+    Return the parser class scoring best on the beginning of a text.
+    
+    Returns:
+        Parser class, or None if no registered parser applies
+    """
+    head = text[:SNIFF_SIZE]
+    best_class, best_score = None, 0.0
+    for parser_class in registered_parsers():
+        score = parser_class.sniff(head)
+        if score > best_score:
+            best_class, best_score = parser_class, score
+    return best_class
+
+
+def shared_parser(parser_class: type):
+    """
+    Return the parser instance of this thread for a parser class, created on first use.
+    
+    Call reset() or parse_text() on it for each document: the statement of
+    the previous document is not modified.
+    """
+    parsers = _shared.__dict__.setdefault('parsers', {})
+    parser = parsers.get(parser_class)
+    if parser is None:
+        parser = parsers[parser_class] = parser_class()
+    return parser
+
+
+def detect_parser(text: str, shared: bool = False):
+    """
+    Create the parser of a document on its already loaded text.
+    
+    Args:
+        text: Text extracted from the PDF
+        shared: Reset and return the parser of this thread for the class
+                (see shared_parser) instead of creating one
+    
+    Returns:
+        Parser instance, not parsed yet
+    
+    Raises:
+        ValueError: if no registered parser applies to the text
+    """
+    parser_class = sniff_parser(text)
+    if parser_class is None:
+        raise ValueError("No registered parser applies to this document")
+    if not shared:
+        return parser_class(text=text)
+    parser = shared_parser(parser_class)
+    parser.reset(text)
+    return parser
+
+
+def detect_stream_parser(lines: Iterable[str]):
+    """
+    Create the parser of a document read as a stream of lines (e.g. an open file).
+    
+    Only the first SNIFF_SIZE characters are read to pick the parser, the
+    rest of the stream is read by the parser as it is iterated.
+    
+    Args:
+        lines: Lines of the text extracted from the PDF
+    
+    Returns:
+        Parser instance created with lines, see BaseStatementParser.iter_transactions()
+    
+    Raises:
+        ValueError: if no registered parser applies to the text
+    """
+    lines = iter(lines)
+    head = []
+    size = 0
+    for line in lines:
+        head.append(line)
+        size += len(line)
+        if size >= SNIFF_SIZE:
+            break
+    
+    parser_class = sniff_parser(''.join(line if line.endswith('\n') else line + '\n' for line in head))
+    if parser_class is None:
+        raise ValueError("No registered parser applies to this document")
+    return parser_class(lines=itertools.chain(head, lines))
+
+
+def _import_parser(name: str) -> type:
+    """Import a parser class from its "module:ClassName" name."""
+    module_name, _, class_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
@@ -2,9 +2,10 @@
 Société Générale specific parser for bank statements.
 """
 
+import csv
 import re
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterable, Iterator, Optional, List
 import sys
 import os
 
@@ -16,39 +17,202 @@ sys.path.append(src_dir)
 sys.path.append(parsers_dir)
 
 from base_parser import BaseStatementParser
-from models import BankTransaction, BankStatement
+from models import BankTransaction, BankStatement, intern_label
+from amounts import format_french_amount
+from rules import RuleSet
+
+
+# French amount - supports up to 10+ million (formatted and unformatted)
+AMOUNT_PATTERN = r'\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d{4,}(?:,\d{2})?|\d{1,3}(?:,\d{2})?'
+
+# Line labels of the transaction tokenizer
+START, BOUNDARY, AMOUNT, DETAIL = 'start', 'boundary', 'amount', 'detail'
+
+# One anchored regex labels a line: the name of the matching group is the label.
+# START: two dates then the operation, BOUNDARY: two dates alone,
+# AMOUNT: an amount alone on its line, possibly followed by '*'
+LINE_RE = re.compile(
+    r'(?P<start>(?P<date>\d{2}/\d{2}/\d{4})\s+(?P<value_date>\d{2}/\d{2}/\d{4})\s+(?P<operation>.+))'
+    r'|(?P<boundary>\d{2}/\d{2}/\d{4}\s+\d{2}/\d{2}/\d{4})'
+    r'|(?P<amount>(?P<amount_text>' + AMOUNT_PATTERN + r')\s*\*?$)'
+)
+
+CARTE_RE = re.compile(r'CARTE\s+X\d+\s+\d{2}/\d{2}\s+(.+)')
+AMOUNT_RE = re.compile(AMOUNT_PATTERN)
+# Final balance, printed after the transactions: group 1 is the sign, '-' when overdrawn
+BALANCE_RE = re.compile(r'NOUVEAU SOLDE AU \d{2}/\d{2}/\d{4}\s+([+\-]?)\s*(' + AMOUNT_PATTERN + ')')
+# Opening balance, printed before the first transaction
+OPENING_BALANCE_RE = re.compile(r'SOLDE PR[ÉE]C[ÉE]DENT AU \d{2}/\d{2}/\d{4}\s+([+\-]?)\s*(' + AMOUNT_PATTERN + ')')
+
+# Header: bank branch, client, account number ("n° xxxxx xxxxx xxxxxxxxxxx xx") and period
+BANK_RE = re.compile(r'SG\s+([A-Z\s]+)')
+CLIENT_RE = re.compile(r'(AERO CLUB[^\n]+)')
+SECTION_RE = re.compile(r'(SECTION [A-Z\s]+?)(?:\n|$)')
+AERODROME_CLIENT_RE = re.compile(r'([A-Z][A-Z\s\-\']+)\s*AERODROME', re.MULTILINE)
+ACCOUNT_RE = re.compile(r'n°\s*(\d+\s+\d+\s+\d+\s+\d+)')
+PERIOD_RE = re.compile(r'du\s+(\d{2}/\d{2}/\d{4})\s+au\s+(\d{2}/\d{2}/\d{4})')
+
+# Cleaning of the operation and detail texts
+LINE_BREAKS_RE = re.compile(r'[\r\n]+')
+SPACES_RE = re.compile(r' +')
+
+# Category and direction of the operations, first applying rule wins (see rules.py).
+# Operations no direction rule applies to are debits.
+SG_RULES = [
+    {'keywords': ['FACTURATION', 'FRAIS'], 'category': 'COMMISSIONS ET FRAIS DIVERS'},
+    {'keywords': ['CHEQUE'], 'unless': ['REMISE'], 'category': 'CHEQUES PAYES'},
+    {'keywords': ['REMISE CHEQUE'], 'category': 'REMISES DE CHEQUES'},
+    {'keywords': ['VRST GAB'], 'category': 'VERSEMENTS ESPECES', 'direction': 'credit'},
+    {'keywords': ['ECHEANCE PRET'], 'category': 'ECHEANCE CREDITS'},
+    {'keywords': ['VIR RECU'], 'category': 'AUTRES VIREMENTS RECUS', 'direction': 'credit'},
+    # Instant transfers received have no category
+    {'keywords': ['VIR INST RE'], 'category': '', 'direction': 'credit'},
+    {'keywords': ['EMIS'], 'category': 'AUTRES VIREMENTS EMIS'},
+    {'keywords': ['REMISE', 'DEPOT', 'VIREMENT RECU'], 'direction': 'credit'},
+]
+SG_RULE_SET = RuleSet(SG_RULES)
+
+
+def use_rules(rules: RuleSet):
+    """
+    Classify the operations of all SG parsers with a rule table, e.g. RuleSet.from_file('rules.json').
+    
+    The table is set in the current process: call it in worker processes too.
+    """
+    SocieteGeneraleParser.RULES = rules
+
+
+def _classify_line(line: str):
+    """
+    Label a stripped, non-empty line of the transaction section.
+    
+    Returns:
+        (label, value): value is the match of a START line, the amount
+        text of an AMOUNT line and None otherwise
+    """
+    # Only lines starting with a digit can be anything but a detail line
+    if not line[0].isdigit():
+        return DETAIL, None
+    
+    match = LINE_RE.match(line)
+    if match is None:
+        return DETAIL, None
+    
+    label = match.lastgroup
+    if label == START:
+        return START, match
+    if label == AMOUNT:
+        return AMOUNT, match.group('amount_text')
+    return BOUNDARY, None
+
+
+def _trailing_amount(text: str):
+    """
+    Find the amount ending a text, possibly followed by '*'.
+    
+    Same result as a regex search of the amount followed by optional spaces
+    and '*' at the end of the text, but only the end of the text is examined
+    instead of trying the regex at every position.
+    
+    Returns:
+        (start, amount_text), or None if the text does not end with an amount
+    """
+    end = len(text.rstrip())
+    if end and text[end - 1] == '*':
+        end = len(text[:end - 1].rstrip())
+    if not end or not text[end - 1].isdecimal():
+        return None
+    
+    # The amount starts in the run of digits, dots and commas ending the text,
+    # the leftmost position where it fully matches wins like with re.search
+    start = end - 1
+    while start > 0 and (text[start - 1].isdecimal() or text[start - 1] in '.,'):
+        start -= 1
+    for position in range(start, end):
+        if AMOUNT_RE.fullmatch(text, position, end):
+            return position, text[position:end]
+    return None
 
 
 class SocieteGeneraleParser(BaseStatementParser):
     """Parser for Société Générale bank statements."""
     
-    def __init__(self, text_file_path: str):
-        super().__init__(text_file_path)
-        
-        # Account and bank info patterns
-        self.account_pattern = r'n°\s*(\d+\s+\d+\s+\d+\s+\d+)'
-        self.period_pattern = r'du\s+(\d{2}/\d{2}/\d{4})\s+au\s+(\d{2}/\d{2}/\d{4})'
-        self.client_pattern = r'(?:AERO CLUB|[A-Z][A-Z\s-]+)\n(?:[A-Z\s-]+\n)*(?:AERODROME|[A-Z0-9\s]+)\n(?:D\s+\d+|[A-Z0-9\s]+)\n(?:\d{5}\s+[A-Z\s]+)'
-        
-        # Transaction patterns
-        self.transaction_pattern = r'(\d{2}/\d{2}/\d{4})\s+(\d{2}/\d{2}/\d{4})\s+(.+?)(?:\d+[,\.]\d{2}|\n)'
-        # French amount pattern - supports up to 10+ million (formatted and unformatted)
-        self.amount_pattern = r'(\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d{4,}(?:,\d{2})?|\d{1,3}(?:,\d{2})?)'
-        # Balance pattern - same improvement
-        self.balance_pattern = r'NOUVEAU SOLDE AU \d{2}/\d{2}/\d{4}\s+(\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d{4,}(?:,\d{2})?|\d{1,3}(?:,\d{2})?)'
+    # 2: the same credit keywords whether the amount is on the operation line or not
+    # 3: opening balance
+    # 4: category set on the transactions
+    # 5: direction of an amount on the operation line from the raw operation text
+    # 6: sign of the opening and final balances
+    PARSER_VERSION = 6
+    
+    # SG format uses semicolons and forces quotes
+    CSV_DELIMITER = ';'
+    CSV_QUOTING = csv.QUOTE_ALL
+    
+    # Rules giving the category and direction of operations, e.g. RuleSet.from_file('rules.json')
+    RULES = SG_RULE_SET
+    
+    @classmethod
+    def sniff(cls, head: str) -> float:
+        """Recognize Société Générale statements from the bank name in the header."""
+        return 0.9 if 'SG ' in head or 'Société Générale' in head else 0.0
+    
+    @classmethod
+    def starts_transaction(cls, line: str) -> bool:
+        """
+        A START line closes the previous transaction whatever the state.
+        
+        Detail lines continuing a transaction on the next page (after
+        "suite >>>") stay in the chunk of their transaction.
+        """
+        line = line.strip()
+        return bool(line) and _classify_line(line)[0] == START
+    
+    def parse_transactions(self, lines: List[str]) -> List[BankTransaction]:
+        """Extract the transactions of a chunk of filtered lines."""
+        return list(self._iter_transactions(lines))
+    
+    def cache_version(self) -> str:
+        """The categories and directions depend on the rule table: its digest is part of the version."""
+        return f"{self.PARSER_VERSION}:{self.RULES.digest}"
     
     def parse(self) -> BankStatement:
         """Parse Société Générale bank statement."""
+        self.parse_header()
+        self._extract_transactions()
+        return self.statement
+    
+    def parse_header(self) -> BankStatement:
+        """
+        Extract the bank, client, account and period from the header.
+        
+        On a parser created with lines, the final balance printed after the
+        transactions is set when iter_transactions() reaches it.
+        """
         self._extract_bank_info()
         self._extract_account_info()
         self._extract_period()
-        self._extract_transactions()
         return self.statement
     
+    def iter_transactions(self) -> Iterator[BankTransaction]:
+        """Yield the transactions one by one, as soon as each one is complete."""
+        lines = self._parsed_lines()
+        if self.statement.final_balance is None:
+            lines = self._watch_final_balance(lines)
+        return self._iter_transactions(lines)
+    
+    def _watch_final_balance(self, lines: Iterable[str]) -> Iterator[str]:
+        """Pass the lines through, setting the final balance from the first line holding it."""
+        for line in lines:
+            if self.statement.final_balance is None and 'NOUVEAU SOLDE' in line:
+                balance_match = BALANCE_RE.search(line)
+                if balance_match:
+                    self.statement.final_balance = self._parse_balance(balance_match)
+            yield line
+    
     def _extract_bank_info(self):
         """Extract bank information."""
         # Extract bank name from header (generic pattern)
-        bank_match = re.search(r'SG\s+([A-Z\s]+)', self.raw_text)
+        bank_match = BANK_RE.search(self.raw_text)
         if bank_match:
             self.statement.bank_name = f"SG {bank_match.group(1).strip()}"
         else:
@@ -57,25 +221,25 @@ class SocieteGeneraleParser(BaseStatementParser):
         # Extract client info - look for client name and section separately
         text = self.raw_text
         # Find AERO CLUB name
-        client_match = re.search(r'(AERO CLUB[^\n]+)', text)
+        client_match = CLIENT_RE.search(text)
         if client_match:
             self.statement.client_name = client_match.group(1).strip()
         
         # Find SECTION line
-        section_match = re.search(r'(SECTION [A-Z\s]+?)(?:\n|$)', text)
+        section_match = SECTION_RE.search(text)
         if section_match:
             self.statement.client_section = section_match.group(1).strip()
         
         # Fallback if AERO CLUB not found
         if not client_match:
-            client_match = re.search(r'([A-Z][A-Z\s\-\']+)\s*AERODROME', text, re.MULTILINE)
+            client_match = AERODROME_CLIENT_RE.search(text)
             if client_match:
                 self.statement.client_name = client_match.group(1).replace('\n', ' ').strip()
     
     def _extract_account_info(self):
         """Extract account number and balance."""
         # Extract account from "n° xxxxx xxxxx xxxxxxxxxxx xx" format
-        account_match = re.search(r'n°\s*(\d+\s+\d+\s+\d+\s+\d+)', self.raw_text)
+        account_match = ACCOUNT_RE.search(self.raw_text)
         if account_match:
             account_digits = account_match.group(1).replace(' ', '')
             # Convert to IBAN format (FR76 + formatted account)
@@ -88,157 +252,140 @@ class SocieteGeneraleParser(BaseStatementParser):
                 self.statement.bank_code = bank_code
         
         # Extract final balance
-        balance_match = re.search(r'NOUVEAU SOLDE AU \d{2}/\d{2}/\d{4}\s+[+\-]?\s*(\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d{4,}(?:,\d{2})?|\d{1,3}(?:,\d{2})?)', self.raw_text)
+        balance_match = BALANCE_RE.search(self.raw_text)
+        if balance_match is None:
+            # raw_text only holds the header of a mapped file, the balance follows the transactions
+            balance_line = self._find_line('NOUVEAU SOLDE AU')
+            balance_match = BALANCE_RE.search(balance_line) if balance_line else None
         if balance_match:
-            self.statement.final_balance = self._parse_french_amount(balance_match.group(1))
+            self.statement.final_balance = self._parse_balance(balance_match)
+        
+        # Extract opening balance
+        opening_match = OPENING_BALANCE_RE.search(self.raw_text)
+        if opening_match is None:
+            opening_line = self._find_line('SOLDE PR')
+            opening_match = OPENING_BALANCE_RE.search(opening_line) if opening_line else None
+        if opening_match:
+            self.statement.opening_balance = self._parse_balance(opening_match)
     
     def _extract_period(self):
         """Extract statement period."""
-        period_match = re.search(self.period_pattern, self.raw_text)
+        period_match = PERIOD_RE.search(self.raw_text)
         if period_match:
             start_str = period_match.group(1)
             end_str = period_match.group(2)
             
-            self.statement.start_date = datetime.strptime(start_str, "%d/%m/%Y")
-            self.statement.end_date = datetime.strptime(end_str, "%d/%m/%Y")
+            self.statement.start_date = self._parse_sg_date(start_str)
+            self.statement.end_date = self._parse_sg_date(end_str)
     
     def _extract_transactions(self):
-        """Extract all transactions from the statement."""
-        lines = self.lines
+        """Extract all transactions from the statement in a single pass."""
+        for transaction in self.iter_transactions():
+            self.statement.add_transaction(transaction)
+    
+    def _iter_transactions(self, lines: Iterable[str]) -> Iterator[BankTransaction]:
+        """
+        Yield the transactions of filtered lines, each one once it is complete.
+        
+        Each line is labelled once by _classify_line, a small state machine
+        then assembles transactions: a START line opens a transaction, the
+        following AMOUNT and DETAIL lines belong to it until the next START
+        or BOUNDARY line.
+        """
         current_transaction = None
-        i = 0
+        amounts = []
+        detail_lines = []
+        collecting = False
         
-        while i < len(lines):
-            line = lines[i].strip()
+        for line in lines:
+            line = line.strip()
             if not line:
-                i += 1
                 continue
             
-            # Check for transaction start (date pattern)
-            date_match = re.match(r'^(\d{2}/\d{2}/\d{4})\s+(\d{2}/\d{2}/\d{4})\s+(.+)', line)
-            if date_match:
+            label, value = _classify_line(line)
+            
+            if label == START:
                 # Save previous transaction if exists
                 if current_transaction:
-                    self.statement.add_transaction(current_transaction)
-                
-                # Start new transaction
-                current_transaction = BankTransaction()
-                current_transaction.date = datetime.strptime(date_match.group(1), "%d/%m/%Y")
-                current_transaction.value_date = datetime.strptime(date_match.group(2), "%d/%m/%Y")
-                
-                # Check if this is a CARTE (credit card) transaction
-                remaining_text = date_match.group(3)
-                carte_match = re.match(r'CARTE\s+X\d+\s+\d{2}/\d{2}\s+(.+)', remaining_text)
-                if carte_match:
-                    # This is a credit card payment - set special category
-                    current_transaction.libelle_interbancaire = "PAIEMENT CB"
-                
-                # Extract operation type and amounts from this line and following lines
-                remaining_text = date_match.group(3)
-                
-                # Check if this is a CARTE (credit card) transaction
-                carte_match = re.match(r'CARTE\s+X\d+\s+\d{2}/\d{2}\s+(.+)', remaining_text)
-                if carte_match:
-                    # This is a credit card payment - set special category
-                    current_transaction.libelle_interbancaire = "PAIEMENT CB"
-                    # Keep the complete CARTE information in operation_type
-                    operation_text = remaining_text
-                else:
-                    operation_text = remaining_text
-                
-                # Extract amount from the operation text if present
-                amount_in_operation = None
+                    if collecting:
+                        self._complete_transaction(current_transaction, amounts, detail_lines)
+                    yield current_transaction
                 
-                # Look for amount pattern at the end of the operation text
-                amount_match = re.search(r'(\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d{4,}(?:,\d{2})?|\d{1,3}(?:,\d{2})?)\s*\*?\s*$', operation_text)
-                if amount_match:
-                    amount_in_operation = self._parse_french_amount(amount_match.group(1))
-                    # Remove the amount from the operation text
-                    operation_text = operation_text[:amount_match.start()].strip()
-                
-                current_transaction.operation_type = self._clean_text(operation_text)
-                current_transaction.detail_lines = []
-                
-                # Set the amount if found in operation text
-                if amount_in_operation:
-                    # Determine if this is debit or credit based on operation type
-                    operation_upper = operation_text.upper()
-                    is_credit_operation = any(keyword in operation_upper for keyword in [
-                        'VIR INST RE', 'VIR RECU', 'REMISE', 'DEPOT', 'VRST GAB', 'VIREMENT RECU'
-                    ])
-                    
-                    if is_credit_operation:
-                        current_transaction.credit = amount_in_operation
-                    else:
-                        current_transaction.debit = amount_in_operation
-                
-                # Parse amounts and detail lines following this transaction
-                i = self._parse_transaction_details(current_transaction, i, lines)
+                current_transaction = self._start_transaction(value)
+                amounts = []
+                detail_lines = []
+                collecting = True
+            elif not collecting:
+                # Lines outside of a transaction are skipped
+                continue
+            elif label == BOUNDARY:
+                # Two dates without operation: the transaction details end here
+                self._complete_transaction(current_transaction, amounts, detail_lines)
+                collecting = False
+            elif label == AMOUNT:
+                amounts.append(self._parse_french_amount(value))
             else:
-                i += 1
+                detail_lines.append(self._clean_text(line))
         
         # Add last transaction
         if current_transaction:
-            self.statement.add_transaction(current_transaction)
+            if collecting:
+                self._complete_transaction(current_transaction, amounts, detail_lines)
+            yield current_transaction
     
-    def _parse_transaction_details(self, transaction: BankTransaction, start_index: int, all_lines: List[str]):
-        """Parse transaction details and amounts, return next line index to process."""
-        amounts = []
-        detail_lines = []
-        i = start_index + 1
-        cheque_number = None
-        
-        while i < len(all_lines):
-            line = all_lines[i].strip()
-            if not line:
-                i += 1
-                continue
-                
-            # Check if it's a new transaction (starts with two dates)
-            if re.match(r'^(\d{2}/\d{2}/\d{4})\s+(\d{2}/\d{2}/\d{4})', line):
-                break
-            
-            # Check if it's an amount line (numbers, dots, commas, possibly with *)
-            amount_match = re.match(r'^(\d{1,3}(?:\.\d{3})+(?:,\d{2})?|\d{4,}(?:,\d{2})?|\d{1,3}(?:,\d{2})?)\s*\*?$', line)
-            if amount_match:
-                amounts.append(self._parse_french_amount(amount_match.group(1)))
+    def _start_transaction(self, match: re.Match) -> BankTransaction:
+        """Create a transaction from a START line match (two dates and the operation)."""
+        transaction = BankTransaction()
+        transaction.date = self._parse_sg_date(match.group('date'))
+        transaction.value_date = self._parse_sg_date(match.group('value_date'))
+        
+        operation_text = match.group('operation')
+        
+        # Check if this is a CARTE (credit card) transaction
+        if CARTE_RE.match(operation_text):
+            # This is a credit card payment - set special category
+            # and keep the complete CARTE information in operation_type
+            transaction.libelle_interbancaire = "PAIEMENT CB"
+        
+        # Look for amount pattern at the end of the operation text
+        amount_in_operation = None
+        trailing_amount = _trailing_amount(operation_text)
+        if trailing_amount:
+            amount_start, amount_text = trailing_amount
+            amount_in_operation = self._parse_french_amount(amount_text)
+            # Remove the amount from the operation text
+            operation_text = operation_text[:amount_start].strip()
+        
+        transaction.operation_type = intern_label(self._clean_text(operation_text))
+        # Set when parsing, so the CSV files and the SQLite store have the same categories
+        transaction.category = self._get_operation_category(transaction.operation_type)
+        
+        # Set the amount if found in operation text
+        if amount_in_operation:
+            # Determine if this is debit or credit based on the operation text
+            if self.RULES.is_credit(operation_text):
+                transaction.credit = amount_in_operation
             else:
-                # For CHEQUE operations, check if this line contains just a number (the cheque number)
-                if 'CHEQUE' in transaction.operation_type.upper() and 'REMISE' not in transaction.operation_type.upper():
-                    # Check if line is just a number (cheque number)
-                    if re.match(r'^\d+$', line):
-                        cheque_number = line
-                        # Skip adding this as a detail line since we'll include it in operation_type
-                        i += 1
-                        continue
-                
-                # It's a detail line
-                detail_lines.append(self._clean_text(line))
-            
-            i += 1
+                transaction.debit = amount_in_operation
         
-        # Set amounts based on what we found and operation type
+        return transaction
+    
+    def _complete_transaction(self, transaction: BankTransaction, amounts: List[float],
+                              detail_lines: List[str]):
+        """Set amounts found on the lines following the transaction start, and its detail lines."""
         # Only set amounts if they weren't already set from the operation text
         if amounts and not transaction.debit and not transaction.credit:
             # Determine if this is a debit or credit operation based on keywords
-            operation_upper = transaction.operation_type.upper()
-            is_credit_operation = any(keyword in operation_upper for keyword in [
-                'VIR INST RE', 'VIR RECU', 'REMISE', 'DEPOT', 'VRST GAB'
-            ])
-            is_debit_operation = any(keyword in operation_upper for keyword in [
-                'VIR EUROPEEN EMIS', 'EMIS', 'FACTURATION', 'FRAIS', 'CHEQUE'
-            ])
+            is_credit_operation = self.RULES.is_credit(transaction.operation_type)
             
             if len(amounts) == 1:
-                # Single amount - classify based on operation type
+                # Single amount - classify based on operation type,
+                # unknown operations default to debit
                 if is_credit_operation:
                     transaction.credit = amounts[0]
-                elif is_debit_operation:
-                    transaction.debit = amounts[0]
                 else:
-                    # Default: assume debit for unknown operations
                     transaction.debit = amounts[0]
-            elif len(amounts) >= 2:
+            else:
                 # Multiple amounts: usually balance and transaction amount
                 # Use the smaller amount as transaction amount
                 transaction_amount = min(amounts)
@@ -247,14 +394,8 @@ class SocieteGeneraleParser(BaseStatementParser):
                 else:
                     transaction.debit = transaction_amount
         
-        # For CHEQUE operations, include the cheque number in the operation type
-        if cheque_number and 'CHEQUE' in transaction.operation_type.upper() and 'REMISE' not in transaction.operation_type.upper():
-            transaction.operation_type = f"CHEQUE {cheque_number}"
-        
         # Store detail lines for CSV generation
         transaction.detail_lines = detail_lines
-        
-        return i
     
     def _add_to_transaction_description(self, transaction: BankTransaction, line: str):
         """Add continuation line to transaction description."""
@@ -265,139 +406,120 @@ class SocieteGeneraleParser(BaseStatementParser):
     
     def _get_operation_category(self, operation_type: str) -> str:
         """Determine the proper category based on operation type."""
-        if not operation_type:
-            return ""
-        
-        operation_upper = operation_type.upper()
-        
-        # COMMISSIONS ET FRAIS DIVERS for fees and charges
-        if any(keyword in operation_upper for keyword in ['FACTURATION', 'FRAIS']):
-            return "COMMISSIONS ET FRAIS DIVERS"
-        
-        # CHEQUES PAYES for check operations
-        if 'CHEQUE' in operation_upper and 'REMISE' not in operation_upper:
-            return "CHEQUES PAYES"
-        
-        # REMISES DE CHEQUES for check deposits
-        if 'REMISE CHEQUE' in operation_upper:
-            return "REMISES DE CHEQUES"
-        
-        # VERSEMENTS ESPECES for cash deposits
-        if 'VRST GAB' in operation_upper:
-            return "VERSEMENTS ESPECES"
-        
-        # ECHEANCE CREDITS for loan payments
-        if 'ECHEANCE PRET' in operation_upper:
-            return "ECHEANCE CREDITS"
-        
-        # AUTRES VIREMENTS RECUS for incoming transfers
-        if 'VIR RECU' in operation_upper:
-            return "AUTRES VIREMENTS RECUS"
-        
-        # Empty category for other incoming transfers
-        if 'VIR INST RE' in operation_upper:
-            return ""
-        
-        # AUTRES VIREMENTS EMIS for outgoing transfers
-        if 'VIR EUROPEEN EMIS' in operation_upper or 'EMIS' in operation_upper:
-            return "AUTRES VIREMENTS EMIS"
-        
-        # Default to empty for unknown operations
-        return ""
-
+        return self.RULES.category(operation_type)
+    
     def _clean_text(self, text: str) -> str:
         """Clean text by removing extra spaces, line breaks, and non-printable characters."""
         if not text:
             return text
         
-        import re
-        
         # Remove non-printable characters (keep only printable ASCII and common accented characters)
         # Keep space (32), printable ASCII (33-126), and common extended ASCII for French (128-255)
         cleaned = ''.join(char for char in text if ord(char) == 32 or (33 <= ord(char) <= 126) or (128 <= ord(char) <= 255))
         
         # Replace line breaks with spaces
-        cleaned = re.sub(r'[\r\n]+', ' ', cleaned)
+        cleaned = LINE_BREAKS_RE.sub(' ', cleaned)
         
         # Replace multiple spaces with single spaces
-        cleaned = re.sub(r' +', ' ', cleaned)
+        cleaned = SPACES_RE.sub(' ', cleaned)
         
         # Strip leading and trailing spaces
         cleaned = cleaned.strip()
         
         return cleaned
-
+    
+    def _parse_balance(self, match: re.Match) -> float:
+        """Parse the signed amount of a BALANCE_RE or OPENING_BALANCE_RE match."""
+        balance = self._parse_french_amount(match.group(2))
+        return -balance if match.group(1) == '-' else balance
+    
     def _parse_french_amount(self, amount_str: str) -> float:
         """Parse French formatted amount (1.234,56)."""
-        # Remove thousand separators and convert decimal comma to dot
-        cleaned = amount_str.replace('.', '').replace(',', '.')
-        return float(cleaned)
+        # Same float as parse_french_cents() / 100, faster in the transaction loop;
+        # totals are summed in cents (see verify.py)
+        return float(amount_str.replace('.', '').replace(',', '.'))
+    
+    def _parse_sg_date(self, date_str: str) -> datetime:
+        """Parse a dd/mm/yyyy date, memoized."""
+        date = self.dates.parse(date_str)
+        if date is None:
+            # As strptime did: an invalid date is a statement this parser cannot read
+            raise ValueError(f"Invalid date: {date_str!r}")
+        return date
     
-    def to_csv_format(self) -> List[List[str]]:
+    def to_csv_format(self, statement: Optional[BankStatement] = None) -> List[List[str]]:
         """Generate CSV format matching the expected output."""
+        rows = self.csv_preamble(statement)
+        rows.append(self.csv_header())
+        rows.extend(self.csv_transaction_rows(statement))
+        return rows
+    
+    def csv_preamble(self, statement: Optional[BankStatement] = None) -> List[List[str]]:
+        """Generate the 6 statement header rows written before the column headers."""
+        statement = statement if statement is not None else self.statement
         rows = []
         
         # Header rows - exact format from example
-        rows.append([f'{self.statement.bank_name}'])
+        rows.append([f'{statement.bank_name}'])
         # Concatenate client_name and client_section for column 2 if both exist
-        client_info = self.statement.client_name
-        if self.statement.client_section:
-            client_info = f"{self.statement.client_name} {self.statement.client_section}"
-        rows.append([f'{self.statement.account_number}', f'{self.statement.bank_code}', client_info])
+        client_info = statement.client_name
+        if statement.client_section:
+            client_info = f"{statement.client_name} {statement.client_section}"
+        rows.append([f'{statement.account_number}', f'{statement.bank_code}', client_info])
         rows.append(['CAV ADMI'])
         
         # Use extracted date
-        end_date_str = self.statement.end_date.strftime('%d/%m/%Y') if self.statement.end_date else ''
+        end_date_str = statement.end_date.strftime('%d/%m/%Y') if statement.end_date else ''
         rows.append(['Solde au', end_date_str])
         
         # Use extracted balance with French formatting
-        balance_value = self.statement.closing_balance if self.statement.closing_balance is not None else self.statement.final_balance
+        balance_value = statement.closing_balance if statement.closing_balance is not None else statement.final_balance
         balance_str = ''
         if balance_value is not None:
-            balance_str = f"{balance_value:,.2f}".replace(',', ' ').replace('.', ',')
+            balance_str = format_french_amount(balance_value)
         rows.append(['Solde', balance_str, 'EUR'])
         
         # Empty line 6 to comply with bank format
         rows.append([])
         
-        # Column headers for transaction data
-        rows.append(['Date', 'Nature de l\'opération', 'Débit', 'Crédit', 'Devise', 'Date de valeur', 'Libellé interbancaire'])
-        
-        # Add transaction rows
-        for transaction in self.statement.transactions:
-            # First row with main transaction data
-            date_str = transaction.date.strftime('%d/%m/%Y') if transaction.date else ''
-            value_date_str = transaction.value_date.strftime('%d/%m/%Y') if transaction.value_date else ''
-            
-            # Format amounts with French formatting (space as thousand separator, comma as decimal)
-            debit_str = ''
-            credit_str = ''
+        return rows
+    
+    def csv_header(self) -> List[str]:
+        """Column headers for transaction data."""
+        return ['Date', 'Nature de l\'opération', 'Débit', 'Crédit', 'Devise', 'Date de valeur', 'Libellé interbancaire']
+    
+    def transaction_csv_rows(self, transaction: BankTransaction) -> List[List[str]]:
+        """Transaction row, followed by one row per detail line."""
+        # First row with main transaction data
+        date_str = transaction.date.strftime('%d/%m/%Y') if transaction.date else ''
+        value_date_str = transaction.value_date.strftime('%d/%m/%Y') if transaction.value_date else ''
+        
+        # Format amounts with French formatting (space as thousand separator, comma as decimal)
+        debit_str = ''
+        credit_str = ''
             
-            if transaction.debit:
-                # Format as negative amount with French formatting
-                formatted_amount = f"{transaction.debit:,.2f}".replace(',', ' ').replace('.', ',')
-                debit_str = f"-{formatted_amount}"
+        if transaction.debit:
+            # Format as negative amount with French formatting
+            debit_str = f"-{format_french_amount(transaction.debit)}"
             
-            if transaction.credit:
-                # Format as positive amount with French formatting  
-                formatted_amount = f"{transaction.credit:,.2f}".replace(',', ' ').replace('.', ',')
-                credit_str = formatted_amount
+        if transaction.credit:
+            # Format as positive amount with French formatting
+            credit_str = format_french_amount(transaction.credit)
             
-            # Main transaction row
-            category = transaction.libelle_interbancaire or self._get_operation_category(transaction.operation_type)
-            rows.append([
-                date_str,
-                transaction.operation_type or '',
-                debit_str,
-                credit_str,
-                'EUR',
-                value_date_str,
-                category
-            ])
+        # Main transaction row
+        category = transaction.libelle_interbancaire or transaction.category
+        rows = [[
+            date_str,
+            transaction.operation_type or '',
+            debit_str,
+            credit_str,
+            'EUR',
+            value_date_str,
+            category
+        ]]
             
-            # Additional detail rows for multi-line descriptions
-            if hasattr(transaction, 'detail_lines') and transaction.detail_lines:
-                for detail_line in transaction.detail_lines:
-                    rows.append(['', detail_line, '', '', '', '', ''])
-        
+        # Additional detail rows for multi-line descriptions
+        for detail_line in transaction.detail_lines:
+            rows.append(['', detail_line, '', '', '', '', ''])
         return rows
+            
\ No newline at end of file
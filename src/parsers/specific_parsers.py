@@ -7,7 +7,7 @@ extending the base parser functionality.
 
 import re
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
 import sys
 import os
 
@@ -19,8 +19,29 @@ src_dir = os.path.dirname(current_dir)
 sys.path.append(src_dir)
 sys.path.append(parsers_dir)
 
-from base_parser import BaseStatementParser
+from base_parser import BaseStatementParser, LineSpans
 from models import BankTransaction, BankStatement
+from dates import FRENCH_MONTH_NAMES
+
+
+# French bank names, used to recognize French statements
+FRENCH_BANK_RE = re.compile(
+    r'\b(?:Crédit\s+(?:Agricole|Mutuel|du\s+Nord|Lyonnais)'
+    r'|Banque\s+(?:Populaire|Postale|de\s+France)'
+    r'|BNP\s*Paribas|Société\s+Générale|LCL'
+    r'|Caisse\s+d\'Épargne)\b',
+    re.IGNORECASE
+)
+
+
+class FrenchPatterns(NamedTuple):
+    """Compiled regexes of a FrenchBankParser class."""
+    
+    dates: Tuple[re.Pattern, ...]  # Dates of the header lines
+    line_dates: Tuple[re.Pattern, ...]  # Tried in order on the start of a line, the first match gives its date
+    all_dates: re.Pattern  # Every date of a line, cut from its description
+    banks: Tuple[re.Pattern, ...]
+    accounts: Tuple[re.Pattern, ...]
 
 
 class FrenchBankParser(BaseStatementParser):
@@ -31,47 +52,84 @@ class FrenchBankParser(BaseStatementParser):
     and common French banking terminology.
     """
     
-    def __init__(self, text_file_path: str):
-        super().__init__(text_file_path)
-        
-        # French date patterns
-        self.french_date_patterns = [
-            r'\b(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})\b',  # DD/MM/YYYY
-            r'\b(\d{1,2}\s+(?:janv|févr|mars|avr|mai|juin|juil|août|sept|oct|nov|déc)\w*\.?\s+\d{2,4})\b'
-        ]
-        
-        # French amount patterns (EUR)
-        # Supports amounts up to 10+ million, both formatted and unformatted
-        self.french_amount_patterns = [
-            # Formatted amounts with space separators: 1 234 567,89 €
-            r'([+-]?\d{1,3}(?:\s\d{3})+(?:,\d{2})?)\s*€',
-            # Formatted amounts with dot separators: 1.234.567,89 EUR
-            r'([+-]?\d{1,3}(?:\.\d{3})+(?:,\d{2})?)\s*EUR',
-            # Unformatted large amounts: 1234567,89 €
-            r'([+-]?\d{4,}(?:,\d{2})?)\s*€?',
-            # Small amounts: 123,45 € or 123 €
-            r'([+-]?\d{1,3}(?:,\d{2})?)\s*€',
-            # Euro prefix patterns
-            r'€\s*([+-]?\d{1,3}(?:\s\d{3})+(?:,\d{2})?)',  # € 1 234 567,89
-            r'€\s*([+-]?\d{4,}(?:,\d{2})?)',               # € 1234567,89
-            r'€\s*([+-]?\d{1,3}(?:,\d{2})?)'               # € 123,45
-        ]
-        
-        # French bank name patterns
-        self.french_bank_patterns = [
-            r'(?i)\b(Crédit\s+(?:Agricole|Mutuel|du\s+Nord|Lyonnais))\b',
-            r'(?i)\b(Banque\s+(?:Populaire|Postale|de\s+France))\b',
-            r'(?i)\b(BNP\s*Paribas|Société\s+Générale|LCL)\b',
-            r'(?i)\b(Caisse\s+d\'Épargne)\b'
-        ]
+    # 2: dates in the format of the first date of the document first, full month names
+    # 3: each amount found once, the balance is the last one
+    # 4: the numbers of a date are not amounts
+    PARSER_VERSION = 4
+    
+    DATE_FORMATS = (
+        "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y",
+        "%d/%m/%y", "%d-%m-%y", "%d.%m.%y",
+        "%d %b %Y"
+    )
+    # Full or abbreviated ("janvier", "janv.")
+    MONTH_NAMES = FRENCH_MONTH_NAMES
+    
+    # Amounts are written 1.234,56 or 1 234,56
+    DECIMAL_SEPARATOR = ','
+    
+    # French date patterns (case-insensitive)
+    DATE_PATTERNS = (
+        r'\b(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4})\b',  # DD/MM/YYYY
+        r'\b(\d{1,2}\s+(?:janv|févr|mars|avr|mai|juin|juil|août|sept|oct|nov|déc)\w*\.?\s+\d{2,4})\b'
+    )
+    
+    # French bank name patterns
+    BANK_PATTERNS = (
+        r'(?i)\b(Crédit\s+(?:Agricole|Mutuel|du\s+Nord|Lyonnais))\b',
+        r'(?i)\b(Banque\s+(?:Populaire|Postale|de\s+France))\b',
+        r'(?i)\b(BNP\s*Paribas|Société\s+Générale|LCL)\b',
+        r'(?i)\b(Caisse\s+d\'Épargne)\b'
+    )
+    
+    # French account patterns, the first one matching a line gives the account number
+    ACCOUNT_PATTERNS = (
+        r'(?i)compte\s*(?:n°|numéro)?\s*:?\s*(\d+[\s\-]?\d*)',
+        r'(?i)n°\s*compte\s*:?\s*(\d+[\s\-]?\d*)',
+        r'\b(\d{5,}\s*\d{3,})\b'  # Generic account number pattern
+    )
+    
+    @classmethod
+    def compile_patterns(cls) -> FrenchPatterns:
+        """Compile the date, bank name and account patterns."""
+        return FrenchPatterns(
+            dates=tuple(re.compile(pattern, re.IGNORECASE) for pattern in cls.DATE_PATTERNS),
+            line_dates=tuple(re.compile(r'^' + pattern, re.IGNORECASE) for pattern in cls.DATE_PATTERNS),
+            all_dates=re.compile('|'.join(cls.DATE_PATTERNS), re.IGNORECASE),
+            banks=tuple(re.compile(pattern) for pattern in cls.BANK_PATTERNS),
+            accounts=tuple(re.compile(pattern) for pattern in cls.ACCOUNT_PATTERNS),
+        )
+    
+    @classmethod
+    def sniff(cls, head: str) -> float:
+        """Recognize statements naming a French bank."""
+        return 0.5 if FRENCH_BANK_RE.search(head) else 0.0
+    
+    @classmethod
+    def starts_transaction(cls, line: str) -> bool:
+        """Every line is parsed on its own, so a statement can be cut anywhere."""
+        return True
+    
+    def parse_transactions(self, lines: List[str]) -> List[BankTransaction]:
+        """Extract the transactions of a chunk of filtered lines."""
+        return list(self._iter_french_transactions(lines))
     
     def parse(self) -> BankStatement:
         """Parse French bank statement format."""
+        self.parse_header()
+        self._extract_french_transactions()
+        return self.statement
+    
+    def parse_header(self) -> BankStatement:
+        """Extract the bank name, account and dates from the first lines."""
         self._extract_french_bank_info()
         self._extract_french_dates()
-        self._extract_french_transactions()
         return self.statement
     
+    def iter_transactions(self) -> Iterator[BankTransaction]:
+        """Yield the transactions one by one, as soon as each one is complete."""
+        return self._iter_french_transactions(self._parsed_lines())
+    
     def _extract_french_bank_info(self):
         """Extract French bank information."""
         for line in self.lines[:15]:
@@ -80,21 +138,15 @@ class FrenchBankParser(BaseStatementParser):
                 continue
             
             # Check for French bank names
-            for pattern in self.french_bank_patterns:
-                match = re.search(pattern, line)
+            for bank_search in self._patterns.banks:
+                match = bank_search.search(line)
                 if match:
                     self.statement.bank_name = match.group(1).strip()
                     break
             
             # Look for French account patterns
-            account_patterns = [
-                r'(?i)compte\s*(?:n°|numéro)?\s*:?\s*(\d+[\s\-]?\d*)',
-                r'(?i)n°\s*compte\s*:?\s*(\d+[\s\-]?\d*)',
-                r'\b(\d{5,}\s*\d{3,})\b'  # Generic account number pattern
-            ]
-            
-            for pattern in account_patterns:
-                match = re.search(pattern, line)
+            for account_search in self._patterns.accounts:
+                match = account_search.search(line)
                 if match:
                     self.statement.account_number = match.group(1).replace(' ', '')
                     break
@@ -107,8 +159,8 @@ class FrenchBankParser(BaseStatementParser):
         dates_found = []
         
         for line in self.lines[:25]:
-            for pattern in self.french_date_patterns:
-                matches = re.findall(pattern, line, re.IGNORECASE)
+            for date_search in self._patterns.dates:
+                matches = date_search.findall(line)
                 for match in matches:
                     parsed_date = self._parse_french_date(match)
                     if parsed_date:
@@ -120,101 +172,58 @@ class FrenchBankParser(BaseStatementParser):
             self.statement.end_date = dates_found[-1]
     
     def _parse_french_date(self, date_str: str) -> Optional[datetime]:
-        """Parse French date formats."""
-        # French month abbreviations mapping
-        french_months = {
-            'janv': 'Jan', 'févr': 'Feb', 'mars': 'Mar', 'avr': 'Apr',
-            'mai': 'May', 'juin': 'Jun', 'juil': 'Jul', 'août': 'Aug',
-            'sept': 'Sep', 'oct': 'Oct', 'nov': 'Nov', 'déc': 'Dec'
-        }
-        
-        # Convert French month names to English
-        normalized_date = date_str.lower()
-        for fr_month, en_month in french_months.items():
-            if fr_month in normalized_date:
-                normalized_date = normalized_date.replace(fr_month, en_month)
-                break
-        
-        date_formats = [
-            "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y",
-            "%d/%m/%y", "%d-%m-%y", "%d.%m.%y",
-            "%d %b %Y", "%d %B %Y"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(normalized_date.strip(), fmt)
-            except ValueError:
-                continue
-        
-        return None
+        """Parse French date formats, the format of the first date of the document first."""
+        return self.dates.parse(date_str)
     
     def _extract_french_transactions(self):
         """Extract transactions with French formatting."""
-        for line in self.lines:
+        for transaction in self._iter_french_transactions(self._parsed_lines()):
+            self.statement.add_transaction(transaction)
+    
+    def _iter_french_transactions(self, lines: Iterable[str]) -> Iterator[BankTransaction]:
+        """Yield the transactions of filtered lines."""
+        date_searches = self._patterns.line_dates
+        
+        for line in lines:
             line = line.strip()
             if not line or len(line) < 10:
                 continue
             
             # Look for date at start of line
             date_found = None
-            for pattern in self.french_date_patterns:
-                match = re.search(r'^' + pattern, line, re.IGNORECASE)
+            for date_search in date_searches:
+                match = date_search.search(line)
                 if match:
                     date_found = self._parse_french_date(match.group(1))
                     break
             
             if date_found:
-                # Extract amounts
-                amounts = self._extract_french_amounts(line)
+                # Extract amounts outside of the dates, their spans are cut from the description
+                spans = self._scan_line(line, self._patterns.all_dates)
+                amounts = [cents / 100 for _, _, cents in spans[1]]
                 
                 # Create transaction
                 transaction = BankTransaction()
                 transaction.date = date_found
-                transaction.description = self._clean_french_description(line)
+                transaction.description = self._clean_french_description(line, spans)
                 
                 if amounts:
+                    # The last amount is the balance, numbers of the label come first
                     if len(amounts) >= 2:
-                        transaction.amount = amounts[0]
+                        transaction.amount = amounts[-2]
                         transaction.balance = amounts[-1]
                     else:
                         transaction.amount = amounts[0]
                 
-                self.statement.add_transaction(transaction)
+                yield transaction
     
     def _extract_french_amounts(self, line: str) -> List[float]:
-        """Extract amounts with French formatting (comma as decimal separator)."""
-        amounts = []
-        
-        for pattern in self.french_amount_patterns:
-            matches = re.findall(pattern, line)
-            for match in matches:
-                try:
-                    # Convert French number format to float
-                    # Replace spaces and dots used as thousands separators
-                    amount_str = match.replace(' ', '').replace('.', '')
-                    # Replace comma decimal separator with dot
-                    amount_str = amount_str.replace(',', '.')
-                    amount = float(amount_str)
-                    amounts.append(amount)
-                except ValueError:
-                    continue
-        
-        return amounts
+        """Extract amounts with French formatting (comma as decimal separator), in one pass, outside of the dates."""
+        return [cents / 100 for _, _, cents in self._scan_line(line, self._patterns.all_dates)[1]]
     
-    def _clean_french_description(self, line: str) -> str:
-        """Clean French transaction description."""
-        cleaned = line
-        
-        # Remove dates
-        for pattern in self.french_date_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-        
-        # Remove amounts
-        for pattern in self.french_amount_patterns:
-            cleaned = re.sub(pattern, '', cleaned)
-        
-        # Clean up extra spaces
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        
-        return cleaned if cleaned else "Opération"
+    def _clean_french_description(self, line: str, spans: Optional[LineSpans] = None) -> str:
+        """Clean French transaction description (see _clean_description)."""
+        if spans is None:
+            spans = self._scan_line(line, self._patterns.all_dates)
+        return self._cut_description(line, *spans) or "Opération"
+        
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Per-stage timing of file conversions.
+
+Each converted file gets a FileProfile recording the wall and CPU time
+of its stages (extract, filter, parse, csv, merge, sqlite, verify), its line and
+transaction counts and whether the fallback conversion was used. A
+ProfileReport aggregates the profiles of a run and writes them as JSON
+with p50/p95/max values per stage.
+
+When profiling is off, NULL_PROFILE is used instead: its stages are a
+shared no-op context manager, so the instrumentation costs next to nothing.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+STAGES = ('extract', 'filter', 'parse', 'csv', 'merge', 'sqlite', 'verify')
+
+
+class _Stage:
+    """Context manager adding the wall and CPU time of its block to a profile stage."""
+    
+    __slots__ = ('_times', '_wall', '_cpu')
+    
+    def __init__(self, times: Dict[str, float]):
+        self._times = times
+    
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._times['wall'] += time.perf_counter() - self._wall
+        self._times['cpu'] += time.process_time() - self._cpu
+        return False
+
+
+class _NullStage:
+    """Context manager doing nothing, used when profiling is off."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class FileProfile:
+    """Timing and counters of the conversion of one file."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.lines = 0
+        self.transactions = 0
+        self.fallback = False
+        self.parser = None
+    
+    def __bool__(self):
+        return True
+    
+    def stage(self, name: str) -> _Stage:
+        """Return a context manager timing a stage; time spent in the same stage adds up."""
+        times = self.stages.get(name)
+        if times is None:
+            times = self.stages[name] = {'wall': 0.0, 'cpu': 0.0}
+        return _Stage(times)
+    
+    def to_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'parser': self.parser,
+            'lines': self.lines,
+            'transactions': self.transactions,
+            'fallback': self.fallback,
+            'stages': self.stages,
+        }
+
+
+class _NullProfile:
+    """Profile recording nothing. It is false, so counters can be skipped with `if profile:`."""
+    
+    __slots__ = ()
+    
+    def __bool__(self):
+        return False
+    
+    def stage(self, name: str) -> _NullStage:
+        return _NULL_STAGE
+
+
+NULL_PROFILE = _NullProfile()
+
+
+class ProfileReport:
+    """Profiles of all the files of a run."""
+    
+    def __init__(self):
+        self.files: List[FileProfile] = []
+    
+    def add(self, profile: FileProfile):
+        self.files.append(profile)
+    
+    def summary(self) -> Dict[str, dict]:
+        """
+        Aggregate the stage times of all files.
+        
+        Returns:
+            For each stage: the number of files, and p50, p95, max and total
+            of the wall and CPU times
+        """
+        summary = {}
+        for stage in STAGES:
+            measures = [profile.stages[stage] for profile in self.files if stage in profile.stages]
+            if not measures:
+                continue
+            summary[stage] = {'files': len(measures)}
+            for clock in ('wall', 'cpu'):
+                summary[stage][clock] = _aggregate([times[clock] for times in measures])
+        return summary
+    
+    def to_dict(self) -> dict:
+        return {
+            'files': len(self.files),
+            'fallbacks': sum(profile.fallback for profile in self.files),
+            'lines': sum(profile.lines for profile in self.files),
+            'transactions': sum(profile.transactions for profile in self.files),
+            'stages': self.summary(),
+            'per_file': [profile.to_dict() for profile in self.files],
+        }
+    
+    def write(self, output_path: Path):
+        """Write the report as JSON."""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def _aggregate(values: List[float]) -> Dict[str, float]:
+    """Return p50, p95, max and total of a list of times."""
+    values = sorted(values)
+    return {
+        'p50': _percentile(values, 50),
+        'p95': _percentile(values, 95),
+        'max': values[-1],
+        'total': sum(values),
+    }
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
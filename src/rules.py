@@ -0,0 +1,209 @@
+"""
+Keyword rules classifying operation labels.
+
+A rule table is an ordered list of rules, each a dict:
+- "keywords": the rule applies when the label contains one of them,
+- "unless": optional keywords preventing the rule from applying,
+- "category": optional category given to the label,
+- "direction": optional "credit" or "debit".
+
+The category of a label is the one of the first applying rule that has
+a category, its direction the one of the first applying rule that has a
+direction ("debit" when none applies). Keywords are matched in upper case.
+Tables can be written in JSON and loaded with RuleSet.from_file().
+
+A RuleSet finds every keyword of a label in one pass, whatever the size
+of the table: the keywords are compiled into a trie, written as a single
+regex (common prefixes factored, as the goto function of Aho-Corasick)
+and tried at each position of the label in a lookahead, so overlapping
+keywords are all found. At a position, only the longest keyword is
+reported, but the shorter ones starting there are substrings of it: each
+keyword is mapped to the bit mask of all the keywords it contains, and
+the union of the masks of the found keywords is the set of keywords of
+the label. The category and direction of each set of keywords are only
+resolved once, and labels are kept in an LRU cache, as statements repeat
+the same labels a lot.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, NamedTuple
+
+
+CREDIT, DEBIT = 'credit', 'debit'
+
+# Distinct labels whose classification is cached
+DEFAULT_CACHE_SIZE = 4096
+
+
+class Classification(NamedTuple):
+    """Category and direction of an operation label."""
+    
+    category: str
+    credit: bool
+
+
+class RuleSet:
+    """Rule table compiled into a single-pass keyword matcher."""
+    
+    def __init__(self, rules: Iterable[dict], default_category: str = "",
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Compile a rule table.
+        
+        Args:
+            rules: Rules in priority order (see the module documentation)
+            default_category: Category of the labels no category rule applies to
+            cache_size: Number of labels whose classification is cached
+        
+        Raises:
+            ValueError: if a rule has no keyword, an unknown key or an invalid direction
+        """
+        self.rules = [dict(rule) for rule in rules]
+        self.default_category = default_category
+        self.cache_size = cache_size
+        for rule in self.rules:
+            _check_rule(rule)
+        # Identifies the table, e.g. in the cache keys of the statements classified with it
+        self.digest = hashlib.sha256(json.dumps([self.rules, default_category], sort_keys=True)
+                                     .encode('utf-8')).hexdigest()
+        
+        keywords = sorted({keyword.upper() for rule in self.rules
+                           for keyword in (*rule['keywords'], *rule.get('unless', ()))},
+                          key=lambda keyword: (-len(keyword), keyword))
+        self._bits = bits = {keyword: 1 << i for i, keyword in enumerate(keywords)}
+        
+        # Mask of every keyword contained in each keyword, itself included
+        self._keyword_masks = {}
+        for keyword in keywords:
+            mask = 0
+            for other in keywords:
+                if other in keyword:
+                    mask |= bits[other]
+            self._keyword_masks[keyword] = mask
+        self._keywords_re = re.compile('(?=(' + _trie_pattern(keywords) + '))') if keywords else None
+        
+        # (keywords mask, unless mask, value) of the category and direction rules
+        self._category_rules = []
+        self._direction_rules = []
+        for rule in self.rules:
+            direction = rule.get('direction')
+            keywords_mask = _mask(bits, rule['keywords'])
+            unless_mask = _mask(bits, rule.get('unless', ()))
+            if 'category' in rule:
+                self._category_rules.append((keywords_mask, unless_mask, rule['category']))
+            if direction is not None:
+                self._direction_rules.append((keywords_mask, unless_mask, direction == CREDIT))
+        
+        # Classification of each set of keywords found
+        self._by_mask = {}
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+    
+    @classmethod
+    def from_file(cls, path: Path, default_category: str = "") -> 'RuleSet':
+        """
+        Load a rule table from a JSON file: a list of rules, or an object with a "rules" list.
+        
+        Raises:
+            ValueError: if the file is not a valid rule table
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            default_category = data.get('default_category', default_category)
+            data = data.get('rules')
+        if not isinstance(data, list):
+            raise ValueError(f"{path}: expected a list of rules")
+        return cls(data, default_category)
+    
+    def keywords(self, label: str) -> List[str]:
+        """Return the keywords contained in a label, longest first."""
+        mask = self._match(label.upper())
+        return [keyword for keyword, bit in self._bits.items() if mask & bit]
+    
+    def category(self, label: str) -> str:
+        """Return the category of an operation label."""
+        return self.classify(label).category
+    
+    def is_credit(self, label: str) -> bool:
+        """Return True if an operation label is a credit."""
+        return self.classify(label).credit
+    
+    def __reduce__(self):
+        # The cache wraps a bound method: pickle the table and compile it again
+        return (type(self), (self.rules, self.default_category, self.cache_size))
+    
+    def _classify(self, label: str) -> Classification:
+        """Classify a label, in one pass over its text."""
+        mask = self._match(label.upper()) if label else 0
+        classification = self._by_mask.get(mask)
+        if classification is None:
+            category = next((value for keywords_mask, unless_mask, value in self._category_rules
+                             if mask & keywords_mask and not mask & unless_mask),
+                            self.default_category)
+            credit = next((value for keywords_mask, unless_mask, value in self._direction_rules
+                           if mask & keywords_mask and not mask & unless_mask), False)
+            classification = self._by_mask[mask] = Classification(category, credit)
+        return classification
+    
+    def _match(self, text: str) -> int:
+        """Return the bit mask of the keywords contained in an upper case text."""
+        if self._keywords_re is None:
+            return 0
+        mask = 0
+        keyword_masks = self._keyword_masks
+        for keyword in self._keywords_re.findall(text):
+            mask |= keyword_masks[keyword]
+        return mask
+
+
+def _check_rule(rule: dict):
+    """Raise ValueError if a rule is not valid."""
+    unknown = set(rule) - {'keywords', 'unless', 'category', 'direction'}
+    if unknown:
+        raise ValueError(f"Unknown rule keys {sorted(unknown)} in {rule}")
+    for key in ('keywords', 'unless'):
+        keywords = rule.get(key, [])
+        if isinstance(keywords, str) or not all(isinstance(k, str) and k for k in keywords):
+            raise ValueError(f"'{key}' must be a list of non-empty strings in {rule}")
+    if not rule.get('keywords'):
+        raise ValueError(f"Rule without keywords: {rule}")
+    if rule.get('direction') not in (None, CREDIT, DEBIT):
+        raise ValueError(f"Invalid direction {rule['direction']!r} in {rule}")
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Return a regex matching the longest of the keywords at a position.
+    
+    The keywords are stored in a trie, written with its common prefixes
+    factored: "VIR RECU" and "VIR INST RE" give "VIR\\ (?:INST\\ RE|RECU)".
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        # The empty key marks the end of a keyword
+        node[''] = {}
+    
+    def pattern(node: dict) -> str:
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if '' in node:
+            # Optional continuation, greedy so the longest keyword wins
+            return '(?:' + '|'.join(branches) + ')?'
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    
+    return pattern(trie)
+
+
+def _mask(bits: dict, keywords: Iterable[str]) -> int:
+    mask = 0
+    for keyword in keywords:
+        mask |= bits[keyword.upper()]
+    return mask
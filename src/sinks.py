@@ -0,0 +1,412 @@
+"""
+Output sinks for parsed bank statements.
+
+Statements are written using the CSV layout of the parser that produced
+them: its dialect (CSV_DELIMITER, CSV_QUOTING), the optional preamble
+rows, the column headers and the transaction rows.
+
+A merged file can be sorted by date: the transactions of each statement
+form a sorted run and the runs are merged with a heap (k-way merge). Runs
+are kept in memory up to a number of transactions, beyond that they are
+merged and spilled to temporary files, so memory use is bounded by the
+number of runs merged at a time rather than by the number of transactions.
+"""
+
+import csv
+import filecmp
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from itertools import count, islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dedupe import FingerprintIndex, fingerprint_transactions
+from models import BankStatement, BankTransaction
+
+
+# Sort orders of a merged file
+SORT_KEYS = ('date', 'account')
+
+# Transactions of sorted runs held in memory before they are spilled to a file
+DEFAULT_MEMORY_TRANSACTIONS = 200000
+
+# Maximum number of runs merged at a time (open files)
+DEFAULT_MAX_OPEN_RUNS = 64
+
+# Records pickled together in a spilled run
+_SPILL_BLOCK = 1000
+
+
+def write_statement_csv(csv_file: TextIO, parser, statement: Optional[BankStatement] = None):
+    """
+    Write a statement to an open CSV file in the layout of its parser.
+    
+    Args:
+        csv_file: File opened for writing with newline=''
+        parser: Parser defining the CSV layout
+        statement: Statement to write (defaults to the statement parsed by parser)
+    """
+    writer = csv.writer(csv_file, delimiter=parser.CSV_DELIMITER, quoting=parser.CSV_QUOTING)
+    writer.writerows(parser.csv_preamble(statement))
+    _write_header(csv_file, writer, parser)
+    writer.writerows(parser.csv_transaction_rows(statement))
+
+
+def stream_statement_csv(csv_file: TextIO, parser) -> Tuple[BankStatement, int]:
+    """
+    Write the statement of a parser to an open CSV file, one transaction at a time.
+    
+    Transactions come from parser.iter_transactions(), so on a parser created
+    with lines memory use does not grow with the length of the statement. A
+    preamble may show metadata printed after the transactions (the final
+    balance), so the transaction rows of a parser with a preamble are spooled
+    to a temporary file, then copied after the preamble.
+    
+    Args:
+        csv_file: File opened for writing with newline=''
+        parser: Parser not parsed yet, defining the CSV layout
+    
+    Returns:
+        (statement metadata without its transactions, number of transactions)
+    """
+    statement = parser.parse_header()
+    writer = csv.writer(csv_file, delimiter=parser.CSV_DELIMITER, quoting=parser.CSV_QUOTING)
+    
+    if not parser.csv_preamble(statement):
+        _write_header(csv_file, writer, parser)
+        return statement, _write_transactions(writer, parser, parser.iter_transactions())
+    
+    with tempfile.TemporaryFile('w+', newline='', encoding='utf-8') as rows_file:
+        rows_writer = csv.writer(rows_file, delimiter=parser.CSV_DELIMITER, quoting=parser.CSV_QUOTING)
+        count = _write_transactions(rows_writer, parser, parser.iter_transactions())
+        
+        writer.writerows(parser.csv_preamble(statement))
+        _write_header(csv_file, writer, parser)
+        rows_file.seek(0)
+        shutil.copyfileobj(rows_file, csv_file)
+    return statement, count
+
+
+def _write_transactions(writer, parser, transactions: Iterable[BankTransaction]) -> int:
+    """Write the rows of transactions, returns the number of transactions."""
+    count = 0
+    for transaction in transactions:
+        writer.writerows(parser.transaction_csv_rows(transaction))
+        count += 1
+    return count
+
+
+def _write_header(csv_file: TextIO, writer, parser):
+    """Write the column headers, never quoted even when the dialect quotes everything."""
+    if parser.CSV_QUOTING == csv.QUOTE_ALL:
+        # Bypass the CSV writer so the bank format gets its unquoted header line
+        csv_file.write(parser.CSV_DELIMITER.join(parser.csv_header()) + '\n')
+    else:
+        writer.writerow(parser.csv_header())
+
+
+def _optional(value) -> str:
+    return str(value) if value is not None else ""
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    Write a text file, unless it already holds exactly this content.
+    
+    Leaving unchanged files untouched keeps their mtime, so tools syncing
+    the output directory see no churn.
+    
+    Args:
+        path: File to write
+        content: Text to write, with its final line endings
+    
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    data = content.encode('utf-8')
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def replace_if_changed(new_path: Path, path: Path) -> bool:
+    """
+    Move a newly written file over path, unless path already holds the same content.
+    
+    The files are compared block by block, so this also works for files
+    too large to be held in memory. new_path is removed in both cases.
+    
+    Returns:
+        True if path was replaced, False if it was already up to date
+    """
+    try:
+        unchanged = path.exists() and filecmp.cmp(new_path, path, shallow=False)
+    except OSError:
+        unchanged = False
+    
+    if unchanged:
+        os.unlink(new_path)
+        return False
+    os.replace(new_path, path)
+    return True
+
+
+class SortedRuns:
+    """
+    External k-way merge of sorted runs of records.
+    
+    A record is a (key, rows) pair. Records are returned by key, records
+    with equal keys in the order they were added. Runs are held in memory
+    up to memory_records records, then merged into a temporary file; when
+    more than max_open_runs files are spilled, they are merged in passes.
+    """
+    
+    def __init__(self, memory_records: int = DEFAULT_MEMORY_TRANSACTIONS,
+                 max_open_runs: int = DEFAULT_MAX_OPEN_RUNS):
+        """
+        Initialize an empty merge.
+        
+        Args:
+            memory_records: Records held in memory before the runs are spilled
+            max_open_runs: Maximum number of runs merged at a time, at least 2
+        """
+        self.memory_records = memory_records
+        self.max_open_runs = max(2, max_open_runs)
+        self._runs: List[list] = []
+        self._run_records = 0
+        self._files = []
+        # Added to every key, so equal keys keep the insertion order and rows are never compared
+        self._sequence = count()
+    
+    def add_run(self, records: Iterable[Tuple[tuple, list]]):
+        """Add a run of records, sorted here if it is not already."""
+        run = [(key, next(self._sequence), rows) for key, rows in records]
+        # Statements are usually in date order already, which this sort detects in linear time
+        run.sort(key=lambda record: record[:2])
+        self._runs.append(run)
+        self._run_records += len(run)
+        if self._run_records > self.memory_records or len(self._runs) > self.max_open_runs:
+            self._files.append(self._spill(heapq.merge(*self._runs)))
+            self._runs = []
+            self._run_records = 0
+    
+    def __iter__(self) -> Iterator[list]:
+        """Yield the rows of every record, in key order."""
+        if self._runs and len(self._files) + len(self._runs) > self.max_open_runs:
+            self._files.append(self._spill(heapq.merge(*self._runs)))
+            self._runs = []
+        while len(self._files) > self.max_open_runs:
+            # Merge the oldest spilled runs into one, until they can all be open at once
+            group = self._files[:self.max_open_runs]
+            merged = self._spill(heapq.merge(*(self._read(f) for f in group)))
+            for f in group:
+                f.close()
+            self._files = self._files[len(group):] + [merged]
+        
+        sources = [self._read(f) for f in self._files] + self._runs
+        for _, _, rows in heapq.merge(*sources):
+            yield from rows
+    
+    def close(self):
+        """Remove the spilled runs."""
+        for f in self._files:
+            f.close()
+        self._files = []
+        self._runs = []
+    
+    @staticmethod
+    def _spill(records: Iterable[tuple]):
+        """Write sorted records to a temporary file, in pickled blocks."""
+        f = tempfile.TemporaryFile()
+        records = iter(records)
+        while True:
+            block = list(islice(records, _SPILL_BLOCK))
+            if not block:
+                break
+            pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return f
+    
+    @staticmethod
+    def _read(f) -> Iterator[tuple]:
+        """Read back the records of a spilled run."""
+        f.seek(0)
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+def transaction_sort_key(sort_by: str, transaction: BankTransaction, account_number: str = '') -> tuple:
+    """
+    Return the merge order of a transaction.
+    
+    Args:
+        sort_by: 'date', or 'account' for the date order within each account
+        transaction: Transaction to place
+        account_number: Account of the statement holding the transaction
+    """
+    # Transactions without a date come first
+    date_key = transaction.date.toordinal() if transaction.date else 0
+    if sort_by == 'account':
+        return (account_number, date_key)
+    return (date_key,)
+
+
+class MergeSink:
+    """
+    Stream the transactions of many statements into a single CSV file.
+    
+    The merged file uses the dialect and column headers of the parser of the
+    first statement. Headers are written once, statement preambles are not
+    repeated, so the file only holds transaction rows.
+    
+    Rows are appended in the order statements are added, unless sort_by is
+    set: they are then k-way merged by date when the sink is closed.
+    
+    With dedupe, a transaction whose fingerprint was already merged (from
+    an overlapping statement) is skipped, and listed in the duplicates file.
+    """
+    
+    DUPLICATES_HEADER = ["Source", "Account", "Date", "Value date", "Operation type",
+                         "Debit", "Credit", "Amount", "Description"]
+    
+    def __init__(self, output_path: Path, sort_by: Optional[str] = None,
+                 memory_transactions: int = DEFAULT_MEMORY_TRANSACTIONS,
+                 max_open_runs: int = DEFAULT_MAX_OPEN_RUNS, dedupe: bool = False,
+                 duplicates_path: Optional[Path] = None):
+        """
+        Initialize the sink. The output file is created when the first statement is added.
+        
+        Args:
+            output_path: Path of the merged CSV file
+            sort_by: None keeps the order of the statements, 'date' sorts the rows by
+                     transaction date, 'account' by account then date
+            memory_transactions: When sorting, transactions held in memory before
+                                 they are spilled to temporary files
+            max_open_runs: When sorting, maximum number of runs merged at a time
+            dedupe: Skip the transactions already merged from another statement
+            duplicates_path: With dedupe, CSV file listing the skipped transactions
+                             (None only counts them)
+        """
+        if sort_by is not None and sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort order: {sort_by}")
+        self.output_path = Path(output_path)
+        self.sort_by = sort_by
+        self.statement_count = 0
+        self._file = None
+        self._writer = None
+        self._layout = None
+        self._parsers = {}
+        self._runs = SortedRuns(memory_transactions, max_open_runs) if sort_by else None
+        self.duplicate_count = 0
+        self.duplicates_path = Path(duplicates_path) if duplicates_path else None
+        self._fingerprints = FingerprintIndex() if dedupe else None
+        self._duplicates_file = None
+        self._duplicates_writer = None
+    
+    def add(self, statement: BankStatement, parser_class: type, source: str = ''):
+        """
+        Append the transactions of a statement to the merged file.
+        
+        Args:
+            statement: Parsed statement
+            parser_class: Class of the parser that produced the statement
+            source: Where the statement comes from, e.g. the PDF path (for the duplicates file)
+        """
+        self.add_transactions(statement.transactions, parser_class, statement.account_number, source)
+    
+    def add_transactions(self, transactions: Iterable[BankTransaction], parser_class: type,
+                         account_number: str = '', source: str = ''):
+        """
+        Append the transactions of a statement, e.g. from parser.iter_transactions().
+        
+        Args:
+            transactions: Transactions of the statement, consumed one at a time
+            parser_class: Class of the parser that produced the transactions
+            account_number: Account of the statement, used when sorting by account
+                            and in fingerprints
+            source: Where the statement comes from, e.g. the PDF path (for the duplicates file)
+        """
+        parser = self._parser(parser_class)
+        if self._fingerprints is not None:
+            transactions = self._skip_duplicates(transactions, account_number, source)
+        
+        if self._file is None:
+            self._file = open(self.output_path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file, delimiter=parser.CSV_DELIMITER,
+                                      quoting=parser.CSV_QUOTING)
+            self._layout = parser_class
+            _write_header(self._file, self._writer, parser)
+        elif parser_class is not self._layout:
+            print(f"Warning: merging {parser_class.__name__} rows into a "
+                  f"{self._layout.__name__} layout, columns may not line up")
+        
+        if self._runs is None:
+            _write_transactions(self._writer, parser, transactions)
+        else:
+            # The rows of a transaction stay together, they are written when the sink is closed
+            self._runs.add_run((transaction_sort_key(self.sort_by, transaction, account_number),
+                                list(parser.transaction_csv_rows(transaction)))
+                               for transaction in transactions)
+        self.statement_count += 1
+    
+    def close(self):
+        """Write the sorted rows if needed, then close the merged file."""
+        try:
+            if self._runs is not None and self._file is not None:
+                self._writer.writerows(self._runs)
+        finally:
+            if self._runs is not None:
+                self._runs.close()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._duplicates_file is not None:
+                self._duplicates_file.close()
+                self._duplicates_file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _skip_duplicates(self, transactions: Iterable[BankTransaction], account_number: str,
+                         source: str) -> Iterator[BankTransaction]:
+        """Yield the transactions not merged yet, record the others."""
+        for fingerprint, transaction in fingerprint_transactions(transactions, account_number):
+            if self._fingerprints.add(fingerprint):
+                yield transaction
+                continue
+            
+            self.duplicate_count += 1
+            if self.duplicates_path is None:
+                continue
+            if self._duplicates_file is None:
+                self._duplicates_file = open(self.duplicates_path, 'w', newline='', encoding='utf-8')
+                self._duplicates_writer = csv.writer(self._duplicates_file)
+                self._duplicates_writer.writerow(self.DUPLICATES_HEADER)
+            self._duplicates_writer.writerow([
+                source, account_number,
+                transaction.date.strftime("%Y-%m-%d") if transaction.date else "",
+                transaction.value_date.strftime("%Y-%m-%d") if transaction.value_date else "",
+                transaction.operation_type, _optional(transaction.debit),
+                _optional(transaction.credit), _optional(transaction.amount),
+                transaction.description])
+    
+    def _parser(self, parser_class: type):
+        """Return a parser instance used only for its CSV layout."""
+        if parser_class not in self._parsers:
+            self._parsers[parser_class] = parser_class()
+        return self._parsers[parser_class]
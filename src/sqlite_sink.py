@@ -0,0 +1,271 @@
+"""
+SQLite store for parsed bank statements.
+
+Statements and their transactions are written to two tables, so they can
+be queried by account, date range or category instead of searching CSV
+files. The database uses WAL journaling and transactions are inserted in
+batches with executemany, one database transaction per statement.
+
+Rows are upserted on natural keys, so importing the same statement again
+updates it instead of duplicating it:
+- a statement is identified by its account number, its period (the dates
+  of its first and last transactions when the period is unknown) and its
+  source, so statements whose account number or period could not be
+  extracted do not replace each other,
+- a transaction by its statement and its position in the statement.
+
+Only the standard library sqlite3 module is used.
+"""
+
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Optional
+
+from models import BankStatement, BankTransaction
+
+
+SCHEMA_VERSION = 2
+
+# Transactions sent to the database in one executemany call
+BATCH_SIZE = 1000
+
+_STATEMENTS_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    id INTEGER PRIMARY KEY,
+    account_number TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    bank_name TEXT,
+    bank_code TEXT,
+    account_holder TEXT,
+    client_name TEXT,
+    client_section TEXT,
+    opening_balance REAL,
+    closing_balance REAL,
+    final_balance REAL,
+    parser TEXT,
+    source TEXT NOT NULL DEFAULT '',
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (account_number, start_date, end_date, source)
+);
+"""
+
+_SCHEMA = _STATEMENTS_TABLE.format(name='statements') + """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    statement_id INTEGER NOT NULL REFERENCES statements (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    account_number TEXT NOT NULL,
+    date TEXT,
+    value_date TEXT,
+    description TEXT,
+    operation_type TEXT,
+    amount REAL,
+    debit REAL,
+    credit REAL,
+    balance REAL,
+    reference TEXT,
+    category TEXT,
+    libelle_interbancaire TEXT,
+    detail TEXT,
+    UNIQUE (statement_id, position)
+);
+
+CREATE INDEX IF NOT EXISTS transactions_account_date ON transactions (account_number, date);
+CREATE INDEX IF NOT EXISTS transactions_category ON transactions (category);
+"""
+
+_STATEMENT_COLUMNS = """id, account_number, start_date, end_date, bank_name, bank_code, account_holder,
+    client_name, client_section, opening_balance, closing_balance, final_balance, parser,
+    source, transaction_count"""
+
+# Version 1 identified the statements without their source: the table is rebuilt
+# with the new key, keeping the ids the transactions refer to
+_MIGRATE_FROM_1 = "BEGIN;" + _STATEMENTS_TABLE.format(name='statements_v2') + f"""
+INSERT INTO statements_v2 ({_STATEMENT_COLUMNS})
+SELECT {_STATEMENT_COLUMNS.replace('source,', "COALESCE(source, ''),")} FROM statements;
+DROP TABLE statements;
+ALTER TABLE statements_v2 RENAME TO statements;
+COMMIT;
+"""
+
+_UPSERT_STATEMENT = """
+INSERT INTO statements (account_number, start_date, end_date, source, bank_name, bank_code,
+                        account_holder, client_name, client_section, opening_balance,
+                        closing_balance, final_balance, parser)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (account_number, start_date, end_date, source) DO UPDATE SET
+    bank_name = excluded.bank_name,
+    bank_code = excluded.bank_code,
+    account_holder = excluded.account_holder,
+    client_name = excluded.client_name,
+    client_section = excluded.client_section,
+    opening_balance = excluded.opening_balance,
+    closing_balance = excluded.closing_balance,
+    final_balance = excluded.final_balance,
+    parser = excluded.parser
+"""
+
+_UPSERT_TRANSACTION = """
+INSERT INTO transactions (statement_id, position, account_number, date, value_date,
+                          description, operation_type, amount, debit, credit, balance,
+                          reference, category, libelle_interbancaire, detail)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (statement_id, position) DO UPDATE SET
+    account_number = excluded.account_number,
+    date = excluded.date,
+    value_date = excluded.value_date,
+    description = excluded.description,
+    operation_type = excluded.operation_type,
+    amount = excluded.amount,
+    debit = excluded.debit,
+    credit = excluded.credit,
+    balance = excluded.balance,
+    reference = excluded.reference,
+    category = excluded.category,
+    libelle_interbancaire = excluded.libelle_interbancaire,
+    detail = excluded.detail
+"""
+
+
+def _iso_date(value: Optional[datetime]) -> Optional[str]:
+    """Format a date as YYYY-MM-DD, which sorts and compares as text."""
+    return value.strftime("%Y-%m-%d") if value else None
+
+
+class SQLiteSink:
+    """Store the statements of a conversion in a SQLite database."""
+    
+    def __init__(self, database_path: Path, batch_size: int = BATCH_SIZE):
+        """
+        Open the database, creating its tables and indexes if needed.
+        
+        Args:
+            database_path: SQLite database file
+            batch_size: Transactions inserted per executemany call
+        """
+        self.database_path = Path(database_path)
+        self.batch_size = batch_size
+        self.statement_count = 0
+        self.transaction_count = 0
+        
+        self._connection = sqlite3.connect(self.database_path)
+        try:
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise ValueError(f"{self.database_path} uses a newer schema (version {version})")
+            
+            if version == 1:
+                # Foreign keys are not enforced yet: dropping the old table keeps the transactions
+                self._connection.executescript(_MIGRATE_FROM_1)
+            
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            # With WAL, a commit is durable once the log is synced at checkpoints
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.execute("PRAGMA foreign_keys = ON")
+            with self._connection:
+                self._connection.executescript(_SCHEMA)
+                self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except Exception:
+            self._connection.close()
+            raise
+    
+    def add(self, statement: BankStatement, parser_class: Optional[type] = None,
+            source: str = "") -> int:
+        """
+        Store a statement and its transactions, replacing a previous import of it.
+        
+        Args:
+            statement: Parsed statement
+            parser_class: Class of the parser that produced the statement
+            source: Where the statement comes from, e.g. the PDF path
+        
+        Returns:
+            The id of the statement row
+        """
+        return self.add_transactions(statement, statement.transactions, parser_class, source)
+    
+    def add_transactions(self, statement: BankStatement, transactions: Iterable[BankTransaction],
+                         parser_class: Optional[type] = None, source: str = "") -> int:
+        """
+        Store a statement with transactions given separately, e.g. from parser.iter_transactions().
+        
+        The statement is identified by its account number, period and source, so
+        when the period is unknown, transactions must be a sequence: the dates
+        of its first and last transactions are used instead.
+        
+        Args:
+            statement: Statement metadata
+            transactions: Transactions of the statement, inserted in batches
+            parser_class: Class of the parser that produced the statement
+            source: Where the statement comes from, e.g. the PDF path
+        
+        Returns:
+            The id of the statement row
+        """
+        start_date = statement.start_date
+        end_date = statement.end_date
+        if start_date is None and end_date is None:
+            dates = [transaction.date for transaction in transactions if transaction.date]
+            if dates:
+                start_date, end_date = dates[0], dates[-1]
+        key = (statement.account_number, _iso_date(start_date) or "", _iso_date(end_date) or "",
+               str(source))
+        
+        # One database transaction per statement: a failed import leaves the previous one intact
+        with self._connection:
+            self._connection.execute(_UPSERT_STATEMENT, key + (
+                statement.bank_name, statement.bank_code, statement.account_holder,
+                statement.client_name, statement.client_section, statement.opening_balance,
+                statement.closing_balance, statement.final_balance,
+                parser_class.__name__ if parser_class else None))
+            statement_id = self._connection.execute(
+                "SELECT id FROM statements "
+                "WHERE account_number = ? AND start_date = ? AND end_date = ? AND source = ?",
+                key).fetchone()[0]
+            
+            rows = self._transaction_rows(statement_id, statement.account_number, transactions)
+            count = 0
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self._connection.executemany(_UPSERT_TRANSACTION, batch)
+                count += len(batch)
+            
+            # The statement may have been parsed with more transactions before
+            self._connection.execute(
+                "DELETE FROM transactions WHERE statement_id = ? AND position >= ?",
+                (statement_id, count))
+            self._connection.execute(
+                "UPDATE statements SET transaction_count = ? WHERE id = ?", (count, statement_id))
+        
+        self.statement_count += 1
+        self.transaction_count += count
+        return statement_id
+    
+    def close(self):
+        """Close the database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def _transaction_rows(statement_id: int, account_number: str,
+                          transactions: Iterable[BankTransaction]):
+        """Yield the parameters of the transaction upserts."""
+        for position, transaction in enumerate(transactions):
+            yield (statement_id, position, account_number, _iso_date(transaction.date),
+                   _iso_date(transaction.value_date), transaction.description,
+                   transaction.operation_type, transaction.amount, transaction.debit,
+                   transaction.credit, transaction.balance, transaction.reference,
+                   transaction.category, transaction.libelle_interbancaire,
+                   '\n'.join(transaction.detail_lines))
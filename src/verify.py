@@ -0,0 +1,208 @@
+"""
+Balance reconciliation of parsed statements.
+
+The transactions of a statement are loaded into an array of signed
+amounts in integer cents (credit - debit, or the signed amount for
+parsers without debit and credit columns) and the running balances are
+their cumulative sum from the opening balance, computed by
+itertools.accumulate over the array, in C. A statement is flagged when:
+- its computed closing balance differs from the extracted one,
+- a balance printed next to a transaction differs from the running balance,
+- its opening balance differs from the closing balance of the previous
+  statement of the same account (statements are chained by period).
+
+Integer cents keep the sums exact, so no tolerance is needed.
+"""
+
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from amounts import format_french_cents, to_cents
+from models import BankStatement, BankTransaction, TransactionTable
+
+
+@dataclass(slots=True)
+class BalanceCheck:
+    """Reconciliation result of one statement, small enough to keep for a whole archive."""
+    
+    source: str = ""
+    account_number: str = ""
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    transaction_count: int = 0
+    opening_cents: Optional[int] = None  # Extracted, or derived from a printed or previous balance
+    closing_cents: Optional[int] = None  # Extracted
+    computed_closing_cents: Optional[int] = None
+    net_cents: int = 0  # Credits minus debits
+    problems: List[str] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def signed_cents(transaction: BankTransaction) -> int:
+    """Return the signed amount of a transaction in cents, credits positive."""
+    if transaction.debit is not None or transaction.credit is not None:
+        return to_cents(transaction.credit or 0.0) - to_cents(transaction.debit or 0.0)
+    return to_cents(transaction.amount) if transaction.amount is not None else 0
+
+
+def _load_columns(transactions: Sequence[BankTransaction]) -> Tuple[array, List[Tuple[int, int]]]:
+    """
+    Return the signed amounts in cents and the (index, cents) of the printed balances.
+    
+    A TransactionTable is read through its amount columns, without building
+    its rows.
+    """
+    if isinstance(transactions, TransactionTable):
+        amounts = array('q', map(_column_cents, transactions.amounts('debit'),
+                                 transactions.amounts('credit'), transactions.amounts('amount')))
+        printed = [(index, to_cents(balance)) for index, balance in enumerate(transactions.amounts('balance'))
+                   if not math.isnan(balance)]
+    else:
+        amounts = array('q', map(signed_cents, transactions))
+        printed = [(index, to_cents(transaction.balance)) for index, transaction in enumerate(transactions)
+                   if transaction.balance is not None]
+    return amounts, printed
+
+
+def _column_cents(debit: float, credit: float, amount: float) -> int:
+    """signed_cents() over TransactionTable columns, where NaN stands for None."""
+    if not (math.isnan(debit) and math.isnan(credit)):
+        return (0 if math.isnan(credit) else to_cents(credit)) - (0 if math.isnan(debit) else to_cents(debit))
+    return 0 if math.isnan(amount) else to_cents(amount)
+
+
+def check_statement(statement: BankStatement, source: str = "") -> BalanceCheck:
+    """
+    Reconcile the transactions of a statement with its balances.
+    
+    Args:
+        statement: Parsed statement
+        source: Where the statement comes from, e.g. the PDF path (used in messages)
+    
+    Returns:
+        The check, its problems list the discrepancies found
+    """
+    transactions = statement.transactions or []
+    amounts, printed = _load_columns(transactions)
+    check = BalanceCheck(source=source, account_number=statement.account_number,
+                         start_date=statement.start_date, end_date=statement.end_date,
+                         transaction_count=len(amounts), net_cents=sum(amounts))
+    
+    closing = statement.closing_balance if statement.closing_balance is not None else statement.final_balance
+    check.closing_cents = to_cents(closing) if closing is not None else None
+    
+    if statement.opening_balance is not None:
+        check.opening_cents = to_cents(statement.opening_balance)
+    elif printed:
+        # The balance after the first balanced transaction gives the opening balance
+        index, balance = printed[0]
+        check.opening_cents = balance - sum(amounts[:index + 1])
+    if check.opening_cents is None:
+        return check
+    
+    running = array('q', accumulate(amounts, initial=check.opening_cents))
+    check.computed_closing_cents = running[-1]
+    
+    if check.closing_cents is not None and check.computed_closing_cents != check.closing_cents:
+        check.problems.append(
+            f"computed closing balance {_format(check.computed_closing_cents)} differs from "
+            f"the extracted {_format(check.closing_cents)} "
+            f"({_format(check.closing_cents - check.computed_closing_cents)})")
+    
+    # running[index + 1] is the balance after transaction index
+    mismatches = [index for index, balance in printed if running[index + 1] != balance]
+    if mismatches:
+        first = mismatches[0]
+        check.problems.append(
+            f"{len(mismatches)} printed balances differ from the running balance, first on "
+            f"transaction {first + 1} ({_describe(transactions[first])}): printed "
+            f"{_format(to_cents(transactions[first].balance))}, computed {_format(running[first + 1])}")
+    return check
+
+
+def check_chain(checks: List[BalanceCheck]) -> List[BalanceCheck]:
+    """
+    Check that consecutive statements of each account follow on from each other.
+    
+    The opening balance of a statement must be the closing balance of the
+    previous statement of its account. When the opening balance is unknown,
+    it is taken from the previous statement and the closing balance is
+    checked from it. Problems are added to the checks.
+    
+    Args:
+        checks: Checks of statements, in any order
+    
+    Returns:
+        The checks that gained a problem
+    """
+    by_account: Dict[str, List[BalanceCheck]] = {}
+    for check in checks:
+        # Statements without an account or a period cannot be placed in a chain
+        if check.account_number and check.start_date is not None:
+            by_account.setdefault(check.account_number, []).append(check)
+    
+    flagged = []
+    for account_checks in by_account.values():
+        account_checks.sort(key=lambda check: (check.start_date, check.end_date or check.start_date))
+        for previous, check in zip(account_checks, account_checks[1:]):
+            # A statement without a closing balance passes on the one computed for it
+            previous_closing = (previous.closing_cents if previous.closing_cents is not None
+                                else previous.computed_closing_cents)
+            if previous_closing is None:
+                continue
+            previous_source = previous.source or 'the previous statement'
+            if check.opening_cents is not None:
+                if check.opening_cents != previous_closing:
+                    check.problems.append(
+                        f"opening balance {_format(check.opening_cents)} differs from the closing "
+                        f"balance {_format(previous_closing)} of {previous_source}")
+                    flagged.append(check)
+            else:
+                check.opening_cents = previous_closing
+                check.computed_closing_cents = previous_closing + check.net_cents
+                if check.closing_cents is not None and check.computed_closing_cents != check.closing_cents:
+                    check.problems.append(
+                        f"closing balance of {previous_source} plus the transactions gives "
+                        f"{_format(check.computed_closing_cents)}, extracted {_format(check.closing_cents)}")
+                    flagged.append(check)
+    return flagged
+
+
+class BalanceVerifier:
+    """Reconcile the statements of a conversion as they come, then chain them."""
+    
+    def __init__(self):
+        self.checks: List[BalanceCheck] = []
+    
+    def add(self, statement: BankStatement, source: str = "") -> BalanceCheck:
+        """Check a statement; only its BalanceCheck is kept, not its transactions."""
+        check = check_statement(statement, source)
+        self.checks.append(check)
+        return check
+    
+    def finish(self) -> List[BalanceCheck]:
+        """Chain the statements of each account, returns the checks with problems."""
+        check_chain(self.checks)
+        return [check for check in self.checks if check.problems]
+    
+    @property
+    def unverified_count(self) -> int:
+        """Statements whose closing balance could not be checked (call finish() first)."""
+        return sum(1 for check in self.checks
+                   if check.computed_closing_cents is None or check.closing_cents is None)
+
+
+def _format(cents: int) -> str:
+    return format_french_cents(cents)
+
+
+def _describe(transaction: BankTransaction) -> str:
+    date_str = transaction.date.strftime("%Y-%m-%d") if transaction.date else "no date"
+    return f"{date_str} {transaction.operation_type or transaction.description}".strip()
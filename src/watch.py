@@ -0,0 +1,233 @@
+"""
+Incremental conversion: a manifest of converted PDFs and a directory watcher.
+
+The manifest records the size, modification time and content hash of
+every converted PDF, the version of the conversion and the CSV file
+written. A file whose size and mtime did not change is skipped without
+being read; when they changed, the content hash decides, so a file that
+was only touched or copied is not converted again. A file converted with
+another version, or whose CSV file was removed, is converted again.
+
+The directory watcher waits for new PDF files with inotify on Linux
+(through ctypes, no extra dependency) and falls back to polling elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cache import file_hash
+
+
+MANIFEST_VERSION = 2
+DEFAULT_POLL_INTERVAL = 2.0  # seconds
+
+# inotify events: a file was written and closed, or moved into the directory
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+def pdf_files(directory: Path) -> List[str]:
+    """Return the PDF files of a directory, sorted by name."""
+    return sorted(str(path) for path in Path(directory).iterdir()
+                  if path.suffix.lower() == '.pdf' and path.is_file())
+
+
+class Manifest:
+    """Record of the converted PDF files, stored as JSON."""
+    
+    def __init__(self, manifest_path: Path):
+        """
+        Load the manifest, starting empty if the file does not exist or is unreadable.
+        
+        Args:
+            manifest_path: JSON file holding the manifest
+        """
+        self.manifest_path = Path(manifest_path)
+        self.entries: Dict[str, dict] = {}
+        # Hashes computed by changed(), reused by record()
+        self._hashes: Dict[str, str] = {}
+        
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data.get('files', {})
+        except (OSError, ValueError):
+            pass
+    
+    def changed(self, pdf_path: Path, version: str = '') -> bool:
+        """
+        Return True if the file must be converted again.
+        
+        It must when it is new, its content changed since it was recorded, it was
+        converted with another version or its CSV file no longer exists.
+        
+        Args:
+            pdf_path: PDF file
+            version: Version of the conversion, as given to record()
+        """
+        key = str(Path(pdf_path).resolve())
+        entry = self.entries.get(key)
+        if entry is None or entry['version'] != version:
+            return True
+        if entry['output'] is not None and not os.path.exists(entry['output']):
+            return True
+        
+        stat = os.stat(key)
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return False
+        
+        # Size or mtime changed: compare the content
+        digest = self._hashes[key] = file_hash(Path(key))
+        if digest != entry['sha256']:
+            return True
+        entry['size'] = stat.st_size
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return False
+    
+    def record(self, pdf_path: Path, output_path: Optional[Path] = None, version: str = ''):
+        """
+        Record a successfully converted file.
+        
+        Args:
+            pdf_path: Converted PDF file
+            output_path: CSV file written, None if no CSV file was written for it
+            version: Version of the conversion, e.g. of the parsers
+        """
+        key = str(Path(pdf_path).resolve())
+        stat = os.stat(key)
+        digest = self._hashes.pop(key, None) or file_hash(Path(key))
+        self.entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest,
+                             'version': version,
+                             'output': str(Path(output_path).resolve()) if output_path is not None else None}
+    
+    def save(self):
+        """Write the manifest atomically."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.manifest_path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_name, self.manifest_path)
+
+
+class DirectoryWatcher:
+    """Wait for files to be written or moved into a directory."""
+    
+    def __init__(self, directory: Path, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_inotify: bool = True):
+        """
+        Initialize the watcher, with inotify when available.
+        
+        Args:
+            directory: Directory to watch
+            poll_interval: Seconds between two scans when polling
+            use_inotify: Use inotify when available, otherwise always poll
+        """
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self._inotify_fd = _inotify_watch(self.directory) if use_inotify else None
+        self._snapshot = self._scan()
+    
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify_fd is not None
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the directory changes.
+        
+        Args:
+            timeout: Maximum wait in seconds (None waits forever)
+        
+        Returns:
+            True if the directory changed, False on timeout
+        """
+        if self._inotify_fd is not None:
+            return self._wait_inotify(timeout)
+        return self._wait_polling(timeout)
+    
+    def close(self):
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _wait_inotify(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._inotify_fd], [], [], remaining)
+            if not readable:
+                return False
+            
+            # Only PDF files matter: the CSV files written next to them also raise events
+            data = os.read(self._inotify_fd, 64 * 1024)
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                _, _, _, name_length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + name_length].rstrip(b'\0')
+                offset += name_length
+                if name.lower().endswith(b'.pdf'):
+                    return True
+    
+    def _wait_polling(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.poll_interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return False
+            time.sleep(delay)
+            
+            snapshot = self._scan()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+    
+    def _scan(self) -> Dict[str, tuple]:
+        """Size and mtime of every PDF file, to detect changes when polling."""
+        snapshot = {}
+        for name in pdf_files(self.directory):
+            try:
+                stat = os.stat(name)
+            except OSError:
+                continue
+            snapshot[name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+
+def _inotify_watch(directory: Path) -> Optional[int]:
+    """Return an inotify file descriptor watching the directory, or None if unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    
+    watch = libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+    if watch < 0:
+        os.close(fd)
+        return None
+    return fd
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous conversion API.
+"""
+
+import asyncio
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add repository root, src and benchmarks directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+import async_converter
+from async_converter import convert_each, convert_many
+from cache import ConversionCache
+from corpus import CorpusOptions, generate
+from pdf2csv import PDF2CSVConverter
+
+
+SG_STATEMENT_PATH = Path(__file__).parent / 'data' / 'sg_statement.txt'
+
+# Stand-in for pdftotext: the test "PDF" files already hold the extracted text
+CAT_SCRIPT = "import sys; sys.stdout.write(open(sys.argv[1], encoding='utf-8').read())"
+
+
+def fake_pdftotext_command(pdf_path):
+    return [sys.executable, '-c', CAT_SCRIPT, str(pdf_path)]
+
+
+class TextFileConverter(PDF2CSVConverter):
+    """Synchronous converter whose "PDF" files already hold the extracted text."""
+    
+    def _run_pdftotext(self, command):
+        return Path(command[-2]).read_text(encoding='utf-8')
+
+
+async def collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+def make_pdfs(directory: Path, count: int):
+    """Create fake PDF files holding the SG statement text."""
+    paths = []
+    for i in range(count):
+        path = directory / f"statement{i}.pdf"
+        shutil.copy(SG_STATEMENT_PATH, path)
+        paths.append(path)
+    return paths
+
+
+def test_convert_many():
+    """Test that every statement comes back and failed files are skipped."""
+    print("Testing convert_many...")
+    
+    original_command = async_converter.pdftotext_command
+    async_converter.pdftotext_command = fake_pdftotext_command
+    try:
+        with tempfile.TemporaryDirectory() as pdf_dir:
+            paths = make_pdfs(Path(pdf_dir), 3)
+            missing = Path(pdf_dir) / 'missing.pdf'
+            
+            statements = asyncio.run(collect(convert_many(paths + [missing], concurrency=2)))
+            results = asyncio.run(collect(convert_each(paths + [missing], concurrency=2)))
+    finally:
+        async_converter.pdftotext_command = original_command
+    
+    assert len(statements) == 3
+    assert all(statement.get_transaction_count() == 11 for statement in statements)
+    assert {path for path, _ in results} == {path.resolve() for path in paths + [missing]}
+    assert dict(results)[missing.resolve()] is None
+    
+    print(f"✓ Converted {len(statements)} statements")
+    return True
+
+
+def test_early_stop():
+    """Test that stopping the iteration cancels the remaining conversions."""
+    print("Testing early stop...")
+    
+    async def first_statement(paths):
+        conversions = convert_many(paths, concurrency=1)
+        async for statement in conversions:
+            await conversions.aclose()
+            # The remaining conversions are finished, not just asked to stop
+            assert asyncio.all_tasks() == {asyncio.current_task()}
+            return statement
+    
+    original_command = async_converter.pdftotext_command
+    async_converter.pdftotext_command = fake_pdftotext_command
+    try:
+        with tempfile.TemporaryDirectory() as pdf_dir:
+            statement = asyncio.run(first_statement(make_pdfs(Path(pdf_dir), 4)))
+    finally:
+        async_converter.pdftotext_command = original_command
+    
+    assert statement.get_transaction_count() == 11
+    print("✓ Remaining conversions were cancelled")
+    return True
+
+
+def test_unreadable_file():
+    """Test that a file that cannot be hashed fails alone, with the cache enabled."""
+    print("Testing unreadable file...")
+    
+    original_command = async_converter.pdftotext_command
+    async_converter.pdftotext_command = fake_pdftotext_command
+    try:
+        with tempfile.TemporaryDirectory() as pdf_dir, tempfile.TemporaryDirectory() as cache_dir:
+            paths = make_pdfs(Path(pdf_dir), 2)
+            # Exists but cannot be read: hashing it raises IsADirectoryError
+            unreadable = Path(pdf_dir) / 'folder.pdf'
+            unreadable.mkdir()
+            
+            results = asyncio.run(collect(convert_each(paths + [unreadable], concurrency=2,
+                                                       cache=ConversionCache(Path(cache_dir)))))
+    finally:
+        async_converter.pdftotext_command = original_command
+    
+    statements = dict(results)
+    assert len(statements) == 3
+    assert statements[unreadable.resolve()] is None
+    assert all(statements[path.resolve()].get_transaction_count() == 11 for path in paths)
+    print("✓ The other files were converted")
+    return True
+
+
+def test_same_statements_as_sync_converter():
+    """Test that the asynchronous API and PDF2CSVConverter parse the same statements."""
+    print("Testing async and sync converters...")
+    
+    original_command = async_converter.pdftotext_command
+    async_converter.pdftotext_command = fake_pdftotext_command
+    try:
+        with tempfile.TemporaryDirectory() as pdf_dir:
+            paths = make_pdfs(Path(pdf_dir), 1)
+            for layout in ('sg', 'generic'):
+                path = Path(pdf_dir) / f"{layout}.pdf"
+                path.write_text(generate(layout, CorpusOptions(transactions=500, seed=7)), encoding='utf-8')
+                paths.append(path)
+            
+            results = dict(asyncio.run(collect(convert_each(paths, concurrency=2))))
+            converter = TextFileConverter(jobs=1, write_csv_files=False)
+            for path in paths:
+                statement = converter.convert_file(str(path)).statement
+                assert results[path.resolve()] == statement, path.name
+                assert statement.get_transaction_count() > 0
+    finally:
+        async_converter.pdftotext_command = original_command
+    
+    print(f"✓ {len(paths)} statements identical")
+    return True
+
+
+def main():
+    """Run async converter tests."""
+    print("Running async converter tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_convert_many,
+        test_early_stop,
+        test_unreadable_file,
+        test_same_statements_as_sync_converter
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Async converter tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All async converter tests passed! ✓")
+        return 0
+    else:
+        print("Some async converter tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
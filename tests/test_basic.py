@@ -6,8 +6,36 @@ Test script for pdf2csv functionality.
 import os
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
+# Add repository root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pdf2csv
+from pdf2csv import PDF2CSVConverter
+from parsers import GenericTextParser
+from watch import Manifest
+
+
+class FakeConverter(PDF2CSVConverter):
+    """Converter that skips pdftotext and fails on files named 'bad*'."""
+    
+    def convert_file(self, pdf_file):
+        if Path(pdf_file).name.startswith('bad'):
+            return None
+        return Path(pdf_file).with_suffix('.csv')
+
+
+class PagedConverter(PDF2CSVConverter):
+    """Converter whose "PDF" files are text files with one page per form feed."""
+    
+    def _run_pdftotext(self, command):
+        pages = Path(command[-2]).read_text(encoding='utf-8').split('\f')[:-1]
+        first = int(command[command.index('-f') + 1]) if '-f' in command else 1
+        last = int(command[command.index('-l') + 1]) if '-l' in command else len(pages)
+        return ''.join(page + '\f' for page in pages[first - 1:last])
+
 
 def test_help_option():
     """Test the --help option."""
@@ -35,6 +63,57 @@ def test_version_option():
         return False
 
 
+class IncrementalConverter(PagedConverter):
+    """Paged converter recording the files it converts."""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.converted = []
+    
+    def check_pdftotext_available(self):
+        return True
+    
+    def convert_file(self, pdf_file):
+        self.converted.append(Path(pdf_file).name)
+        return super().convert_file(pdf_file)
+
+
+def test_incremental_conversion():
+    """Test that unchanged files are skipped unless the parsers changed or their CSV file is gone."""
+    print("Testing incremental conversion...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = Path(tmp_dir) / 'statement.pdf'
+        pdf_path.write_text("01/02/2025 Payment -10.00\n\f", encoding='utf-8')
+        csv_path = pdf_path.with_suffix('.csv')
+        manifest_path = Path(tmp_dir) / 'manifest.json'
+        
+        def run():
+            converter = IncrementalConverter(jobs=1, manifest=Manifest(manifest_path))
+            assert converter.process_files([str(pdf_path)])
+            return converter.converted
+        
+        assert run() == ['statement.pdf'] and csv_path.exists()
+        assert run() == []
+        
+        # Touched but identical: skipped, and the new mtime is saved
+        os.utime(pdf_path, ns=(1, 1))
+        assert run() == []
+        assert Manifest(manifest_path).entries[str(pdf_path.resolve())]['mtime_ns'] == 1
+        
+        csv_path.unlink()
+        assert run() == ['statement.pdf'] and csv_path.exists()
+        
+        original_version = GenericTextParser.PARSER_VERSION
+        GenericTextParser.PARSER_VERSION = original_version + 1
+        try:
+            assert run() == ['statement.pdf']
+        finally:
+            GenericTextParser.PARSER_VERSION = original_version
+    
+    print("✓ Files converted again after a parser upgrade or when their CSV file is gone")
+    return True
+
+
 def test_no_files():
     """Test behavior when no files are provided."""
     print("Testing behavior with no files...")
@@ -48,6 +127,42 @@ def test_no_files():
         return False
 
 
+def test_parallel_conversion_order():
+    """Test that parallel conversion keeps results in input order."""
+    print("Testing parallel conversion order...")
+    files = [f"statement{i:02d}.pdf" for i in range(12)] + ["bad.pdf"]
+    converter = FakeConverter(jobs=3, max_tasks_per_worker=2)
+    results = list(converter._convert_files(files))
+    expected = [Path(f).with_suffix('.csv') for f in files[:-1]] + [None]
+    assert results == expected, results
+    print("✓ Parallel results are in input order")
+    return True
+
+
+def test_page_range_extraction():
+    """Test that a PDF extracted in page ranges gives the text of a single extraction."""
+    print("Testing page range extraction...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = Path(tmp_dir) / 'statement.pdf'
+        pdf_path.write_text(''.join(f"page {i}\nline\n\f" for i in range(1, 12)), encoding='utf-8')
+        
+        original_page_count = pdf2csv.pdf_page_count
+        pdf2csv.pdf_page_count = lambda path: 11
+        try:
+            sequential = PagedConverter(jobs=1).extract_text(pdf_path)
+            converter = PagedConverter(jobs=3, pages_per_range=4)
+            ranges = converter._page_ranges(pdf_path)
+            split = converter.extract_text(pdf_path)
+        finally:
+            pdf2csv.pdf_page_count = original_page_count
+    
+    assert ranges == [(1, 4), (5, 8), (9, 11)]
+    assert split == sequential
+    assert sequential.count('\f') == 11
+    print(f"✓ {len(ranges)} page ranges joined into the text of the whole document")
+    return True
+
+
 def main():
     """Run basic tests."""
     print("Running basic tests for pdf2csv.py...")
@@ -59,7 +174,10 @@ def main():
     tests = [
         test_help_option,
         test_version_option,
-        test_no_files
+        test_no_files,
+        test_parallel_conversion_order,
+        test_page_range_extraction,
+        test_incremental_conversion
     ]
     
     passed = 0
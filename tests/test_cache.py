@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the text and statement cache.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache import ConversionCache, text_hash
+from parsers import GenericTextParser
+from parsers.sg_parser import SG_RULES, SocieteGeneraleParser
+from rules import RuleSet
+
+
+SAMPLE_PATH = Path(__file__).parent.parent / 'examples' / 'sample_statement.txt'
+
+
+def test_text_cache():
+    """Test storing and reading back extracted text."""
+    print("Testing text cache...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ConversionCache(Path(cache_dir))
+        assert cache.get_text('ab' * 32) is None
+        
+        cache.put_text('ab' * 32, "Relevé de compte\n")
+        assert cache.get_text('ab' * 32) == "Relevé de compte\n"
+    
+    print("✓ Text cache works correctly")
+    return True
+
+
+def test_statement_cache():
+    """Test that statements are keyed by text, parser class, parser version and rule table."""
+    print("Testing statement cache...")
+    
+    text = SAMPLE_PATH.read_text(encoding='utf-8')
+    digest = text_hash(text)
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ConversionCache(Path(cache_dir))
+        parser = SocieteGeneraleParser(text=text)
+        statement = parser.parse()
+        cache.put_statement(digest, parser, statement)
+        
+        assert cache.get_statement(digest, SocieteGeneraleParser(text=text)) == statement
+        assert cache.get_statement(digest, GenericTextParser(text=text)) is None
+        assert cache.get_statement(text_hash(text + "\n"), parser) is None
+        
+        parser.PARSER_VERSION += 1
+        assert cache.get_statement(digest, parser) is None
+        
+        # Statements classified with another rule table are not reused
+        parser = SocieteGeneraleParser(text=text)
+        parser.RULES = RuleSet(SG_RULES[1:])
+        assert cache.get_statement(digest, parser) is None
+        parser.RULES = RuleSet(SG_RULES)
+        assert cache.get_statement(digest, parser) == statement
+    
+    print("✓ Statement cache works correctly")
+    return True
+
+
+def test_eviction():
+    """Test that eviction removes the least recently used entries first."""
+    print("Testing cache eviction...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ConversionCache(Path(cache_dir), max_size=2500)
+        for i, key in enumerate(['aa', 'bb', 'cc']):
+            cache.put_text(key * 32, "x" * 1000)
+            # Make the entries age in insertion order
+            path = cache._text_path(key * 32)
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+        
+        # Reading the oldest entry makes it the most recently used
+        assert cache.get_text('aa' * 32) is not None
+        
+        assert cache.evict() == 1
+        assert cache.get_text('aa' * 32) is not None
+        assert cache.get_text('bb' * 32) is None
+        assert cache.get_text('cc' * 32) is not None
+    
+    print("✓ Least recently used entry was evicted")
+    return True
+
+
+def main():
+    """Run cache tests."""
+    print("Running cache tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_text_cache,
+        test_statement_cache,
+        test_eviction
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Cache tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All cache tests passed! ✓")
+        return 0
+    else:
+        print("Some cache tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the conversion steps shared by the converters.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add src and benchmarks directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from conversion import page_ranges, parse_statement, pdftotext_command, transaction_chunks
+from corpus import CorpusOptions, generate
+from parsers.registry import detect_parser
+
+
+def test_page_ranges():
+    """Test page range splitting and the pdftotext command of a range."""
+    print("Testing page ranges...")
+    
+    assert page_ranges(10, 4) == [(1, 4), (5, 8), (9, 10)]
+    assert page_ranges(8, 4) == [(1, 4), (5, 8)]
+    assert page_ranges(3, 50) == [(1, 3)]
+    assert pdftotext_command(Path('a.pdf')) == ['pdftotext', '-layout', 'a.pdf', '-']
+    assert pdftotext_command(Path('a.pdf'), 5, 8) == ['pdftotext', '-layout', '-f', '5', '-l', '8', 'a.pdf', '-']
+    
+    print("✓ Page ranges cover every page once")
+    return True
+
+
+def test_chunked_parsing():
+    """Test that parsing in chunks gives the statement of a single parse."""
+    print("Testing chunked parsing...")
+    
+    # Short pages, so many transactions continue on the next page after "suite >>>"
+    options = CorpusOptions(transactions=600, seed=5, lines_per_page=7)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for layout in ('sg', 'generic'):
+            text = generate(layout, options)
+            expected = detect_parser(text).parse()
+            
+            parser = detect_parser(text)
+            chunks = transaction_chunks(parser, chunk_lines=150)
+            assert len(chunks) > 3
+            assert sum(len(chunk) for chunk in chunks) == len(parser.lines)
+            assert all(parser.starts_transaction(chunk[0]) for chunk in chunks[1:])
+            
+            statement = parse_statement(parser, executor, chunk_lines=150)
+            assert statement == expected
+            assert parser.statement is statement
+            print(f"✓ {layout}: {len(chunks)} chunks, {len(statement.transactions)} transactions")
+    return True
+
+
+def main():
+    """Run conversion tests."""
+    print("Running conversion tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_page_ranges,
+        test_chunked_parsing
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Conversion tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All conversion tests passed! ✓")
+        return 0
+    else:
+        print("Some conversion tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
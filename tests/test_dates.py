@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for date parsing.
+"""
+
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dates import FRENCH_MONTH_NAMES, DateParser, compile_format, parse_dmy
+from parsers import GenericTextParser
+
+
+def test_formats_match_strptime():
+    """Test the compiled formats against strptime, on valid and invalid dates."""
+    print("Testing formats against strptime...")
+    
+    rng = random.Random(11)
+    months = ['Jan', 'jan', 'JANUARY', 'May', 'Sep', 'Sept', 'February', 'Xyz']
+    formats = ["%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d", "%d.%m.%y",
+               "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y"]
+    checked = 0
+    for fmt in formats:
+        parse = compile_format(fmt)
+        for _ in range(3000):
+            day = str(rng.randint(0, 32)).zfill(rng.choice((1, 2)))
+            month = str(rng.randint(0, 13)).zfill(rng.choice((1, 2)))
+            year = rng.choice(('2024', '2025', '1900', '0000', '24', '99'))
+            separator = rng.choice('/-.')
+            for text in (f"{day}{separator}{month}{separator}{year}",
+                         f"{year}{separator}{month}{separator}{day}",
+                         f"{day} {rng.choice(months)} {year}",
+                         f"{rng.choice(months)} {day}, {year}"):
+                try:
+                    expected = datetime.strptime(text, fmt)
+                except ValueError:
+                    expected = None
+                assert parse(text) == expected, (fmt, text)
+                checked += 1
+    
+    assert parse_dmy('29/02/2024') == datetime(2024, 2, 29)
+    assert parse_dmy('29/02/2025') is None
+    print(f"✓ {checked} dates parsed like strptime")
+    return True
+
+
+def test_format_locking():
+    """Test that the first format that succeeds is tried first on the next dates."""
+    print("Testing format locking...")
+    
+    formats = ("%d/%m/%Y", "%m/%d/%Y")
+    dates = DateParser(formats)
+    assert dates.parse('not a date') is None
+    assert dates.locked_format is None
+    
+    # A US document: 05/07 is May 7 once 12/31 locked the month first format
+    assert dates.parse('12/31/2025') == datetime(2025, 12, 31)
+    assert dates.locked_format == "%m/%d/%Y"
+    assert dates.parse('05/07/2025') == datetime(2025, 5, 7)
+    # The other formats are still tried
+    assert dates.parse('31/12/2025') == datetime(2025, 12, 31)
+    assert dates.locked_format == "%m/%d/%Y"
+    assert DateParser(formats).parse('05/07/2025') == datetime(2025, 7, 5)
+    
+    # Results are memoized, misses included, with a bounded memo
+    dates = DateParser(formats, cache_size=2)
+    assert dates.parse(' 01/02/2025 ') is dates.parse(' 01/02/2025 ')
+    for text in ('x', 'y', 'z'):
+        assert dates.parse(text) is None
+    assert len(dates._cache) <= 2
+    
+    # The parsers share the format of the document with their chunks
+    parser = GenericTextParser(text="Statement\n12/31/2025 Opening\n")
+    parser.parse_header()
+    assert parser.dates.locked_format == "%m/%d/%Y"
+    chunk_parser = GenericTextParser()
+    chunk_parser.dates.lock(parser.dates.locked_format)
+    assert chunk_parser.parse_transactions(['05/07/2025 Card 12.50'])[0].date == datetime(2025, 5, 7)
+    print("✓ Format locked by the first date")
+    return True
+
+
+def test_french_month_names():
+    """Test dates with full and abbreviated French month names."""
+    print("Testing French month names...")
+    
+    dates = DateParser(("%d/%m/%Y", "%d %b %Y"), FRENCH_MONTH_NAMES)
+    assert dates.parse('15 janvier 2025') == datetime(2025, 1, 15)
+    assert dates.parse('15 janv. 2025') == datetime(2025, 1, 15)
+    assert dates.parse('1 Août 2024') == datetime(2024, 8, 1)
+    assert dates.parse('3 juillet 2024') == datetime(2024, 7, 3)
+    assert dates.parse('31 févr 2024') is None
+    assert dates.parse('3 July 2024') is None
+    print("✓ French month names parsed")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Running date parsing tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_formats_match_strptime,
+        test_format_locking,
+        test_french_month_names
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Date parsing tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All date parsing tests passed! ✓")
+        return 0
+    else:
+        print("Some date parsing tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
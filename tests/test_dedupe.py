@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for transaction fingerprints and merge deduplication.
+"""
+
+import csv
+import random
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add src and benchmarks directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from corpus import CorpusOptions, generate
+from dedupe import FingerprintIndex, fingerprint_transactions, transaction_fingerprint
+from models import BankStatement, BankTransaction
+from parsers.registry import detect_parser
+from sinks import MergeSink
+
+
+def test_fingerprint_index():
+    """Test the hash index against a Python set, across several table growths."""
+    print("Testing fingerprint index...")
+    
+    rng = random.Random(7)
+    index = FingerprintIndex()
+    expected = set()
+    for _ in range(20000):
+        # A small range, so many fingerprints are added twice
+        fingerprint = rng.randrange(15000) * 0x9E3779B97F4A7C15 % (1 << 64)
+        assert index.add(fingerprint) == (fingerprint not in expected)
+        expected.add(fingerprint)
+    
+    assert len(index) == len(expected)
+    assert all(fingerprint in index for fingerprint in expected)
+    assert 12345 not in index
+    assert index.add(0) and 0 in index and not index.add(0)
+    print(f"✓ {len(index)} fingerprints indexed")
+    return True
+
+
+def test_fingerprint_ordinals():
+    """Test that identical transactions of a statement get distinct fingerprints."""
+    print("Testing fingerprint ordinals...")
+    
+    payment = BankTransaction(date=datetime(2025, 7, 1), operation_type='CARTE', debit=-12.5)
+    other = BankTransaction(date=datetime(2025, 7, 1), operation_type='CARTE', debit=-7.0)
+    fingerprints = [fingerprint for fingerprint, _ in
+                    fingerprint_transactions([payment, other, payment], 'FR76')]
+    
+    assert fingerprints[0] == transaction_fingerprint(payment, 'FR76', 0)
+    assert fingerprints[2] == transaction_fingerprint(payment, 'FR76', 1)
+    assert len(set(fingerprints)) == 3
+    # The account is part of the fingerprint, the description is not
+    assert transaction_fingerprint(payment, 'FR77') != fingerprints[0]
+    reworded = BankTransaction(date=datetime(2025, 7, 1), operation_type='CARTE', debit=-12.5,
+                               description='CB SHOP')
+    assert transaction_fingerprint(reworded, 'FR76') == fingerprints[0]
+    print("✓ Identical payments of a day are told apart")
+    return True
+
+
+def test_merge_overlapping_statements():
+    """Test that the overlap of two statements is merged once and reported."""
+    print("Testing deduplicated merge...")
+    
+    parser = detect_parser(generate('sg', CorpusOptions(transactions=120, seed=9)))
+    statement = parser.parse()
+    transactions = list(statement.transactions)
+    # A monthly statement and an export of the days from the 11th to the 30th
+    monthly = BankStatement(account_number=statement.account_number,
+                            transactions=[t for t in transactions if t.date.day <= 20])
+    export = BankStatement(account_number=statement.account_number,
+                           transactions=[t for t in transactions if t.date.day >= 11])
+    overlap = [t for t in transactions if 11 <= t.date.day <= 20]
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        merged_path = Path(output_dir) / 'merged.csv'
+        duplicates_path = Path(output_dir) / 'merged.duplicates.csv'
+        with MergeSink(merged_path, dedupe=True, duplicates_path=duplicates_path) as sink:
+            sink.add(monthly, type(parser), 'monthly.pdf')
+            sink.add(export, type(parser), 'export.pdf')
+        
+        with open(merged_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f, delimiter=';'))
+        with open(duplicates_path, newline='', encoding='utf-8') as f:
+            duplicates = list(csv.reader(f))
+    
+    expected = [row for t in monthly.transactions + export.transactions[len(overlap):]
+                for row in parser.transaction_csv_rows(t)]
+    assert rows[1:] == expected
+    assert sink.duplicate_count == len(overlap) > 0
+    assert duplicates[0] == MergeSink.DUPLICATES_HEADER
+    assert all(row[0] == 'export.pdf' for row in duplicates[1:])
+    assert [row[-1] for row in duplicates[1:]] == [t.description for t in overlap]
+    print(f"✓ {sink.duplicate_count} duplicates skipped and reported")
+    return True
+
+
+def main():
+    """Run deduplication tests."""
+    print("Running deduplication tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_fingerprint_index,
+        test_fingerprint_ordinals,
+        test_merge_overlapping_statements
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Deduplication tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All deduplication tests passed! ✓")
+        return 0
+    else:
+        print("Some deduplication tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped line index.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and benchmarks directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from corpus import CorpusOptions, generate
+from line_index import FilteredLines, MappedText
+from parsers.registry import detect_parser
+
+
+def write_text(directory: str, name: str, text: str) -> Path:
+    """Write a text file without newline translation."""
+    path = Path(directory) / name
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+    return path
+
+
+def test_mapped_text():
+    """Test that a mapped file splits into the lines of the text."""
+    print("Testing mapped text...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for text in ('', 'one line', 'a\nb\n', 'café\r\nnoël\r\n\nlast', '\n\n'):
+            with MappedText(write_text(tmp_dir, 'text.txt', text)) as mapped:
+                expected = text.replace('\r\n', '\n').split('\n')
+                assert len(mapped) == len(expected)
+                assert list(mapped) == expected
+                assert mapped[-1] == expected[-1]
+                assert mapped[1:] == expected[1:]
+        
+        with MappedText(write_text(tmp_dir, 'text.txt', 'a\nNOUVEAU SOLDE AU 1\nb')) as mapped:
+            assert mapped.find_line('SOLDE') == 'NOUVEAU SOLDE AU 1'
+            assert mapped.find_line('missing') is None
+    
+    print("✓ Mapped lines match str.split")
+    return True
+
+
+def test_filtered_lines():
+    """Test indexing, slicing and iteration of the line bitmap."""
+    print("Testing filtered lines...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        lines = [f"line {i}" for i in range(1000)]
+        with MappedText(write_text(tmp_dir, 'text.txt', '\n'.join(lines))) as mapped:
+            kept = [i for i in range(len(lines)) if i % 3 == 0 or i % 7 == 0]
+            filtered = FilteredLines(mapped, kept)
+            expected = [lines[i] for i in kept]
+            
+            assert len(filtered) == len(expected)
+            assert filtered == expected
+            assert all(filtered[i] == expected[i] for i in range(len(expected)))
+            assert filtered[-1] == expected[-1]
+            assert filtered[100:250] == expected[100:250]
+            assert filtered[5:400:9] == expected[5:400:9]
+            assert filtered[300:10] == []
+            assert FilteredLines(mapped, []) == []
+    
+    print("✓ Filtered lines behave like a list")
+    return True
+
+
+def test_mapped_parsing():
+    """Test that parsing a mapped text file gives the statement of the text."""
+    print("Testing parsing of mapped files...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Statements much longer than the header kept in raw_text
+        for layout in ('sg', 'generic'):
+            text = generate(layout, CorpusOptions(transactions=400, seed=3, lines_per_page=13))
+            expected_parser = detect_parser(text)
+            expected = expected_parser.parse()
+            
+            parser = type(expected_parser)(write_text(tmp_dir, f'{layout}.txt', text))
+            assert parser.lines == expected_parser.lines
+            assert parser.parse() == expected
+            if layout == 'sg':
+                # The final balance follows the transactions, far from the header
+                assert expected.final_balance is not None
+                assert parser.statement.final_balance == expected.final_balance
+            print(f"✓ {layout}: {len(expected.transactions)} transactions")
+    
+    return True
+
+
+def main():
+    """Run line index tests."""
+    print("Running line index tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_mapped_text,
+        test_filtered_lines,
+        test_mapped_parsing
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Line index tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All line index tests passed! ✓")
+        return 0
+    else:
+        print("Some line index tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
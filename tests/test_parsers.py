@@ -3,17 +3,23 @@
 Test script for parser functionality.
 """
 
+import io
 import os
 import sys
 import tempfile
 from pathlib import Path
 
-# Add src directory to Python path
+# Add src and benchmarks directories to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
 
 try:
-    from parsers import GenericTextParser, FrenchBankParser
+    from parsers import GenericTextParser, FrenchBankParser, detect_parser
+    from parsers.registry import SNIFF_SIZE
+    from parsers.sg_parser import SocieteGeneraleParser
     from models import BankStatement, BankTransaction
+    from sinks import write_statement_csv
+    from corpus import CorpusOptions, generate
 except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
@@ -60,7 +66,7 @@ def test_generic_parser():
             print(f"    Transaction {i+1}: {transaction}")
         
         return True
-        
+    
     except Exception as e:
         print(f"  ✗ Generic parser failed: {e}")
         return False
@@ -102,7 +108,7 @@ def test_french_parser():
             print(f"    Transaction {i+1}: {transaction}")
         
         return True
-        
+    
     except Exception as e:
         print(f"  ✗ French parser failed: {e}")
         return False
@@ -110,6 +116,60 @@ def test_french_parser():
         os.unlink(test_file)
 
 
+def test_parser_from_text():
+    """Test that parsing in-memory text matches parsing the text file."""
+    print("\nTesting Parser From Text...")
+    
+    sample_path = Path(__file__).parent.parent / 'examples' / 'sample_statement.txt'
+    text = sample_path.read_text(encoding='utf-8')
+    
+    from_file = SocieteGeneraleParser(str(sample_path))
+    from_text = SocieteGeneraleParser(text=text)
+    
+    assert from_text.text_file_path is None
+    assert from_text.lines == from_file.lines
+    assert from_text.parse() == from_file.parse()
+    assert from_text.to_csv_format() == from_file.to_csv_format()
+    print(f"  ✓ Same statement from text and from file "
+          f"({from_text.statement.get_transaction_count()} transactions)")
+    return True
+
+
+def test_filter_ignore_lines():
+    """Test the ignore-line filter on boilerplate and transaction lines."""
+    print("\nTesting Ignore-Line Filter...")
+    
+    lines = [
+        "Transaction line 1",
+        "VOS CONTACTS",
+        "vos contacts in lower case",
+        "Another transaction",
+        "   Société Générale S.A. au capital de 1 000 000 EUR",
+        "Téléphone : 0969397777",
+        "Internet : entreprises.sg.fr",
+        "n° 12345 67890 00012345678 90",
+        "envoi n°7 Page 1/4",
+        "Débit",
+        "Débit et crédit",
+        "EUR",
+        "RA123456",
+        "Real transaction data",
+        "TOTAUX DES MOUVEMENTS",
+        "Line after totals",
+    ]
+    expected = [
+        "Transaction line 1",
+        "Another transaction",
+        "Débit et crédit",
+        "Real transaction data",
+    ]
+    
+    filtered = GenericTextParser()._filter_ignore_lines(lines)
+    assert filtered == expected, filtered
+    print(f"  ✓ Kept {len(filtered)}/{len(lines)} lines")
+    return True
+
+
 def test_csv_output():
     """Test CSV output format."""
     print("\nTesting CSV Output...")
@@ -145,12 +205,322 @@ def test_csv_output():
         print(f"  ✓ Sample row: {csv_data[1]}")
         
         return True
-        
+    
     except Exception as e:
         print(f"  ✗ CSV output test failed: {e}")
         return False
 
 
+def test_sg_statement_fixture():
+    """Test the SG parser on a statement covering every kind of transaction line."""
+    print("Testing SG statement fixture...")
+    
+    data_dir = Path(__file__).parent / 'data'
+    parser = SocieteGeneraleParser(str(data_dir / 'sg_statement.txt'))
+    statement = parser.parse()
+    
+    output = io.StringIO(newline='')
+    write_statement_csv(output, parser, statement)
+    with open(data_dir / 'sg_statement_expected.csv', newline='', encoding='utf-8') as f:
+        expected = f.read()
+    
+    assert output.getvalue() == expected
+    print(f"✓ {len(statement.transactions)} transactions match the expected CSV")
+    return True
+
+
+def test_sg_overdrawn_fixture():
+    """Test the SG parser on an overdrawn statement: negative balances, signed "Solde" line."""
+    print("Testing SG overdrawn statement fixture...")
+    
+    data_dir = Path(__file__).parent / 'data'
+    parser = SocieteGeneraleParser(str(data_dir / 'sg_statement_overdrawn.txt'))
+    statement = parser.parse()
+    assert statement.opening_balance == -24567.57
+    assert statement.final_balance == -11327.95
+    
+    output = io.StringIO(newline='')
+    write_statement_csv(output, parser, statement)
+    with open(data_dir / 'sg_statement_overdrawn_expected.csv', newline='', encoding='utf-8') as f:
+        expected = f.read()
+    
+    assert output.getvalue() == expected
+    assert '"Solde";"-11 327,95";"EUR"' in expected
+    print(f"✓ {len(statement.transactions)} transactions and the negative balance match the expected CSV")
+    return True
+
+
+def test_sg_operation_direction():
+    """Test that amounts on the operation line get the direction of the raw operation text."""
+    print("Testing SG operation direction...")
+    
+    from parsers.sg_parser import LINE_RE, _trailing_amount
+    
+    parser = SocieteGeneraleParser()
+    transaction = parser._start_transaction(LINE_RE.match("11/07/2025 11/07/2025 VIR RECU 1234567890 150,00"))
+    assert transaction.credit == 150.0 and not transaction.debit
+    transaction = parser._start_transaction(LINE_RE.match("11/07/2025 11/07/2025 PRLV SEPA EDF 42,10"))
+    assert transaction.debit == 42.1 and not transaction.credit
+    
+    # The raw and the cleaned operation texts give the same direction on the fixture and the corpus
+    data_dir = Path(__file__).parent / 'data'
+    texts = [(data_dir / 'sg_statement.txt').read_text(encoding='utf-8'),
+             generate('sg', CorpusOptions(transactions=2000, seed=5))]
+    checked = 0
+    for text in texts:
+        for line in text.split('\n'):
+            match = LINE_RE.match(line.strip())
+            if not match or match.lastgroup != 'start':
+                continue
+            operation_text = match.group('operation')
+            trailing_amount = _trailing_amount(operation_text)
+            if trailing_amount:
+                operation_text = operation_text[:trailing_amount[0]].strip()
+            assert parser.RULES.is_credit(operation_text) == parser.RULES.is_credit(parser._clean_text(operation_text))
+            checked += 1
+    
+    print(f"✓ {checked} operation lines get the same direction from the raw and the cleaned text")
+    return True
+
+
+def test_streaming_parsers():
+    """Test that parsers created on a stream yield the transactions of a full parse."""
+    print("Testing streaming parsers...")
+    
+    sg_text = (Path(__file__).parent / 'data' / 'sg_statement.txt').read_text(encoding='utf-8')
+    french_text = "BNP Paribas\nCompte n° 12345678901\n" + "\n".join(
+        f"{day:02d}/03/2024 PAIEMENT CB MAGASIN {day}    -{day},50    1.000,00" for day in range(1, 29))
+    options = CorpusOptions(transactions=300, seed=7, lines_per_page=11)
+    
+    for parser_class, text in ((SocieteGeneraleParser, sg_text), (FrenchBankParser, french_text),
+                               (SocieteGeneraleParser, generate('sg', options)),
+                               (GenericTextParser, generate('generic', options))):
+        expected = parser_class(text=text).parse()
+        
+        parser = parser_class(lines=io.StringIO(text))
+        header = parser.parse_header()
+        assert header.bank_name == expected.bank_name
+        assert header.account_number == expected.account_number
+        assert header.start_date == expected.start_date
+        
+        transactions = parser.iter_transactions()
+        assert next(transactions) == expected.transactions[0]
+        assert [expected.transactions[0]] + list(transactions) == expected.transactions
+        # Transactions are not kept, the final balance is only known at the end
+        assert header.transactions == []
+        assert header.final_balance == expected.final_balance
+        print(f"✓ {parser_class.__name__}: {len(expected.transactions)} transactions streamed")
+    
+    return True
+
+
+def test_parser_detection():
+    """Test that the registry picks the best scoring parser from the document header."""
+    print("Testing parser detection...")
+    
+    data_dir = Path(__file__).parent / 'data'
+    sg_text = (data_dir / 'sg_statement.txt').read_text(encoding='utf-8')
+    french_text = "CRÉDIT AGRICOLE\nRelevé de compte\n15/01/2024 Achat 12,50 €\n"
+    
+    parser = detect_parser(sg_text)
+    assert isinstance(parser, SocieteGeneraleParser)
+    assert parser.raw_text == sg_text
+    assert isinstance(detect_parser(french_text), FrenchBankParser)
+    assert isinstance(detect_parser("Bank of Example\n"), GenericTextParser)
+    
+    # Only the beginning of the document is sniffed
+    late_header = " " * SNIFF_SIZE + "SG EXAMPLE BRANCH\n"
+    assert isinstance(detect_parser(late_header), GenericTextParser)
+    
+    print("✓ Parsers detected correctly")
+    return True
+
+
+def test_parser_reuse():
+    """Test that one parser instance parses document after document, from the same compiled patterns."""
+    print("Testing parser reuse...")
+    
+    import threading
+    from parsers import shared_parser
+    
+    us_text = "Example Bank\n12/31/2025 Opening 100.00\n01/02/2026 Card -12.50 87.50\n"
+    eu_text = "Example Bank\n01/02/2026 Card -12,50 87,50\n"
+    
+    parser = GenericTextParser()
+    first = parser.parse_text(us_text)
+    second = parser.parse_text(eu_text)
+    # Nothing of the first document is carried over: its date format, decimal separator or statement
+    assert second.transactions[0].date == GenericTextParser(text=eu_text).parse().transactions[0].date
+    assert (second.transactions[0].amount, second.transactions[0].balance) == (-12.5, 87.5)
+    assert first is not second and len(first.transactions) == 2
+    assert first.transactions[1].date.month == 1
+    
+    sg_text = (Path(__file__).parent / 'data' / 'sg_statement.txt').read_text(encoding='utf-8')
+    sg_parser = SocieteGeneraleParser()
+    expected = SocieteGeneraleParser(text=sg_text)
+    expected_rows = expected.to_csv_format(expected.parse())
+    for _ in range(2):
+        assert sg_parser.to_csv_format(sg_parser.parse_text(sg_text)) == expected_rows
+    
+    # Compiled once per class, recompiled for subclasses changing the patterns
+    assert GenericTextParser()._patterns is GenericTextParser._patterns
+    
+    class IsoOnlyParser(GenericTextParser):
+        DATE_PATTERNS = (r'\b(\d{4}-\d{2}-\d{2})\b',)
+    
+    assert IsoOnlyParser._patterns.all_dates.pattern == IsoOnlyParser.DATE_PATTERNS[0]
+    assert GenericTextParser._patterns.all_dates.pattern != IsoOnlyParser.DATE_PATTERNS[0]
+    
+    # One instance per class and thread
+    parser = detect_parser(eu_text, shared=True)
+    assert parser is shared_parser(GenericTextParser) and parser.raw_text == eu_text
+    other_thread = []
+    thread = threading.Thread(target=lambda: other_thread.append(shared_parser(GenericTextParser)))
+    thread.start()
+    thread.join()
+    assert other_thread[0] is not parser
+    print("✓ Parser instances reused across documents")
+    return True
+
+
+def test_synthetic_corpus():
+    """Test that the benchmark corpus is reproducible and parsed completely."""
+    print("Testing synthetic corpus...")
+    
+    options = CorpusOptions(transactions=200, seed=3, lines_per_page=25)
+    text = generate('sg', options)
+    assert text == generate('sg', options)
+    assert text != generate('sg', CorpusOptions(transactions=200, seed=4))
+    
+    parser = detect_parser(text)
+    assert isinstance(parser, SocieteGeneraleParser)
+    statement = parser.parse()
+    assert len(statement.transactions) == 200
+    assert any(t.libelle_interbancaire == "PAIEMENT CB" for t in statement.transactions)
+    assert isinstance(detect_parser(generate('generic', options)), GenericTextParser)
+    
+    print(f"✓ Generated {text.count(chr(10))} lines, {len(statement.transactions)} transactions parsed")
+    return True
+
+
+def test_amounts():
+    """Test integer-cents amount parsing and French formatting."""
+    print("\nTesting Amounts...")
+    
+    from amounts import format_french_amount, parse_amount_cents, parse_french_cents
+    
+    assert parse_french_cents("1.234.567,89") == 123456789
+    assert parse_french_cents("422,47") == 42247
+    assert parse_french_cents("1 234,5") == 123450
+    assert parse_french_cents("1234") == 123400
+    assert parse_amount_cents("1,234.56") == 123456
+    assert parse_amount_cents("1.234,56") == 123456
+    assert parse_amount_cents("-75,50") == -7550
+    assert parse_amount_cents("1,234") == 123400
+    assert parse_amount_cents("1.234", decimal_separator=",") == 123400
+    
+    # More than two decimals, small negatives and -0.0 are formatted like f"{x:,.2f}"
+    for value in (0.0, -0.0, 3.82, 422.47, 24145.1, 1234567.89, -75.5, 1.115, 2.675, -0.004, 0.005):
+        assert format_french_amount(value) == f"{value:,.2f}".replace(',', ' ').replace('.', ',')
+    assert format_french_amount(1.115) == "1,11"
+    assert format_french_amount(-0.004) == "-0,00"
+    print("  ✓ Amounts parsed to cents and formatted as 1 234,56")
+    return True
+
+
+def test_amount_scanner():
+    """Test that each amount of a line is found once, in the number format of the document."""
+    print("\nTesting Amount Scanner...")
+    
+    from amounts import AmountScanner
+    
+    line = "01/01/2025  CARD PAYMENT STATION TOTAL 1234   -1,178.81   8,821.19"
+    scanner = AmountScanner()
+    assert scanner.amounts(line) == [1234.0, -1178.81, 8821.19]
+    assert scanner.amounts("ECH/150725 ID EMETTEUR/FR12ZZZ123456") == []
+    assert scanner.amounts("Virement reçu     200,00 €   1 150,00 €") == [200.0, 1150.0]
+    
+    # Decided once per document: the other format is not read as amounts
+    assert scanner.infer_decimal_separator(["Opening 1,000.50", "Fee 0,64 EUR", "Deposit 12.5"]) == '.'
+    assert scanner.amounts("TVA 20,00 : 1,234.50 1.234") == [1234.5]
+    assert AmountScanner(',').amounts("1,178.81 1.234,50 1 234,5") == [1234.5, 1234.5]
+    
+    statement = GenericTextParser(text=(
+        "Example Bank\n"
+        "01/05/2025  Deposit           200.00    1,150.00\n"
+        "01/06/2025  Card SHOP 42      -75.50    1,074.50\n")).parse()
+    assert [(t.amount, t.balance) for t in statement.transactions] == [(200.0, 1150.0), (-75.5, 1074.5)]
+    assert statement.transactions[1].description == "Card SHOP"
+    
+    statement = FrenchBankParser(text=(
+        "CRÉDIT AGRICOLE\n"
+        "05/01/2025  Retrait DAB 12       -50,00 €     1 950,00 €\n"
+        "15 janvier 2025 Achat 12,00 €\n")).parse()
+    assert (statement.transactions[0].amount, statement.transactions[0].balance) == (-50.0, 1950.0)
+    assert (statement.transactions[1].amount, statement.transactions[1].balance) == (12.0, None)
+    
+    # The numbers of a date are not amounts, whatever its format
+    for line, expected in (("10-01-2025 Deposit 200.00", (200.0, None)),
+                           ("2025-01-10 Deposit 200.00 1,200.00", (200.0, 1200.0)),
+                           ("15 Jan 2025 Card -5.00", (-5.0, None)),
+                           ("Jan 15, 2025 Card -5.00 95.00", (-5.0, 95.0))):
+        transaction = GenericTextParser().parse_transactions([line])[0]
+        assert (transaction.amount, transaction.balance) == expected, line
+        assert transaction.description in ("Deposit", "Card"), line
+    print("  ✓ Amounts found once per line")
+    return True
+
+
+def test_description_cleaning():
+    """Test that the dates, amounts and currency symbols are cut from descriptions in one pass."""
+    print("\nTesting Description Cleaning...")
+    
+    from parsers.base_parser import cut_spans
+    
+    assert cut_spans("0123456789", [(6, 8), (1, 3), (2, 4)]) == "04589"
+    
+    parser = GenericTextParser()
+    line = "2025-01-03  $12.50 Coffee 03/01/2025  £1,000.00   €"
+    assert parser._clean_description(line) == "Coffee"
+    assert parser._clean_description("01/02/2025 45.00") == "Transaction"
+    
+    french = FrenchBankParser()
+    assert french._clean_french_description("15 janv. 2025 CB Café 15/01  -4,50 €   980,20 €") == "CB Café 15/01"
+    assert french._clean_french_description("15/01/2025 12,00") == "Opération"
+    print("  ✓ Descriptions cleaned")
+    return True
+
+
+def test_transaction_table():
+    """Test that a compacted statement gives back the same transactions."""
+    print("\nTesting Transaction Table...")
+    
+    from datetime import datetime
+    
+    statement = BankStatement()
+    for day in range(1, 4):
+        transaction = BankTransaction()
+        transaction.date = datetime(2025, 1, day)
+        transaction.value_date = datetime(2025, 1, day)
+        transaction.operation_type = "FACTURATION SERVICE NET"
+        transaction.category = "COMMISSIONS ET FRAIS DIVERS"
+        transaction.debit = 3.82 * day
+        transaction.detail_lines = [f"REF {day}"] * day
+        statement.add_transaction(transaction)
+    statement.add_transaction(BankTransaction(description="No date"))
+    
+    expected = list(statement.transactions)
+    statement.compact()
+    
+    assert len(statement.transactions) == 4
+    assert list(statement.transactions) == expected
+    assert statement.transactions[-1] == expected[-1]
+    assert statement.transactions[1:3] == expected[1:3]
+    assert list(statement.transactions.amounts('debit'))[:3] == [3.82, 7.64, 3.82 * 3]
+    print(f"  ✓ {len(statement.transactions)} transactions round-trip through the table")
+    return True
+
+
 def main():
     """Run parser tests."""
     print("Running parser tests...")
@@ -162,7 +532,20 @@ def main():
     tests = [
         test_generic_parser,
         test_french_parser,
-        test_csv_output
+        test_parser_from_text,
+        test_filter_ignore_lines,
+        test_csv_output,
+        test_sg_statement_fixture,
+        test_sg_overdrawn_fixture,
+        test_sg_operation_direction,
+        test_streaming_parsers,
+        test_parser_detection,
+        test_parser_reuse,
+        test_synthetic_corpus,
+        test_amounts,
+        test_amount_scanner,
+        test_description_cleaning,
+        test_transaction_table
     ]
     
     passed = 0
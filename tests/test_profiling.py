@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-stage conversion profile.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project and src directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from pdf2csv import PDF2CSVConverter
+from profiling import NULL_PROFILE, FileProfile, ProfileReport
+
+
+SG_STATEMENT_PATH = Path(__file__).parent / 'data' / 'sg_statement.txt'
+
+
+def test_file_profile():
+    """Test that stage times add up and that the null profile records nothing."""
+    print("Testing file profile...")
+    
+    profile = FileProfile('statement.pdf')
+    with profile.stage('parse'):
+        sum(range(10000))
+    first = profile.stages['parse']['wall']
+    with profile.stage('parse'):
+        sum(range(10000))
+    
+    assert profile.stages['parse']['wall'] > first > 0
+    assert profile.stages['parse']['cpu'] >= 0
+    
+    assert not NULL_PROFILE
+    with NULL_PROFILE.stage('parse'):
+        pass
+    
+    print("✓ File profile works correctly")
+    return True
+
+
+def test_report_aggregates():
+    """Test the p50/p95/max aggregates of the report."""
+    print("Testing profile report aggregates...")
+    
+    report = ProfileReport()
+    for i in range(1, 21):
+        profile = FileProfile(f"{i}.pdf")
+        profile.stages['parse'] = {'wall': float(i), 'cpu': i / 2}
+        profile.fallback = i == 20
+        report.add(profile)
+    
+    summary = report.summary()
+    assert summary['parse']['files'] == 20
+    assert summary['parse']['wall']['p50'] == 10.0
+    assert summary['parse']['wall']['p95'] == 19.0
+    assert summary['parse']['wall']['max'] == 20.0
+    assert summary['parse']['cpu']['max'] == 10.0
+    assert 'csv' not in summary
+    assert report.to_dict()['fallbacks'] == 1
+    
+    print("✓ Aggregates are correct")
+    return True
+
+
+def test_converter_profile():
+    """Test that the converter records the stages and counters of a file."""
+    print("Testing converter profile...")
+    
+    text = SG_STATEMENT_PATH.read_text(encoding='utf-8')
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        report_path = Path(output_dir) / 'profile.json'
+        converter = PDF2CSVConverter(jobs=1, profile_output=str(report_path))
+        profile = FileProfile('sg_statement.pdf')
+        result = converter._process_text_to_csv(text, Path(output_dir) / 'sg.csv', profile)
+        converter.profile_report.add(profile)
+        converter.profile_report.write(report_path)
+        
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+    
+    assert result.statement is not None
+    assert set(profile.stages) == {'filter', 'parse', 'csv'}
+    assert profile.parser == 'SocieteGeneraleParser'
+    assert profile.lines == text.count('\n')
+    assert profile.transactions == len(result.statement.transactions)
+    assert not profile.fallback
+    assert report['per_file'][0]['transactions'] == profile.transactions
+    
+    print(f"✓ Profiled {profile.transactions} transactions")
+    return True
+
+
+def main():
+    """Run profiling tests."""
+    print("Running profiling tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_file_profile,
+        test_report_aggregates,
+        test_converter_profile
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Profiling tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All profiling tests passed! ✓")
+        return 0
+    else:
+        print("Some profiling tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
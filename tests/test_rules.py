@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for the keyword rule engine.
+"""
+
+import json
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from parsers.sg_parser import SG_RULE_SET
+from rules import Classification, RuleSet
+
+
+def test_sg_rules():
+    """Test the categories and directions of the SG operations."""
+    print("Testing SG rules...")
+    
+    expected = {
+        'FACTURATION EXAMPLE SERVICE NET': ('COMMISSIONS ET FRAIS DIVERS', False),
+        'FRAIS VIR RECU': ('COMMISSIONS ET FRAIS DIVERS', True),
+        'CHEQUE 0012345': ('CHEQUES PAYES', False),
+        'REMISE CHEQUE 0012345': ('REMISES DE CHEQUES', True),
+        'VRST GAB 0904 AGENCE EXAMPLE': ('VERSEMENTS ESPECES', True),
+        'ECHEANCE PRET 00012345': ('ECHEANCE CREDITS', False),
+        'VIR RECU CLIENT EXAMPLE': ('AUTRES VIREMENTS RECUS', True),
+        'VIR INST RE 568578424597': ('', True),
+        'VIR EUROPEEN EMIS NET': ('AUTRES VIREMENTS EMIS', False),
+        'VIREMENT RECU EXAMPLE': ('', True),
+        'DEPOT ESPECES': ('', True),
+        'PRLV SEPA EXAMPLE ENERGIE': ('', False),
+        'vir recu client': ('AUTRES VIREMENTS RECUS', True),
+        '': ('', False),
+    }
+    for label, (category, credit) in expected.items():
+        assert SG_RULE_SET.classify(label) == Classification(category, credit), label
+        assert SG_RULE_SET.category(label) == category
+        assert SG_RULE_SET.is_credit(label) == credit
+    
+    print(f"✓ {len(expected)} labels classified")
+    return True
+
+
+def test_overlapping_keywords():
+    """Test that keywords overlapping or contained in others are all found."""
+    print("Testing overlapping keywords...")
+    
+    rules = RuleSet([
+        {'keywords': ['VIR INST RE'], 'category': 'INSTANT'},
+        {'keywords': ['REMISE'], 'direction': 'credit'},
+        {'keywords': ['CHEQUE'], 'unless': ['REMISE CHEQUE'], 'category': 'CHEQUE'},
+        {'keywords': ['VIR'], 'direction': 'debit'},
+    ])
+    
+    # "REMISE" starts inside "VIR INST RE", "VIR" is a prefix of it
+    assert rules.keywords('VIR INST REMISE') == ['VIR INST RE', 'REMISE', 'VIR']
+    assert rules.classify('VIR INST REMISE') == ('INSTANT', True)
+    assert rules.classify('REMISE CHEQUE 12') == ('', True)
+    assert rules.classify('CHEQUE 12') == ('CHEQUE', False)
+    assert rules.classify('CHEQUE REMISE') == ('CHEQUE', True)
+    
+    print("✓ Every keyword of a label is found in one pass")
+    return True
+
+
+def test_rule_files():
+    """Test loading rule tables from JSON, pickling and validation."""
+    print("Testing rule files...")
+    
+    table = {'default_category': 'AUTRE',
+             'rules': [{'keywords': ['loyer'], 'category': 'LOGEMENT'},
+                       {'keywords': ['SALAIRE'], 'category': 'REVENUS', 'direction': 'credit'}]}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'rules.json'
+        path.write_text(json.dumps(table), encoding='utf-8')
+        rules = RuleSet.from_file(path)
+    
+    assert rules.classify('PRLV LOYER JUILLET') == ('LOGEMENT', False)
+    assert rules.classify('VIR SALAIRE') == ('REVENUS', True)
+    assert rules.classify('CARTE X1234') == ('AUTRE', False)
+    
+    copy = pickle.loads(pickle.dumps(rules))
+    assert copy.classify('VIR SALAIRE') == ('REVENUS', True)
+    # The digest identifies the table, default category included
+    assert copy.digest == rules.digest
+    assert RuleSet(table['rules']).digest != rules.digest
+    
+    for invalid in ([{'category': 'X'}], [{'keywords': 'LOYER', 'category': 'X'}],
+                    [{'keywords': ['A'], 'direction': 'in'}], [{'keywords': ['A'], 'label': 'X'}]):
+        try:
+            RuleSet(invalid)
+        except ValueError:
+            continue
+        raise AssertionError(f"Invalid rule accepted: {invalid}")
+    
+    print("✓ Rule tables load from JSON and are validated")
+    return True
+
+
+def main():
+    """Run rule engine tests."""
+    print("Running rule engine tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_sg_rules,
+        test_overlapping_keywords,
+        test_rule_files
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Rule engine tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All rule engine tests passed! ✓")
+        return 0
+    else:
+        print("Some rule engine tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
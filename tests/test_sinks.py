@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the CSV output sinks.
+"""
+
+import csv
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and benchmarks directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from corpus import CorpusOptions, generate
+from parsers import GenericTextParser, detect_stream_parser
+from parsers.sg_parser import SocieteGeneraleParser
+from sinks import MergeSink, replace_if_changed, stream_statement_csv, write_statement_csv
+
+
+SAMPLE_PATH = Path(__file__).parent.parent / 'examples' / 'sample_statement.txt'
+DATA_DIR = Path(__file__).parent / 'data'
+
+
+def parse_sample(parser_class):
+    """Parse the sample statement with the given parser class."""
+    parser = parser_class(str(SAMPLE_PATH))
+    return parser, parser.parse()
+
+
+def test_sg_statement_csv():
+    """Test the SG layout: quoted rows and an unquoted column header line."""
+    print("Testing SG statement CSV...")
+    
+    parser, statement = parse_sample(SocieteGeneraleParser)
+    output = io.StringIO(newline='')
+    write_statement_csv(output, parser, statement)
+    lines = output.getvalue().splitlines()
+    
+    assert lines[0] == f'"{statement.bank_name}"'
+    assert lines[6] == "Date;Nature de l'opération;Débit;Crédit;Devise;Date de valeur;Libellé interbancaire"
+    assert lines[7].startswith('"01/07/2025";"000001 VIR EUROPEEN EMIS NET";"-422,47"')
+    assert len(lines) == len(parser.to_csv_format())
+    print(f"✓ {len(lines)} lines in SG layout")
+    return True
+
+
+def test_merge_sink():
+    """Test merging statements: one header, every transaction row, parser dialect."""
+    print("Testing merge sink...")
+    
+    parser, statement = parse_sample(SocieteGeneraleParser)
+    transaction_rows = list(parser.csv_transaction_rows(statement))
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        merged_path = Path(output_dir) / 'merged.csv'
+        with MergeSink(merged_path) as sink:
+            sink.add(statement, SocieteGeneraleParser)
+            sink.add(statement, SocieteGeneraleParser)
+        
+        with open(merged_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f, delimiter=';'))
+    
+    assert sink.statement_count == 2
+    assert rows[0] == parser.csv_header()
+    assert rows[1:] == transaction_rows * 2
+    print(f"✓ Merged {len(rows) - 1} transaction rows under one header")
+    return True
+
+
+def test_merge_sink_generic():
+    """Test that the merged file follows the dialect of the generic parser."""
+    print("Testing merge sink with generic statements...")
+    
+    _, statement = parse_sample(GenericTextParser)
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        merged_path = Path(output_dir) / 'merged.csv'
+        with MergeSink(merged_path) as sink:
+            sink.add(statement, GenericTextParser)
+        
+        with open(merged_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+    
+    assert rows == statement.to_csv_data()
+    print(f"✓ Merged {len(rows) - 1} generic rows")
+    return True
+
+
+def test_sorted_merge_sink():
+    """Test the k-way merge by date, in memory and spilled to temporary files."""
+    print("Testing sorted merge sink...")
+    
+    texts = [generate('generic', CorpusOptions(transactions=80, seed=seed)) for seed in (4, 1, 3)]
+    statements = [GenericTextParser(text=text).parse() for text in texts]
+    rows_by_setting = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        merged_path = Path(output_dir) / 'merged.csv'
+        for memory_transactions, max_open_runs in ((100000, 64), (25, 2)):
+            with MergeSink(merged_path, sort_by='date', memory_transactions=memory_transactions,
+                           max_open_runs=max_open_runs) as sink:
+                for statement in statements:
+                    sink.add(statement, GenericTextParser)
+            with open(merged_path, newline='', encoding='utf-8') as f:
+                rows_by_setting.append(list(csv.reader(f)))
+    
+    in_memory, spilled = rows_by_setting
+    assert spilled == in_memory
+    assert in_memory[0] == GenericTextParser().csv_header()
+    dates = [row[0] for row in in_memory[1:]]
+    assert dates == sorted(dates)
+    expected = [transaction.to_csv_row()
+                for statement in statements for transaction in statement.transactions]
+    assert sorted(in_memory[1:]) == sorted(expected)
+    # Transactions of the same day keep the order of the statements
+    assert in_memory[1:] == sorted(expected, key=lambda row: row[0])
+    print(f"✓ {len(dates)} rows merged by date")
+    return True
+
+
+def test_stream_statement_csv():
+    """Test that a CSV written one transaction at a time matches the regular one."""
+    print("Testing streamed statement CSV...")
+    
+    with open(DATA_DIR / 'sg_statement.txt', encoding='utf-8') as f:
+        parser = detect_stream_parser(f)
+        output = io.StringIO(newline='')
+        statement, count = stream_statement_csv(output, parser)
+    with open(DATA_DIR / 'sg_statement_expected.csv', newline='', encoding='utf-8') as f:
+        expected = f.read()
+    
+    # The preamble shows the final balance, read after the transactions
+    assert output.getvalue() == expected
+    assert count == 11 and statement.transactions == []
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        csv_path = Path(output_dir) / 'statement.csv'
+        for content, replaced in (('a;b\n', True), ('a;b\n', False), ('a;c\n', True)):
+            new_path = Path(output_dir) / 'statement.tmp'
+            new_path.write_text(content, encoding='utf-8')
+            assert replace_if_changed(new_path, csv_path) == replaced
+            assert not new_path.exists()
+            assert csv_path.read_text(encoding='utf-8') == content
+    
+    print(f"✓ {count} transactions streamed to the expected CSV")
+    return True
+
+
+def main():
+    """Run sink tests."""
+    print("Running sink tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_sg_statement_csv,
+        test_merge_sink,
+        test_merge_sink_generic,
+        test_sorted_merge_sink,
+        test_stream_statement_csv
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Sink tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All sink tests passed! ✓")
+        return 0
+    else:
+        print("Some sink tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
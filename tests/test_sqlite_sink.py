@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite statement store.
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src and benchmarks directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from corpus import CorpusOptions, generate
+from parsers import GenericTextParser
+from parsers.sg_parser import SocieteGeneraleParser
+from sqlite_sink import SQLiteSink
+
+
+DATA_DIR = Path(__file__).parent / 'data'
+
+
+def test_store_statement():
+    """Test that statements and transactions are stored with their indexes."""
+    print("Testing SQLite store...")
+    
+    parser = SocieteGeneraleParser(str(DATA_DIR / 'sg_statement.txt'))
+    statement = parser.parse()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_path = Path(tmp_dir) / 'statements.sqlite'
+        with SQLiteSink(database_path, batch_size=7) as sink:
+            sink.add(statement, SocieteGeneraleParser, 'sg_statement.pdf')
+        
+        connection = sqlite3.connect(database_path)
+        try:
+            assert connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            row = connection.execute(
+                "SELECT account_number, start_date, parser, final_balance, transaction_count "
+                "FROM statements").fetchone()
+            assert row == (statement.account_number, statement.start_date.strftime("%Y-%m-%d"),
+                           'SocieteGeneraleParser', statement.final_balance,
+                           len(statement.transactions))
+            
+            rows = connection.execute(
+                "SELECT date, description, amount FROM transactions ORDER BY position").fetchall()
+            assert len(rows) == len(statement.transactions)
+            first = statement.transactions[0]
+            assert rows[0] == (first.date.strftime("%Y-%m-%d"), first.description, first.amount)
+            
+            # The categories of the CSV file are stored, and queried with their index
+            categories = dict(connection.execute(
+                "SELECT category, COUNT(*) FROM transactions GROUP BY category").fetchall())
+            assert categories.get('AUTRES VIREMENTS EMIS'), categories
+            assert sum(count for category, count in categories.items() if category) > len(rows) // 2
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE category = ?",
+                ('AUTRES VIREMENTS EMIS',)).fetchall()
+            assert any('transactions_category' in step[-1] for step in plan)
+            
+            # Queries by account and date use the index
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM transactions "
+                "WHERE account_number = ? AND date BETWEEN ? AND ?",
+                (statement.account_number, '2025-01-01', '2025-12-31')).fetchall()
+            assert any('transactions_account_date' in step[-1] for step in plan)
+        finally:
+            connection.close()
+    
+    print(f"✓ {len(rows)} transactions stored")
+    return True
+
+
+def test_reimport_is_idempotent():
+    """Test that importing a statement again updates it instead of duplicating it."""
+    print("Testing SQLite re-import...")
+    
+    text = generate('generic', CorpusOptions(transactions=50, seed=2))
+    statement = GenericTextParser(text=text).parse()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_path = Path(tmp_dir) / 'statements.sqlite'
+        with SQLiteSink(database_path) as sink:
+            sink.add(statement, GenericTextParser)
+            sink.add(statement, GenericTextParser)
+        with SQLiteSink(database_path) as sink:
+            sink.add(statement, GenericTextParser)
+            
+            # A shorter parse of the same statement leaves no stale rows
+            shorter = GenericTextParser(text=text).parse()
+            del shorter.transactions[-1]
+            sink.add(shorter, GenericTextParser)
+        
+        connection = sqlite3.connect(database_path)
+        try:
+            assert connection.execute("SELECT COUNT(*) FROM statements").fetchone()[0] == 1
+            count = connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            assert count == len(statement.transactions) - 1
+        finally:
+            connection.close()
+    
+    print(f"✓ Statement stored once with {count} transactions")
+    return True
+
+
+def test_statements_without_account():
+    """Test that statements whose account number and period are unknown do not replace each other."""
+    print("Testing SQLite statements without account...")
+    
+    # Same period, taken from the dates of the transactions
+    first = GenericTextParser(text="01/02/2025 Payment -10.00\n01/02/2025 Refund 5.00\n").parse()
+    second = GenericTextParser(text="01/02/2025 Transfer -7.00\n").parse()
+    assert not first.account_number and not second.account_number
+    assert len(first.transactions) == 2 and len(second.transactions) == 1
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_path = Path(tmp_dir) / 'statements.sqlite'
+        with SQLiteSink(database_path) as sink:
+            first_id = sink.add(first, GenericTextParser, 'first.pdf')
+            second_id = sink.add(second, GenericTextParser, 'second.pdf')
+            # The same source again is still an update
+            assert sink.add(first, GenericTextParser, 'first.pdf') == first_id
+        assert first_id != second_id
+        
+        connection = sqlite3.connect(database_path)
+        try:
+            rows = connection.execute(
+                "SELECT source, transaction_count FROM statements ORDER BY id").fetchall()
+            assert rows == [('first.pdf', len(first.transactions)),
+                            ('second.pdf', len(second.transactions))]
+            count = connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            assert count == len(first.transactions) + len(second.transactions)
+        finally:
+            connection.close()
+    
+    print(f"✓ {len(rows)} statements without account number kept")
+    return True
+
+
+def main():
+    """Run SQLite store tests."""
+    print("Running SQLite store tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_store_statement,
+        test_reimport_is_idempotent,
+        test_statements_without_account
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"SQLite store tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All SQLite store tests passed! ✓")
+        return 0
+    else:
+        print("Some SQLite store tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
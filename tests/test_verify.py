@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for balance reconciliation.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from models import BankStatement, BankTransaction
+from parsers.sg_parser import SocieteGeneraleParser
+from verify import BalanceVerifier, check_statement
+
+
+def make_statement(month: int, opening, closing, amounts, account='FR76 0001') -> BankStatement:
+    """Statement of a month, with credits for positive amounts and debits for negative ones."""
+    transactions = [BankTransaction(date=datetime(2025, month, day + 1),
+                                    credit=amount if amount > 0 else None,
+                                    debit=-amount if amount < 0 else None)
+                    for day, amount in enumerate(amounts)]
+    return BankStatement(account_number=account, start_date=datetime(2025, month, 1),
+                         end_date=datetime(2025, month, 28), opening_balance=opening,
+                         closing_balance=closing, transactions=transactions)
+
+
+def test_statement_balances():
+    """Test the closing balance check, exact in cents, for lists and columnar tables."""
+    print("Testing statement balances...")
+    
+    # 0.1 + 0.2 != 0.3 in floats, the check works in cents
+    statement = make_statement(1, 100.0, 100.3, [0.1, 0.2, -12.5, 12.5])
+    check = check_statement(statement)
+    assert check.ok, check.problems
+    assert check.computed_closing_cents == 10030
+    
+    statement.compact()
+    assert check_statement(statement).ok
+    
+    check = check_statement(make_statement(1, 100.0, 90.0, [0.1, -12.5]))
+    assert not check.ok
+    assert "87,60" in check.problems[0] and "2,40" in check.problems[0]
+    
+    # Printed balances give the opening balance and locate the first error
+    transactions = [BankTransaction(date=datetime(2025, 1, 2), amount=-20.0, balance=80.0),
+                    BankTransaction(date=datetime(2025, 1, 3), amount=5.0, balance=85.0),
+                    BankTransaction(date=datetime(2025, 1, 4), amount=-1.0, balance=80.0)]
+    check = check_statement(BankStatement(transactions=transactions, final_balance=80.0))
+    assert check.opening_cents == 10000
+    assert len(check.problems) == 2
+    assert "1 printed balances" in check.problems[1] and "transaction 3" in check.problems[1]
+    print("✓ Closing and printed balances checked")
+    return True
+
+
+def test_chained_statements():
+    """Test that consecutive statements of an account are checked against each other."""
+    print("Testing chained statements...")
+    
+    verifier = BalanceVerifier()
+    # Added out of order, they are chained by period
+    verifier.add(make_statement(2, 110.0, 100.0, [-10.0]), 'feb.pdf')
+    verifier.add(make_statement(1, 100.0, 110.0, [10.0]), 'jan.pdf')
+    # Opening balance unknown: the closing balance of February is used
+    verifier.add(make_statement(3, None, 95.0, [-5.0]), 'mar.pdf')
+    # Another account is not chained with the first one
+    verifier.add(make_statement(2, 500.0, 500.0, [], account='FR76 0002'), 'other.pdf')
+    assert verifier.finish() == []
+    
+    verifier = BalanceVerifier()
+    verifier.add(make_statement(1, 100.0, 110.0, [10.0]), 'jan.pdf')
+    verifier.add(make_statement(2, 120.0, 110.0, [-10.0]), 'feb.pdf')
+    verifier.add(make_statement(3, None, 90.0, [-5.0]), 'mar.pdf')
+    discrepancies = verifier.finish()
+    assert [check.source for check in discrepancies] == ['feb.pdf', 'mar.pdf']
+    assert "jan.pdf" in discrepancies[0].problems[0]
+    assert verifier.unverified_count == 0
+    print("✓ Statement chain checked")
+    return True
+
+
+def test_sg_fixture():
+    """Test that the reference numbers the SG parser takes for amounts are flagged."""
+    print("Testing SG fixture...")
+    
+    parser = SocieteGeneraleParser(str(Path(__file__).parent / 'data' / 'sg_statement.txt'))
+    statement = parser.parse()
+    assert statement.opening_balance == 24567.57
+    assert statement.final_balance == 37807.19
+    
+    check = check_statement(statement)
+    assert not check.ok
+    assert "37 807,19" in check.problems[0]
+    print(f"✓ Discrepancy found: {check.problems[0]}")
+    return True
+
+
+def test_sg_negative_balances():
+    """Test that overdrawn SG balances are negative and reconcile with the transactions."""
+    print("Testing SG negative balances...")
+    
+    text = "\n".join([
+        "SG EXAMPLE BRANCH",
+        "du 01/07/2025 au 31/07/2025",
+        "RELEVÉ DES OPÉRATIONS",
+        " " * 60 + "SOLDE PRÉCÉDENT AU 30/06/2025" + " " * 40 + "- 150,00",
+        " 01/07/2025 01/07/2025 PRLV SEPA EDF" + " " * 80 + "20,00",
+        " 15/07/2025 15/07/2025 VIR RECU CLIENT EXAMPLE",
+        " " * 150 + "100,00",
+        " " * 60 + "NOUVEAU SOLDE AU 31/07/2025" + " " * 40 + "-   70,00",
+        "",
+    ])
+    statement = SocieteGeneraleParser().parse_text(text)
+    assert statement.opening_balance == -150.0
+    assert statement.final_balance == -70.0
+    assert check_statement(statement).ok
+    print("✓ Overdrawn opening and final balances reconcile")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Running balance verification tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_statement_balances,
+        test_chained_statements,
+        test_sg_fixture,
+        test_sg_negative_balances
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Balance verification tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All balance verification tests passed! ✓")
+        return 0
+    else:
+        print("Some balance verification tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental conversion manifest and the directory watcher.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sinks import write_if_changed
+from watch import DirectoryWatcher, Manifest, pdf_files
+
+
+def test_manifest():
+    """Test that only new or changed files are reported, and that the manifest is saved."""
+    print("Testing manifest...")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = Path(work_dir) / 'statement.pdf'
+        pdf_path.write_bytes(b'%PDF first version')
+        manifest_path = Path(work_dir) / 'manifest.json'
+        
+        manifest = Manifest(manifest_path)
+        assert manifest.changed(pdf_path)
+        manifest.record(pdf_path)
+        assert not manifest.changed(pdf_path)
+        
+        # Touched but identical: the content hash says unchanged
+        os.utime(pdf_path, ns=(1, 1))
+        assert not manifest.changed(pdf_path)
+        
+        manifest.save()
+        reloaded = Manifest(manifest_path)
+        assert not reloaded.changed(pdf_path)
+        
+        pdf_path.write_bytes(b'%PDF second version')
+        assert reloaded.changed(pdf_path)
+        
+        # Converted with another version, or its CSV file removed: converted again
+        csv_path = pdf_path.with_suffix('.csv')
+        csv_path.write_text("a;b\r\n", encoding='utf-8')
+        manifest.record(pdf_path, csv_path, version='parsers 1')
+        assert not manifest.changed(pdf_path, version='parsers 1')
+        assert manifest.changed(pdf_path, version='parsers 2')
+        csv_path.unlink()
+        assert manifest.changed(pdf_path, version='parsers 1')
+    
+    print("✓ Manifest works correctly")
+    return True
+
+
+def test_write_if_changed():
+    """Test that an identical file is left untouched."""
+    print("Testing write_if_changed...")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = Path(work_dir) / 'statement.csv'
+        assert write_if_changed(csv_path, "a;b\r\n")
+        os.utime(csv_path, ns=(1, 1))
+        
+        assert not write_if_changed(csv_path, "a;b\r\n")
+        assert csv_path.stat().st_mtime_ns == 1
+        
+        assert write_if_changed(csv_path, "a;c\r\n")
+        assert csv_path.read_bytes() == b"a;c\r\n"
+    
+    print("✓ Unchanged files are not rewritten")
+    return True
+
+
+def test_directory_watcher():
+    """Test that new PDF files wake up the watcher, with inotify and with polling."""
+    print("Testing directory watcher...")
+    
+    for use_inotify in (True, False):
+        with tempfile.TemporaryDirectory() as watch_dir:
+            with DirectoryWatcher(Path(watch_dir), poll_interval=0.05, use_inotify=use_inotify) as watcher:
+                assert not watcher.wait(timeout=0.2)
+                
+                # Other files are ignored
+                (Path(watch_dir) / 'statement.csv').write_text("csv")
+                assert not watcher.wait(timeout=0.2)
+                
+                timer = threading.Timer(0.1, (Path(watch_dir) / 'statement.pdf').write_bytes, [b'%PDF'])
+                timer.start()
+                assert watcher.wait(timeout=5)
+                timer.join()
+            
+            assert pdf_files(Path(watch_dir)) == [str(Path(watch_dir) / 'statement.pdf')]
+        
+        method = 'inotify' if use_inotify else 'polling'
+        print(f"✓ New file detected ({method})")
+    return True
+
+
+def main():
+    """Run watch tests."""
+    print("Running watch tests...")
+    print("=" * 50)
+    
+    tests = [
+        test_manifest,
+        test_write_if_changed,
+        test_directory_watcher
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+    
+    print("=" * 50)
+    print(f"Watch tests passed: {passed}/{total}")
+    
+    if passed == total:
+        print("All watch tests passed! ✓")
+        return 0
+    else:
+        print("Some watch tests failed! ✗")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())